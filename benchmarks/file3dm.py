@@ -0,0 +1,47 @@
+"""Conversion of curves and surfaces from and to .3dm files with rhino3dm.
+
+Usage::
+
+    python benchmarks/file3dm.py [number_of_curves] [number_of_surfaces]
+"""
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from compas_nurbs import RationalCurve
+from compas_nurbs import RationalSurface
+from compas_nurbs.file3dm import read_3dm
+from compas_nurbs.file3dm import write_3dm
+
+
+def main(num_curves=10000, num_surfaces=2000):
+    rng = np.random.default_rng(0)
+    grid = np.stack(np.meshgrid(np.arange(8.), np.arange(8.), indexing='ij'), axis=-1)
+    curves = [RationalCurve.from_arrays(rng.random((10, 3)), 3, weights=rng.random(10) + 0.5) for _ in range(num_curves)]
+    surfaces = [RationalSurface.from_arrays(np.concatenate((grid, rng.random((8, 8, 1))), axis=-1), (3, 3), weights=rng.random((8, 8)) + 0.5)
+                for _ in range(num_surfaces)]
+    folder = tempfile.mkdtemp()
+    try:
+        for name, geometries in (('curves', curves), ('surfaces', surfaces)):
+            path = os.path.join(folder, name + '.3dm')
+            start = time.perf_counter()
+            write_3dm(geometries, path)
+            seconds_write = time.perf_counter() - start
+            start = time.perf_counter()
+            result = read_3dm(path)
+            seconds_read = time.perf_counter() - start
+            assert len(result) == len(geometries)
+            print("{} {} ({} control points): write {:.0f} / s, read {:.0f} / s".format(
+                len(geometries), name, geometries[0]._points.size // 4, len(geometries) / seconds_write, len(geometries) / seconds_read))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
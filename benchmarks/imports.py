@@ -0,0 +1,45 @@
+"""Import time of compas_nurbs, in fresh interpreters.
+
+compas.geometry, which provides the base classes, is imported first and
+timed separately, as are the first evaluation and the first fit, which
+load the evaluation and fitting modules.
+
+Usage::
+
+    python benchmarks/imports.py [repeat]
+"""
+from __future__ import print_function
+
+import json
+import subprocess
+import sys
+
+SCRIPT = """
+import json
+import time
+start = time.perf_counter()
+import compas.geometry
+base = time.perf_counter()
+import compas_nurbs
+package = time.perf_counter()
+curve = compas_nurbs.Curve([(0, 0, 0), (1, 1, 0), (2, 0, 0)], 2)
+curve.points_at([0.5])
+evaluation = time.perf_counter()
+compas_nurbs.Curve.from_points([(0, 0, 0), (1, 1, 0), (2, 0, 0), (3, 1, 0)], 3)
+fitting = time.perf_counter()
+print(json.dumps([base - start, package - base, evaluation - package, fitting - evaluation]))
+"""
+
+
+def main(repeat=10):
+    times = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', SCRIPT])
+        times.append(json.loads(output.decode().strip().splitlines()[-1]))
+    times = sorted(times, key=lambda t: t[1])[len(times) // 2]  # the median import of compas_nurbs
+    for name, seconds in zip(['import compas.geometry', 'import compas_nurbs', 'first evaluation', 'first fit'], times):
+        print("{:>24}: {:6.1f} ms".format(name, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,62 @@
+"""Memory used by a library of surfaces.
+
+Compares the nested lists the geometry was stored in before with the
+contiguous arrays it is stored in now, for the same rational surfaces. The
+lists are measured without the objects holding them, the arrays with the
+:class:`compas_nurbs.RationalSurface` objects.
+
+Usage::
+
+    python benchmarks/memory.py [number_of_surfaces] [control_points_per_direction]
+"""
+from __future__ import print_function
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from compas_nurbs import RationalSurface
+
+
+def nested_lists(control_points, weights, knot_vectors):
+    """The storage of one surface as nested lists."""
+    return {'control_points': control_points.tolist(), 'weights': weights.tolist(), 'knot_vector': [kv.tolist() for kv in knot_vectors]}
+
+
+def measure(build, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    library = [build(i) for i in range(count)]
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return library, size, seconds
+
+
+def main(count=100000, size=8):
+    rng = np.random.default_rng(0)
+    grid = np.stack(np.meshgrid(np.arange(size), np.arange(size), indexing='ij'), axis=-1)
+    control_points = np.concatenate((grid, rng.random((size, size, 1))), axis=-1).astype(float)
+    weights = rng.random((size, size)) + 0.5
+    surface = RationalSurface(control_points, (3, 3), weights=weights)
+    knot_vectors = surface.knot_vector
+
+    def build_lists(i):
+        return nested_lists(control_points + i, weights, knot_vectors)
+
+    def build_arrays(i):
+        return RationalSurface.from_arrays(control_points + i, (3, 3), [kv.copy() for kv in knot_vectors], weights)
+
+    print("{} rational surfaces with {}x{} control points".format(count, size, size))
+    results = []
+    for name, build in (('nested lists', build_lists), ('arrays', build_arrays)):
+        _, memory, seconds = measure(build, count)
+        results.append(memory)
+        print("{:>14}: {:8.1f} MB, {:6.0f} bytes per surface, {:.3f} s".format(name, memory / 1e6, memory / float(count), seconds))
+    print("{:>14}: {:8.1f}x".format('reduction', results[0] / float(results[1])))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,80 @@
+"""Round trip of a library of surfaces through JSON and the binary format,
+and the startup time of a memory-mapped :class:`GeometryLibrary`.
+
+The library consists of copies of ``data/cylinder.json`` with knots
+inserted, moved to random locations.
+
+Usage::
+
+    python benchmarks/serialization.py [number_of_surfaces]
+"""
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from compas_nurbs import DATA
+from compas_nurbs import RationalSurface
+from compas_nurbs.serialization import GeometryLibrary
+from compas_nurbs.serialization import dump
+from compas_nurbs.serialization import dumps
+from compas_nurbs.serialization import loads
+
+
+def surface_library(count):
+    with open(os.path.join(DATA, 'cylinder.json')) as f:
+        cylinder = RationalSurface.from_data(json.load(f))
+    surface = cylinder.insert_knots(1, np.linspace(0.05, 0.95, 10).tolist()).insert_knots(0, [0.3, 0.6])
+    offsets = np.random.default_rng(0).random((count, 3)) * 1000
+    return [RationalSurface.from_arrays(surface.control_points + offset, surface.degree, surface.knot_vector, surface.weights) for offset in offsets]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def json_dumps(surfaces):
+    return json.dumps([surface.data for surface in surfaces])
+
+
+def json_loads(text):
+    return [RationalSurface.from_data(data) for data in json.loads(text)]
+
+
+def evaluate(library, indices):
+    return [library[i].points_at([(0.5, 0.5)]) for i in indices]
+
+
+def main(count=100000):
+    surfaces = surface_library(count)
+    print("{} rational surfaces with {}x{} control points".format(count, *surfaces[0].count))
+    times = []
+    for name, write, read in (('json', json_dumps, json_loads), ('binary', dumps, loads)):
+        buffer, seconds_write = timed(write, surfaces)
+        result, seconds_read = timed(read, buffer)
+        assert np.allclose(result[-1].control_points, surfaces[-1].control_points)
+        times.append(seconds_write + seconds_read)
+        print("{:>8}: {:7.1f} MB, write {:.3f} s, read {:.3f} s".format(name, len(buffer) / 1e6, seconds_write, seconds_read))
+    print("{:>8}: {:7.1f}x".format('speedup', times[0] / times[1]))
+
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, 'library.bin')
+        _, seconds_write = timed(dump, surfaces, path)
+        library, seconds_open = timed(GeometryLibrary, path)
+        points, seconds_access = timed(evaluate, library, range(0, count, 100))
+        print("{:>8}: write {:.3f} s, open {:.6f} s, evaluate {} surfaces {:.3f} s".format('library', seconds_write, seconds_open, len(points), seconds_access))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,218 @@
+"""Benchmarks of evaluation, derivatives, curvature, fitting and operations.
+
+Every case is timed (the best of a few runs) and its peak memory measured
+with tracemalloc, for compas_nurbs and for geomdl as a reference where geomdl
+provides the same query. geomdl has no curvature queries, its derivatives of
+second order, which the curvatures are computed from, are taken instead.
+Cases without a reference, e.g. lofts and isocurves, are listed with ``-``.
+
+The geometry is generated from a fixed seed, nothing is downloaded, and
+geomdl is optional. The results can be saved and later runs compared with
+them, to find regressions in the hot paths.
+
+Usage::
+
+    python benchmarks/suite.py [--quick] [--repeat N] [--filter TEXT] [--output FILE] [--baseline FILE]
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import time
+import tracemalloc
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+
+from compas_nurbs import Curve
+from compas_nurbs import RationalCurve
+from compas_nurbs import RationalSurface
+from compas_nurbs import Surface
+
+try:
+    from geomdl import BSpline
+    from geomdl import NURBS
+    from geomdl import fitting
+    from geomdl import operations
+except ImportError:
+    BSpline = None
+
+Case = namedtuple('Case', ['name', 'compas', 'reference'])
+
+
+def each(function, params, **kwargs):
+    """Calls a function of a single parameter, or of ``(u, v)``, for every parameter."""
+    return [function(*np.atleast_1d(param), **kwargs) for param in params]
+
+
+def random_curve(rng, count, degree, rational):
+    control_points = np.cumsum(rng.random((count, 3)), axis=0)
+    if rational:
+        return RationalCurve(control_points, degree, weights=rng.random(count) + 0.5)
+    return Curve(control_points, degree)
+
+
+def random_surface(rng, count, degree, rational):
+    grid = np.stack(np.meshgrid(np.arange(count), np.arange(count), indexing='ij'), axis=-1)
+    control_points = np.concatenate((grid, rng.random((count, count, 1))), axis=-1).astype(float)
+    if rational:
+        return RationalSurface(control_points, degree, weights=rng.random((count, count)) + 0.5)
+    return Surface(control_points, degree)
+
+
+def geomdl_curve(curve):
+    crv = NURBS.Curve() if curve.rational else BSpline.Curve()
+    crv.degree = curve.degree
+    crv.ctrlpts = curve.control_points.tolist()
+    crv.knotvector = curve.knot_vector.tolist()
+    if curve.rational:
+        crv.weights = curve.weights.tolist()
+    return crv
+
+
+def geomdl_surface(surface):
+    srf = NURBS.Surface() if surface.rational else BSpline.Surface()
+    srf.degree_u, srf.degree_v = surface.degree
+    srf.ctrlpts_size_u, srf.ctrlpts_size_v = surface.count
+    srf.ctrlpts = surface.control_points.reshape(-1, 3).tolist()
+    if surface.rational:
+        srf.weights = surface.weights.ravel().tolist()
+    srf.knotvector_u, srf.knotvector_v = [kv.tolist() for kv in surface.knot_vector]
+    return srf
+
+
+def curve_cases(rng, counts, degrees):
+    for degree in degrees:
+        for rational in (False, True):
+            curve = random_curve(rng, 20, degree, rational)
+            crv = geomdl_curve(curve) if BSpline else None
+            label = "curve degree={} {}".format(degree, 'rational' if rational else 'non-rational')
+            for count in counts:
+                params = np.linspace(0, 1, count).tolist()
+                yield Case("points_at {} params, {}".format(count, label),
+                           partial(curve.points_at, params),
+                           crv and partial(crv.evaluate_list, params))
+                yield Case("derivatives_at {} params, {}".format(count, label),
+                           partial(curve.derivatives_at, params, order=1),
+                           crv and partial(each, crv.derivatives, params, order=1))
+                yield Case("curvatures_at {} params, {}".format(count, label),
+                           partial(curve.curvatures_at, params),
+                           crv and partial(each, crv.derivatives, params, order=2))
+
+
+def surface_cases(rng, counts, sizes):
+    for size in sizes:
+        for rational in (False, True):
+            surface = random_surface(rng, size, (3, 3), rational)
+            srf = geomdl_surface(surface) if BSpline else None
+            label = "surface {}x{} {}".format(size, size, 'rational' if rational else 'non-rational')
+            for count in counts:
+                params = [(u, v) for u in np.linspace(0, 1, count).tolist() for v in np.linspace(0, 1, count).tolist()]
+                yield Case("points_at {} params, {}".format(len(params), label),
+                           partial(surface.points_at, params),
+                           srf and partial(srf.evaluate_list, params))
+                yield Case("derivatives_at {} params, {}".format(len(params), label),
+                           partial(surface.derivatives_at, params, order=1),
+                           srf and partial(each, srf.derivatives, params, order=1))
+                yield Case("curvatures_at {} params, {}".format(len(params), label),
+                           partial(surface.curvatures_at, params),
+                           srf and partial(each, srf.derivatives, params, order=2))
+                yield Case("normals_at {} params, {}".format(len(params), label),
+                           partial(surface.normals_at, params),
+                           srf and partial(operations.normal, srf, params))
+            yield Case("isocurve, {}".format(label), partial(surface.isocurve, 0, 0.37), None)
+
+
+def fitting_cases(rng, counts, sizes):
+    for degree in (2, 3):
+        for count in counts:
+            points = np.cumsum(rng.random((count, 3)), axis=0).tolist()
+            yield Case("Curve.from_points {} points, degree={}".format(count, degree),
+                       partial(Curve.from_points, points, degree),
+                       BSpline and partial(fitting.interpolate_curve, points, degree))
+    for size in sizes:
+        grid = np.stack(np.meshgrid(np.arange(size), np.arange(size), indexing='ij'), axis=-1)
+        points = np.concatenate((grid, rng.random((size, size, 1))), axis=-1).astype(float)
+        flat = points.reshape(-1, 3).tolist()
+        yield Case("Surface.from_points {}x{} points".format(size, size),
+                   partial(Surface.from_points, points.tolist(), (3, 3)),
+                   BSpline and partial(fitting.interpolate_surface, flat, size, size, 3, 3))
+        curves = [random_curve(rng, size, 3, False) for _ in range(size)]
+        yield Case("Surface.loft_from_curves {} curves of {} points".format(size, size),
+                   partial(Surface.loft_from_curves, curves), None)
+
+
+def measure(function, repeat):
+    """Returns the best time of ``repeat`` runs and the peak memory of another run."""
+    function()  # warm up, e.g. the lazy imports
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(seconds), peak
+
+
+def cases(quick=False):
+    rng = np.random.default_rng(0)
+    if quick:
+        return [list(curve_cases(rng, [100], [3])), list(surface_cases(rng, [10], [8])), list(fitting_cases(rng, [20], [8]))]
+    return [list(curve_cases(rng, [100, 10000], [2, 3, 5])),
+            list(surface_cases(rng, [10, 50], [8, 32])),
+            list(fitting_cases(rng, [20, 200], [8, 24]))]
+
+
+def format_row(name, compas, reference, baseline):
+    seconds, peak = compas
+    row = "{:<62} {:>10.3f} {:>10.1f}".format(name, seconds * 1e3, peak / 1e3)
+    if reference:
+        row += " {:>10.3f} {:>10.1f} {:>8.1f}x".format(reference[0] * 1e3, reference[1] / 1e3, reference[0] / seconds)
+    else:
+        row += " {:>10} {:>10} {:>9}".format('-', '-', '-')
+    if baseline:
+        row += " {:>8.2f}x".format(seconds / baseline[0])
+    return row
+
+
+def main(quick=False, repeat=3, pattern=None, output=None, baseline=None):
+    if baseline:
+        with open(baseline) as f:
+            baseline = json.load(f)
+    else:
+        baseline = {}
+    results = {}
+    header = "{:<62} {:>10} {:>10} {:>10} {:>10} {:>9}".format('case', 'ms', 'peak kB', 'geomdl ms', 'peak kB', 'speedup')
+    if baseline:
+        header += " {:>9}".format('baseline')
+    if BSpline is None:
+        print("geomdl is not installed, the reference is skipped.")
+    for group in cases(quick):
+        group = [case for case in group if not pattern or pattern in case.name]
+        if not group:
+            continue
+        print(header)
+        for case in group:
+            compas = measure(case.compas, repeat)
+            reference = measure(case.reference, repeat) if case.reference else None
+            results[case.name] = {'compas': compas, 'geomdl': reference}
+            print(format_row(case.name, compas, reference, baseline.get(case.name, {}).get('compas')))
+        print()
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=1)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="only the smallest cases, e.g. as a smoke test")
+    parser.add_argument('--repeat', type=int, default=3, help="the number of timed runs per case")
+    parser.add_argument('--filter', dest='pattern', help="only the cases whose name contains the text")
+    parser.add_argument('--output', help="a JSON file to save the results to")
+    parser.add_argument('--baseline', help="the JSON file of an earlier run to compare the times with")
+    main(**vars(parser.parse_args()))
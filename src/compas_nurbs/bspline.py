@@ -1,32 +1,68 @@
 import compas
 from compas.geometry import Geometry
+from compas.geometry import bounding_box
 
+from compas_nurbs.helpers import EPSILON
 from compas_nurbs.knot_vectors import check_knot_vector
 from compas_nurbs.knot_vectors import knot_vector_uniform
 from compas_nurbs.knot_vectors import normalize_knot_vector
 from compas_nurbs.utilities import prod
+from compas_nurbs.utilities import readonly
 from compas_nurbs.utilities import reshape
 
 if not compas.IPY:
     from collections.abc import Iterable
 
     import numpy as np
-    from compas.geometry import transform_points_numpy
+    from compas_nurbs.knot_vectors import check_knot_vector_numpy
+    from compas_nurbs.knot_vectors import knot_vector_uniform_numpy
+    from compas_nurbs.knot_vectors import normalize_knot_vector_numpy
 else:
     from collections import Iterable
 
 
+def _homogeneous(points, weights):
+    """Returns contiguous homogeneous coordinates ``(w * x, w * y, w * z, w)``."""
+    weights = weights[..., np.newaxis]
+    return np.ascontiguousarray(np.concatenate((points * weights, weights), axis=-1))
+
+
+def _all_ones(values):
+    """Checks whether all (nested) weights are one, without numpy."""
+    return all(_all_ones(value) if isinstance(value, Iterable) else value == 1 for value in values)
+
+
+def _as_list(values):
+    """Converts arrays, e.g. of geometry constructed from arrays, to (nested) lists."""
+    return values.tolist() if hasattr(values, 'tolist') else values
+
+
 class BSpline(Geometry):
     """A base class for rational and non-rational B-Spline geometry.
 
     Contains all setters and checkers.
+
+    The control points are stored in one contiguous float64 array, of shape
+    ``(n, 3)`` for curves and ``(n, m, 3)`` for surfaces, or in homogeneous
+    coordinates ``(w * x, w * y, w * z, w)`` if the geometry is rational, and
+    the knot vectors are stored as float64 arrays. The properties return
+    read-only views of these arrays, use the setters to change the geometry.
+
+    Under IronPython, without numpy, the control points, weights and knot
+    vectors are kept as the (nested) lists they are set to, so the geometry
+    can be constructed, serialized and drawn, but not evaluated.
     """
 
+    __slots__ = ('degree', '__rational', '__pdim', '_point_array', '_pending', '_knot_vector', '_weights', '_cache')
+    _rational_default = False  # of from_arrays, the rational subclasses are always rational
+
     def __init__(self, control_points, degree, knot_vector, rational, weights=None):
         super(BSpline, self).__init__()
         self.degree = degree  # (degree_u, degree_v) for surfaces
         self.__rational = rational
         self.__pdim = len(degree) if isinstance(degree, Iterable) else 1
+        self._point_array = None
+        self._pending = None  # a transformation which is applied on first use, see transform
         self.control_points = control_points  # 2d for surfaces
         self.knot_vector = knot_vector  # (knotvector_u, knotvector_v) for surfaces
         self.weights = weights  # 2d for surfaces
@@ -35,6 +71,108 @@ class BSpline(Geometry):
     def _build_backend(self):  # needs to be overwritten by derivative classes
         raise NotImplementedError
 
+    @classmethod
+    def from_arrays(cls, control_points, degree, knot_vector=None, weights=None, rational=None, validate=False):
+        """Constructs the geometry directly from arrays, e.g. the results of other operations.
+
+        Unlike the default constructor, the arrays are stored as they are: the
+        knot vectors are neither checked nor normalized, and contiguous float64
+        arrays are not copied, so there is no work per control point unless
+        the geometry is rational.
+
+        Parameters
+        ----------
+        control_points : :class:`numpy.array`
+            The control points, of shape ``(n, 3)`` for curves and ``(n, m, 3)`` for surfaces.
+        degree : int or tuple of int
+            The degree, one per direction for surfaces.
+        knot_vector : :class:`numpy.array` or tuple of :class:`numpy.array`, optional
+            The knot vector(s), normalized to the domain [0, 1]. Defaults to uniform knot vectors.
+        weights : :class:`numpy.array`, optional
+            The weights of the control points.
+        rational : bool, optional
+            Defaults to ``True`` if weights are given or the class is rational,
+            e.g. :class:`RationalCurve`. The weights default to ones.
+        validate : bool, optional
+            If ``True``, the arrays are checked with :meth:`validate`. Defaults to ``False``.
+
+        Returns
+        -------
+        :class:`BSpline`
+
+        Examples
+        --------
+        >>> points = np.array([(0, 0, 0), (1, 2, 0), (2, -1, 0), (3, 0, 0)])
+        >>> curve = Curve.from_arrays(points, 3, np.array([0, 0, 0, 0, 1, 1, 1, 1.]))
+        >>> allclose(curve.points_at([0.5]), Curve(points.tolist(), 3).points_at([0.5]))
+        True
+        """
+        rational = (weights is not None or cls._rational_default) if rational is None else rational
+        points = np.ascontiguousarray(control_points, dtype=float)
+        if not rational and weights is not None and np.any(np.asarray(weights) != 1):
+            raise ValueError("Invalid weights! The weights of non-rational geometry must be ones.")
+        if rational:
+            count = points.shape[:-1]
+            weights = np.ones(count) if weights is None else np.asarray(weights, dtype=float)
+            points = _homogeneous(points, weights)
+        return cls._from_point_array(points, degree, knot_vector, rational, validate)
+
+    @classmethod
+    def _from_point_array(cls, points, degree, knot_vector=None, rational=False, validate=False):
+        """Constructs the geometry from the array it stores, in homogeneous coordinates if rational.
+
+        The array is stored as it is, e.g. a (read-only) view into a buffer.
+        """
+        bspline = cls.__new__(cls)
+        super(BSpline, bspline).__init__()
+        pdim = len(degree) if isinstance(degree, Iterable) else 1
+        bspline.degree = degree
+        bspline.__rational = rational
+        bspline.__pdim = pdim
+        bspline._cache = {}
+        bspline._point_array = points
+        bspline._pending = None
+        count = points.shape[:pdim]
+        if pdim == 1:
+            if knot_vector is None:
+                knot_vector = knot_vector_uniform_numpy(count[0], degree)
+            bspline._knot_vector = np.asarray(knot_vector, dtype=float)
+        else:
+            if knot_vector is None:
+                knot_vector = [knot_vector_uniform_numpy(c, d) for c, d in zip(count, degree)]
+            bspline._knot_vector = [np.asarray(kv, dtype=float) for kv in knot_vector]
+        if validate:
+            bspline.validate()
+        bspline._build_backend()
+        return bspline
+
+    def validate(self):
+        """Checks the control points, knot vectors and weights.
+
+        Raises
+        ------
+        ValueError
+            If the shape of the control points or weights does not match, or
+            a knot vector is invalid or not normalized to the domain [0, 1].
+        """
+        if self.__pdim == 1:
+            counts, degrees, knot_vectors = [self.count], [self.degree], [self.knot_vector]
+        else:
+            counts, degrees, knot_vectors = self.count, self.degree, self.knot_vector
+        if self._points.ndim != self.__pdim + 1 or len(degrees) != len(counts):
+            raise ValueError("Invalid control points")
+        if len(knot_vectors) != len(counts):
+            raise ValueError("Invalid knot vector")
+        for count, degree, knot_vector in zip(counts, degrees, knot_vectors):
+            if count < degree + 1:
+                raise ValueError("Invalid control points")
+            if not check_knot_vector_numpy(knot_vector, count, degree):
+                raise ValueError("Invalid knot vector")
+            if abs(knot_vector[0]) > EPSILON or abs(knot_vector[-1] - 1.) > EPSILON:
+                raise ValueError("The knot vector must be normalized to the domain [0, 1].")
+        if self.rational and np.any(self._points[..., -1] <= 0):
+            raise ValueError("Invalid weights! There must be one positive weight per control point.")
+
     @property
     def rational(self):
         return self.__rational
@@ -46,15 +184,66 @@ class BSpline(Geometry):
         else:
             return [[0.0, 1.0] for _ in range(self.__pdim)]
 
+    @property
+    def _points(self):
+        """:class:`numpy.array` : The stored control points, with pending transformations applied."""
+        if self._pending is not None:
+            from compas_nurbs.operations import transform_point_array
+            points = self._point_array
+            points = transform_point_array(points.reshape(-1, points.shape[-1]), self._pending, self.__rational)
+            self._point_array = points.reshape(self._point_array.shape)
+            self._pending = None
+        return self._point_array
+
+    def _set_point_array(self, points):
+        """Replaces the stored control points, without checks, and resets derived data."""
+        self._cache = {}
+        self._point_array = points
+        self._pending = None
+
     @property
     def control_points(self):
-        return self._control_points
+        """:class:`numpy.array` : Read-only view of the control points, of shape ``(n, 3)`` or ``(n, m, 3)``."""
+        if compas.IPY:
+            return self._point_array
+        if not self.__rational:
+            return readonly(self._points)
+        if 'control_points' not in self._cache:
+            self._cache['control_points'] = readonly(self._points[..., :-1] / self._points[..., -1:])
+        return self._cache['control_points']
 
     @control_points.setter
     def control_points(self, control_points):
-        self._control_points = control_points
+        self._cache = {}  # derived data, e.g. bezier segments, is cached until the geometry changes
+        if compas.IPY:
+            self._set_point_list(control_points)
+            return
+        points = np.array(control_points, dtype=float)
+        if self.__pdim == 1:
+            if len(points) < self.degree + 1:
+                raise ValueError("len(control_points) must be >= degree + 1")
+            if points.ndim != 2:
+                raise ValueError("Invalid control points")
+        else:
+            count = points.shape[:-1]
+            ok1 = points.ndim == self.__pdim + 1 and len(self.degree) == len(count)
+            ok2 = ok1 and all([c >= d + 1 for c, d in zip(count, self.degree)])
+            if not all([ok1, ok2]):
+                raise ValueError("Invalid control points")
+        if self.__rational:
+            # keep the weights if the number of control points did not change
+            if self._points is not None and self._points.shape[:-1] == points.shape[:-1]:
+                weights = self._points[..., -1]
+            else:
+                weights = np.ones(points.shape[:-1])
+            points = _homogeneous(points, weights)
+        self._set_point_array(points)
+
+    def _set_point_list(self, control_points):
+        """Stores the control points as they are, under IronPython."""
+        self._point_array = control_points
         if self.__pdim == 1:
-            if len(self.control_points) < self.degree + 1:
+            if len(control_points) < self.degree + 1:
                 raise ValueError("len(control_points) must be >= degree + 1")
         else:
             ok1 = len(self.degree) == len(self.count)
@@ -64,31 +253,62 @@ class BSpline(Geometry):
 
     @property
     def count(self):
-        if self.__pdim == 1:
-            return len(self.control_points)
-        else:
-            a, c = self.control_points, []  # lambda?
+        if compas.IPY:
+            a, c = self._point_array, []
             for _ in range(self.__pdim):
                 c.append(len(a))
                 a = a[0]
-            return c
+            return c[0] if self.__pdim == 1 else c
+        if self.__pdim == 1:
+            return self._point_array.shape[0]
+        else:
+            return list(self._point_array.shape[:self.__pdim])
 
     @property
     def knot_vector(self):
-        """list of float : The knot vector"""
-        return self._knot_vector
+        """:class:`numpy.array` : Read-only view of the knot vector, one per direction for surfaces."""
+        if compas.IPY:
+            return self._knot_vector
+        if self.__pdim == 1:
+            return readonly(self._knot_vector)
+        return [readonly(kv) for kv in self._knot_vector]
 
     @knot_vector.setter
     def knot_vector(self, knot_vector):
+        self._cache = {}
+        if compas.IPY:
+            self._set_knot_list(knot_vector)
+            return
+        if self.__pdim == 1:
+            if knot_vector is not None and len(knot_vector):
+                knot_vector = np.array(knot_vector, dtype=float)
+                if not check_knot_vector_numpy(knot_vector, self.count, self.degree):
+                    raise ValueError("Invalid knot vector")
+                self._knot_vector = normalize_knot_vector_numpy(knot_vector)
+            else:
+                self._knot_vector = knot_vector_uniform_numpy(self.count, self.degree)
+        else:
+            if knot_vector is not None and len(knot_vector):
+                knot_vector = [np.array(kv, dtype=float) for kv in knot_vector]
+                ok1 = all([check_knot_vector_numpy(kv, c, d) for kv, c, d in zip(knot_vector, self.count, self.degree)])
+                ok2 = len(knot_vector) == len(self.count)
+                if not all([ok1, ok2]):
+                    raise ValueError("Invalid knot vector")
+                self._knot_vector = [normalize_knot_vector_numpy(kv) for kv in knot_vector]
+            else:
+                self._knot_vector = [knot_vector_uniform_numpy(c, d) for c, d in zip(self.count, self.degree)]
+
+    def _set_knot_list(self, knot_vector):
+        """Stores the knot vectors as lists, under IronPython."""
         if self.__pdim == 1:
-            if knot_vector:
+            if knot_vector is not None and len(knot_vector):
                 if not check_knot_vector(knot_vector, self.count, self.degree):
                     raise ValueError("Invalid knot vector")
                 self._knot_vector = normalize_knot_vector(knot_vector)
             else:
                 self._knot_vector = knot_vector_uniform(self.count, self.degree)
         else:
-            if knot_vector:
+            if knot_vector is not None and len(knot_vector):
                 ok1 = all([check_knot_vector(kv, c, d) for kv, c, d in zip(knot_vector, self.count, self.degree)])
                 ok2 = len(knot_vector) == len(self.count)
                 if not all([ok1, ok2]):
@@ -99,36 +319,109 @@ class BSpline(Geometry):
 
     @property
     def weights(self):
-        return self._weights
+        """:class:`numpy.array` : Read-only view of the weights, ones if the geometry is not rational."""
+        if compas.IPY:
+            return self._weights
+        if self.__rational:
+            return readonly(self._points[..., -1])
+        if 'weights' not in self._cache:
+            self._cache['weights'] = readonly(np.ones(self._point_array.shape[:-1]))
+        return self._cache['weights']
 
     @weights.setter
     def weights(self, weights):
+        if compas.IPY:
+            if not self.__rational and weights is not None and not _all_ones(weights):
+                raise ValueError("Invalid weights! The weights of non-rational geometry must be ones.")
+            self._set_weight_list(weights)
+            return
+        count = self._point_array.shape[:-1]
+        if weights is not None and len(weights):
+            weights = np.array(weights, dtype=float)
+            if weights.shape != count:
+                raise ValueError("Invalid weights! Number of weights must be equal to number of control points.")
+            if not self.__rational and np.any(weights != 1):
+                raise ValueError("Invalid weights! The weights of non-rational geometry must be ones.")
+        else:
+            weights = np.ones(count)
+        if self.__rational:
+            self._set_point_array(_homogeneous(self.control_points, weights))
+        # the weights of non-rational geometry are always ones
+
+    def _set_weight_list(self, weights):
+        """Stores the weights as (nested) lists, under IronPython."""
+        self._cache = {}
         if self.__pdim == 1:
-            if weights:
+            if weights is not None and len(weights):
                 if len(weights) != self.count:
                     raise ValueError("Invalid weights! Number of weights must be equal to number of control points.")
-                else:
-                    self._weights = weights
+                self._weights = weights
             else:
                 self._weights = [1.0 for _ in range(self.count)]
         else:
-            if not weights:
+            if weights is None or not len(weights):
                 self._weights = reshape([1.0 for _ in range(prod(self.count))], self.count)
             else:
-                self._weights = weights  # TODO check
+                self._weights = weights
 
     # ==========================================================================
     # operations
     # ==========================================================================
 
-    def transform(self, transformation):
-        xyz = np.array(self.control_points)
-        xyz = transform_points_numpy(xyz.reshape(-1, xyz.shape[-1]), transformation)  # TODO more dimen?
-        self.control_points = xyz.reshape(self.count + [3])
-        self._build_backend()
+    def transform(self, transformation, lazy=False):
+        """Transforms the geometry.
+
+        The control points are transformed directly, in homogeneous coordinates
+        if the geometry is rational, without the checks of the setters.
+
+        Parameters
+        ----------
+        transformation : :class:`compas.geometry.Transformation`
+            The transformation, or a 4x4 matrix.
+        lazy : bool, optional
+            If ``True``, the transformation is composed with the pending ones
+            and only applied when the control points are used next, e.g. to
+            evaluate the geometry. Defaults to ``False``.
+
+        Examples
+        --------
+        >>> import math
+        >>> from compas.geometry import Rotation, Translation
+        >>> curve = Curve([(0, 0, 0), (1, 1, 0), (2, 0, 0)], 2)
+        >>> curve.transform(Translation.from_vector([1, 0, 0]), lazy=True)
+        >>> curve.transform(Rotation.from_axis_and_angle([0, 0, 1], math.pi / 2), lazy=True)
+        >>> allclose(curve.points_at([1.])[0], [0, 3, 0])
+        True
+
+        See Also
+        --------
+        :func:`compas_nurbs.operations.transform_geometries` to transform many geometries at once.
+        """
+        from compas_nurbs.operations import transform_point_array
+        from compas_nurbs.operations import transformation_matrices
+        matrix = transformation_matrices(transformation)
+        self._cache = {}
+        if lazy:
+            self._pending = matrix if self._pending is None else matrix.dot(self._pending)
+            return
+        points = self._points
+        points = transform_point_array(points.reshape(-1, points.shape[-1]), matrix, self.__rational)
+        self._set_point_array(points.reshape(self._point_array.shape))
 
     def get_bounding_box(self):
-        raise NotImplementedError
+        """Computes the axis-aligned bounding box of the control points, which contains the geometry.
+
+        Returns
+        -------
+        list of point
+            The eight corners of the box, see :func:`compas.geometry.bounding_box`.
+        """
+        points = self.control_points
+        if compas.IPY:
+            for _ in range(self.__pdim - 1):
+                points = [point for row in points for point in row]
+            return bounding_box(points)
+        return bounding_box([points.reshape(-1, 3).min(axis=0), points.reshape(-1, 3).max(axis=0)])
 
     def trim(self):
         raise NotImplementedError
@@ -146,7 +439,13 @@ class BSpline(Geometry):
     @property
     def data(self):
         """dict: The data dictionary that represents the bspline geometry."""
-        return {"control_points": self.control_points, "degree": self.degree, "knot_vector": self.knot_vector, "rational": self.rational, "weights": self.weights}
+        knot_vector = self.knot_vector
+        if self.__pdim == 1:
+            knot_vector = _as_list(knot_vector)
+        else:
+            knot_vector = [_as_list(kv) for kv in knot_vector]
+        return {"control_points": _as_list(self.control_points), "degree": self.degree, "knot_vector": knot_vector,
+                "rational": self.rational, "weights": _as_list(self.weights)}
 
     @classmethod
     def from_data(cls, data):
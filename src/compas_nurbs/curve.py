@@ -6,15 +6,12 @@ from compas.geometry import Frame
 
 from compas_nurbs.bspline import BSpline
 from compas_nurbs.curvature import CurveCurvature
+from compas_nurbs.helpers import EPSILON
+from compas_nurbs.knot_vectors import CurveKnotStyle
+from compas_nurbs.utilities import readonly
 
 if not compas.IPY:
-    from compas_nurbs.evaluators import create_curve
-    from compas_nurbs.evaluators import evaluate_curve
-    from compas_nurbs.evaluators import evaluate_curve_derivatives
-    from compas_nurbs.operations import curve_tangents
-    from compas_nurbs.operations import curve_frames
-    from compas_nurbs.operations import curve_curvatures
-    from compas_nurbs.fitting import interpolate_curve
+    from compas_nurbs.knot_vectors import normalize_knot_vector_numpy
 
 
 class Curve(BSpline):
@@ -48,12 +45,21 @@ class Curve(BSpline):
     >>> curve = Curve(control_points, degree, knot_vector)
     """
 
+    __slots__ = ()
+
     def __init__(self, control_points, degree, knot_vector=None, rational=False, weights=None):
         super(Curve, self).__init__(control_points, degree, knot_vector, rational, weights)
 
     def _build_backend(self):
-        if not compas.IPY:
-            self._curve = create_curve(self.control_points, self.degree, self.knot_vector, self.rational, self.weights)
+        pass  # the backend is created on first use, see _curve
+
+    @property
+    def _curve(self):
+        """:class:`scipy.interpolate.BSpline` : The evaluation backend, cached until the geometry changes."""
+        if 'backend' not in self._cache:
+            from compas_nurbs.evaluators import create_curve
+            self._cache['backend'] = create_curve(self._points, self.degree, self._knot_vector)
+        return self._cache['backend']
 
     # ==========================================================================
     # constructors
@@ -88,9 +94,85 @@ class Curve(BSpline):
         >>> curve = Curve.from_points(points, 3, knot_style=0)
 
         """
+        from compas_nurbs.fitting import interpolate_curve
         cpts, kv = interpolate_curve(points, degree, knot_style, start_derivative, end_derivative, periodic)
         return cls(cpts, degree, kv)
 
+    @classmethod
+    def from_points_batch(cls, point_sets, degree, knot_style=0):
+        """Constructs interpolated curves through many sets of points at once.
+
+        Point sets of the same size and parameters share one factorization of
+        the coefficient matrix, see :func:`compas_nurbs.fitting.batch_curve_interpolation`.
+
+        Parameters
+        ----------
+        point_sets : list of list of point
+            The sets of points to interpolate.
+        degree : int
+            The degree of the output parametric curves.
+        knot_style : int, optional
+            The knot style, either 0, 1, or 2 [uniform, chord, or chord_square_root].
+            Defaults to 0, uniform.
+
+        Returns
+        -------
+        list of :class:`Curve`
+            The interpolated curves, in the order of the point sets.
+
+        Examples
+        --------
+        >>> point_sets = [[(0, 0, 0), (3, 4, 0), (-1, 4, 0), (-4, 0, 0)], [(0, 0, 1), (3, 4, 1), (-1, 4, 1), (-4, 0, 1)]]
+        >>> curves = Curve.from_points_batch(point_sets, 3)
+        >>> len(curves)
+        2
+        """
+        from compas_nurbs.fitting import batch_curve_interpolation
+        if knot_style not in [CurveKnotStyle.Uniform, CurveKnotStyle.Chord, CurveKnotStyle.ChordSquareRoot]:
+            raise ValueError("Please pass a valid knot style: [0, 1, 2].")
+        return [cls(cpts, degree, kv) for cpts, kv in batch_curve_interpolation(point_sets, degree, knot_style)]
+
+    @classmethod
+    def from_points_approx(cls, points, degree, num_control_points=None, tolerance=None, knot_style=0, corrections=0):
+        """Constructs a curve approximating the points in the least-squares sense.
+
+        The curve starts at the first and ends at the last point. Pass either
+        the number of control points, or a tolerance for which the smallest
+        sufficient number of control points is searched.
+
+        Parameters
+        ----------
+        points : list of point
+            The points to approximate.
+        degree : int
+            The degree of the output parametric curve.
+        num_control_points : int, optional
+            The number of control points of the curve.
+        tolerance : float, optional
+            The maximum distance between the points and the curve.
+        knot_style : int, optional
+            The knot style, either 0, 1, or 2 [uniform, chord, or chord_square_root].
+            Defaults to 0, uniform.
+        corrections : int, optional
+            The number of parameter correction iterations. Defaults to 0.
+
+        Returns
+        -------
+        tuple (:class:`Curve`, float)
+            The approximating curve and the maximum distance between the points
+            and the curve at their parameters.
+
+        Examples
+        --------
+        >>> points = [(0, 0, 0), (1, 1.1, 0), (2, 1.9, 0), (3, 3.05, 0), (4, 4, 0)]
+        >>> curve, error = Curve.from_points_approx(points, 1, num_control_points=2)
+        >>> curve.count, round(error, 2)
+        (2, 0.1)
+        """
+        from compas_nurbs.fitting import approximate_curve
+        cpts, kv, error = approximate_curve(points, degree, num_control_points, tolerance, knot_style, corrections)
+        return cls(cpts.tolist(), degree, kv), error
+
     # ==========================================================================
     # evaluate
     # ==========================================================================
@@ -113,6 +195,7 @@ class Curve(BSpline):
         >>> curve.points_at([0.0, 0.5, 1.0])
         [Point(0.000, 0.000, 0.000), Point(-0.750, 3.000, 0.000), Point(-4.000, -3.000, 0.000)]
         """
+        from compas_nurbs.evaluators import evaluate_curve
         points = evaluate_curve(self, params)
         return [Point(*p) for p in points]
 
@@ -133,6 +216,7 @@ class Curve(BSpline):
         >>> curve.tangents_at([0.0, 0.5, 1.0])
         [Vector(0.600, 0.800, 0.000), Vector(-0.868, -0.496, 0.000), Vector(0.000, -1.000, 0.000)]
         """
+        from compas_nurbs.operations import curve_tangents
         derivatives = self.derivatives_at(params, order=1)
         tangents = curve_tangents(derivatives)
         return [Vector(*v) for v in tangents]
@@ -157,6 +241,8 @@ class Curve(BSpline):
         >>> curvature.osculating_circle
         Circle(Plane(Point(2.297, -2.332, 0.000), Vector(0.000, 0.000, 1.000)), 6.141172894211785)
         """
+        from compas_nurbs.operations import curve_frames
+        from compas_nurbs.operations import curve_curvatures
         derivatives = self.derivatives_at(params, order=2)
         curvatures = curve_curvatures(derivatives)
         points, tangents, normals = curve_frames(derivatives)
@@ -179,6 +265,7 @@ class Curve(BSpline):
         >>> curve.frames_at([0.5])
         [Frame(Point(-0.750, 3.000, 0.000), Vector(-0.868, -0.496, 0.000), Vector(0.496, -0.868, 0.000))]
         """
+        from compas_nurbs.operations import curve_frames
         derivatives = self.derivatives_at(params, order=2)
         points, tangents, normals = curve_frames(derivatives)
         return [Frame(pt, xaxis, yaxis) for pt, xaxis, yaxis in zip(points, tangents, normals)]  # this takes a lot of time!
@@ -213,6 +300,7 @@ class Curve(BSpline):
                 [-10.5 ,  -6.  ,   0.  ],
                 [  6.  , -24.  ,   0.  ]]])
         """
+        from compas_nurbs.evaluators import evaluate_curve_derivatives
         return evaluate_curve_derivatives(self, params, order=order)
 
     # ==========================================================================
@@ -236,10 +324,193 @@ class Curve(BSpline):
         self.weights = list(reversed(self.weights))
         self._build_backend()
 
+    def insert_knots(self, knots):
+        """Inserts knots into the curve without changing its shape.
+
+        Parameters
+        ----------
+        knots : list of float
+            The knots to insert, within the domain.
+
+        Returns
+        -------
+        :class:`Curve`
+            A new curve with the knots inserted.
+
+        Examples
+        --------
+        >>> refined = curve.insert_knots([0.25, 0.5, 0.5])
+        >>> refined.count
+        8
+        >>> allclose(refined.points_at([0.3, 0.6]), curve.points_at([0.3, 0.6]))
+        True
+        """
+        from compas_nurbs.operations import curve_insert_knots
+        return self._derive(*curve_insert_knots(self, knots))
+
+    def split(self, params):
+        """Splits the curve at the parameters.
+
+        All pieces are obtained from a single knot insertion.
+
+        Parameters
+        ----------
+        params : list of float
+            The split parameters. Parameters at the ends of the domain are ignored.
+
+        Returns
+        -------
+        list of :class:`Curve`
+            The pieces, each with a normalized knot vector.
+
+        Examples
+        --------
+        >>> pieces = curve.split([0.25, 0.5])
+        >>> len(pieces)
+        3
+        >>> allclose(pieces[1].points_at([0.0, 1.0]), curve.points_at([0.25, 0.5]))
+        True
+        """
+        from compas_nurbs.operations import curve_split
+        return [self._derive(*piece) for piece in curve_split(self, params)]
+
+    def trim(self, t0, t1):
+        """Trims the curve to the parameter interval [t0, t1].
+
+        Parameters
+        ----------
+        t0 : float
+            The start parameter.
+        t1 : float
+            The end parameter.
+
+        Returns
+        -------
+        :class:`Curve`
+            The trimmed curve, with a normalized knot vector.
+
+        Examples
+        --------
+        >>> trimmed = curve.trim(0.2, 0.6)
+        >>> allclose(trimmed.points_at([0.5]), curve.points_at([0.4]))
+        True
+        """
+        if not t0 < t1:
+            raise ValueError("t0 must be smaller than t1")
+        pieces = self.split([t0, t1])
+        return pieces[1] if t0 > EPSILON else pieces[0]
+
+    def elevate_degree(self, degree):
+        """Raises the degree of the curve without changing its shape.
+
+        Parameters
+        ----------
+        degree : int
+            The new degree, larger than or equal to the current degree.
+
+        Returns
+        -------
+        :class:`Curve`
+            A new curve of the higher degree.
+
+        Examples
+        --------
+        >>> elevated = curve.elevate_degree(5)
+        >>> elevated.degree, elevated.count
+        (5, 9)
+        >>> allclose(elevated.points_at([0.3, 0.6]), curve.points_at([0.3, 0.6]))
+        True
+        """
+        from compas_nurbs.operations import curve_elevate_degree
+        return self._derive(*curve_elevate_degree(self, degree), degree=degree)
+
+    def remove_knots(self, tolerance=1e-6):
+        """Removes all knots that are not needed to represent the curve within a tolerance.
+
+        Parameters
+        ----------
+        tolerance : float, optional
+            The maximum deviation from the curve. Defaults to 1e-6.
+
+        Returns
+        -------
+        tuple (:class:`Curve`, float)
+            The reduced curve and its maximum deviation from the curve.
+
+        Examples
+        --------
+        >>> refined = curve.insert_knots([0.25, 0.5, 0.5])
+        >>> reduced, deviation = refined.remove_knots()
+        >>> reduced.count, deviation < 1e-6
+        (5, True)
+        """
+        from compas_nurbs.operations import curve_remove_knots
+        control_points, weights, knot_vector, deviation = curve_remove_knots(self, tolerance)
+        return self._derive(control_points, weights, knot_vector), deviation
+
+    def _derive(self, control_points, weights, knot_vector, degree=None):
+        """Creates a curve of the same type from arrays."""
+        degree = degree or self.degree
+        knot_vector = normalize_knot_vector_numpy(knot_vector)
+        if self.rational:
+            return RationalCurve.from_arrays(control_points, degree, knot_vector, weights=weights)
+        return Curve.from_arrays(control_points, degree, knot_vector)
+
     # ==========================================================================
     # queries
     # ==========================================================================
 
+    def intersect(self, other, tolerance=1e-6):
+        """Computes the intersections with another curve.
+
+        The curves are decomposed into Bezier segments, segment pairs with
+        disjoint bounding boxes are culled and the remaining pairs are
+        subdivided and refined with Newton iterations.
+
+        Parameters
+        ----------
+        other : :class:`Curve`
+            The curve to intersect with.
+        tolerance : float, optional
+            The distance below which the curves are considered intersecting.
+            Defaults to 1e-6.
+
+        Returns
+        -------
+        list of (float, float)
+            The parameter pairs ``(t_self, t_other)`` of the intersections.
+
+        Examples
+        --------
+        >>> other = Curve([(-5, 1, 0), (0, 2, 0), (5, 1, 0)], 2)
+        >>> [(round(s, 3), round(t, 3)) for s, t in curve.intersect(other)]
+        [(0.072, 0.6), (0.696, 0.238)]
+        """
+        from compas_nurbs.intersections import curve_curve_intersections
+        return curve_curve_intersections(self, other, tolerance)
+
+    def intersect_curves(self, curves, tolerance=1e-6):
+        """Computes the intersections with many curves at once.
+
+        The Bezier segments of all ``curves`` are collected in one shared
+        spatial index, so only overlapping segment pairs are examined.
+
+        Parameters
+        ----------
+        curves : list of :class:`Curve`
+            The curves to intersect with.
+        tolerance : float, optional
+            The distance below which the curves are considered intersecting.
+            Defaults to 1e-6.
+
+        Returns
+        -------
+        list of list of (float, float)
+            For each curve the parameter pairs ``(t_self, t_other)`` of the intersections.
+        """
+        from compas_nurbs.intersections import curve_curves_intersections
+        return curve_curves_intersections(self, curves, tolerance)
+
 
 class RationalCurve(Curve):
     """A non-uniform rational B-Spline curve (NURBS-Curve).
@@ -249,16 +520,19 @@ class RationalCurve(Curve):
     --------
     >>> control_points = [(0, 0, 0), (3, 4, 0), (-1, 4, 0), (-4, 0, 0), (-4, -3, 0)]
     >>> weights = [0.3, 0.2, 1., 0.4, 2.]
-    >>> curve = Curve(control_points, 3, weights=weights)
+    >>> curve = RationalCurve(control_points, 3, weights=weights)
     """
 
+    __slots__ = ()
+    _rational_default = True
+
     def __init__(self, control_points, degree, knot_vector=None, weights=None):
         super(RationalCurve, self).__init__(control_points, degree, knot_vector, rational=True, weights=weights)
 
     @property
     def weighted_control_points(self):
-        """The weighted control points."""
-        return [[w * x, w * y, w * z, w] for (x, y, z), w in zip(self.control_points, self.weights)]
+        """:class:`numpy.array` : Read-only view of the weighted control points ``(w * x, w * y, w * z, w)``."""
+        return readonly(self._points)
 
 
 if __name__ == '__main__':
@@ -2,22 +2,152 @@ import scipy
 import numpy as np
 from geomdl.linalg import binomial_coefficient
 
-from .helpers import find_spans
-from .helpers import basis_functions
-from .helpers import basis_functions_derivatives
+from .helpers import basis_function_derivatives
+from .utilities import readonly
+
+# ==============================================================================
+# basis
+# ==============================================================================
+
+
+def find_spans_numpy(knot_vector, number_of_control_points, params):
+    """Finds the knot spans of many parameters at once.
+
+    Vectorized version of :func:`compas_nurbs.helpers.find_spans`.
+    """
+    knot_vector = np.asarray(knot_vector, dtype=float)
+    degree = len(knot_vector) - number_of_control_points - 1
+    spans = np.searchsorted(knot_vector, params, side='right') - 1
+    return np.clip(spans, degree, number_of_control_points - 1)
+
+
+def basis_functions_numpy(degree, knot_vector, spans, params):
+    """Computes the non-vanishing basis functions for many parameters at once.
+
+    Vectorized version of Algorithm A2.2 from The NURBS Book by Piegl & Tiller,
+    the recursion only loops over the degree.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        An array of shape ``(len(params), degree + 1)``.
+    """
+    knot_vector = np.asarray(knot_vector, dtype=float)
+    params = np.asarray(params, dtype=float)
+    spans = np.asarray(spans)
+    N = np.ones((len(params), degree + 1))
+    left = np.zeros((len(params), degree + 1))
+    right = np.zeros((len(params), degree + 1))
+    for j in range(1, degree + 1):
+        left[:, j] = params - knot_vector[spans + 1 - j]
+        right[:, j] = knot_vector[spans + j] - params
+        saved = 0.0
+        for r in range(0, j):
+            temp = N[:, r] / (right[:, r + 1] + left[:, j - r])
+            N[:, r] = saved + right[:, r + 1] * temp
+            saved = left[:, j - r] * temp
+        N[:, j] = saved
+    return N
+
+
+def basis_functions_derivatives_numpy(degree, knot_vector, spans, params, order):
+    """Computes the derivatives of the basis functions for many parameters at once.
+
+    Vectorized version of Algorithm A2.3 from The NURBS Book by Piegl & Tiller,
+    the loops only run over the degree and the order.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        An array of shape ``(len(params), order + 1, degree + 1)``, derivatives
+        of an order higher than the degree are zero.
+    """
+    params = np.asarray(params, dtype=float)
+    spans = np.asarray(spans)
+    m = len(params)
+    if m == 1 and order <= degree:  # the scalar recursion has less overhead, e.g. for marching
+        ders = np.zeros((1, order + 1, degree + 1))
+        ders[0, :min(order, degree) + 1] = basis_function_derivatives(degree, knot_vector, int(spans[0]), float(params[0]), order)
+        return ders
+    knot_vector = np.asarray(knot_vector, dtype=float)
+    left = np.ones((m, degree + 1))
+    right = np.ones((m, degree + 1))
+    ndu = np.ones((m, degree + 1, degree + 1))
+
+    for j in range(1, degree + 1):
+        left[:, j] = params - knot_vector[spans + 1 - j]
+        right[:, j] = knot_vector[spans + j] - params
+        saved = 0.0
+        for r in range(0, j):
+            ndu[:, j, r] = right[:, r + 1] + left[:, j - r]
+            temp = ndu[:, r, j - 1] / ndu[:, j, r]
+            ndu[:, r, j] = saved + right[:, r + 1] * temp
+            saved = left[:, j - r] * temp
+        ndu[:, j, j] = saved
+
+    ders = np.zeros((m, order + 1, degree + 1))
+    ders[:, 0] = ndu[:, :, degree]
+
+    for r in range(0, degree + 1):
+        a = np.zeros((2, m, degree + 1))
+        a[0, :, 0] = 1.0
+        s1, s2 = 0, 1
+        for k in range(1, min(order, degree) + 1):
+            d = np.zeros(m)
+            rk = r - k
+            pk = degree - k
+            if r >= k:
+                a[s2, :, 0] = a[s1, :, 0] / ndu[:, pk + 1, rk]
+                d = a[s2, :, 0] * ndu[:, rk, pk]
+            j1 = 1 if rk >= -1 else -rk
+            j2 = k - 1 if (r - 1) <= pk else degree - r
+            for j in range(j1, j2 + 1):
+                a[s2, :, j] = (a[s1, :, j] - a[s1, :, j - 1]) / ndu[:, pk + 1, rk + j]
+                d = d + a[s2, :, j] * ndu[:, rk + j, pk]
+            if r <= pk:
+                a[s2, :, k] = -a[s1, :, k - 1] / ndu[:, pk + 1, r]
+                d = d + a[s2, :, k] * ndu[:, r, pk]
+            ders[:, k, r] = d
+            s1, s2 = s2, s1
+
+    factor = float(degree)
+    for k in range(1, min(order, degree) + 1):
+        ders[:, k] *= factor
+        factor *= (degree - k)
+    return ders
+
+
+def basis_matrix(degree, knot_vector, params, number_of_control_points):
+    """Returns the matrix of all basis functions evaluated at the parameters.
+
+    Parameters
+    ----------
+    degree : int
+    knot_vector : list of float
+    params : list of float
+    number_of_control_points : int
+
+    Returns
+    -------
+    :class:`numpy.array`
+        An array of shape ``(len(params), number_of_control_points)``.
+    """
+    spans = find_spans_numpy(knot_vector, number_of_control_points, params)
+    bases = basis_functions_numpy(degree, knot_vector, spans, params)
+    M = np.zeros((len(spans), number_of_control_points))
+    rows = np.arange(len(spans))[:, np.newaxis]
+    M[rows, spans[:, np.newaxis] - degree + np.arange(degree + 1)] = bases
+    return M
+
 
 # ==============================================================================
 # curve
 # ==============================================================================
 
 
-def create_curve(control_points, degree, knot_vector, rational, weights):
-    if not rational:
-        return scipy.interpolate.BSpline(knot_vector, control_points, degree)
-    else:
-        w = np.array([weights]).T
-        weighted_control_points = np.concatenate((w * control_points, w), axis=1)
-        return scipy.interpolate.BSpline(knot_vector, weighted_control_points, degree)
+def create_curve(control_points, degree, knot_vector):
+    """Creates the evaluation backend of a curve from its (weighted) control points."""
+    return scipy.interpolate.BSpline(knot_vector, control_points, degree)
 
 
 def evaluate_curve(curve, params):
@@ -55,7 +185,7 @@ def evaluate_curve_derivatives(curve, params, order=1):
     """
     derivatives = []
     for i in range(0, order + 1):
-        derivatives.append(curve._curve.derivative(i)(params))
+        derivatives.append(curve._curve(params, nu=i))
     derivatives = np.array(derivatives).transpose(1, 0, 2)
 
     if not curve.rational:
@@ -78,32 +208,35 @@ def evaluate_curve_derivatives(curve, params, order=1):
 # ==============================================================================
 
 
+def surface_control_point_array(surface):
+    """Returns the (weighted) control points of a surface as a read-only array.
+
+    This is a view of the array the surface stores its control points in.
+    """
+    return readonly(surface._points)
+
+
 def evaluate_surface(surface, params):
     """Evaluates a surface at the parameters.
     """
-    if surface.rational:
-        control_points = np.array(surface.weighted_control_points)
-    else:
-        control_points = np.array(surface.control_points)
+    control_points = surface_control_point_array(surface)
     degree_u, degree_v = surface.degree
     knot_vector_u, knot_vector_v = surface.knot_vector
     count_u, count_v = surface.count
 
-    params_u = [p[0] for p in params]
-    params_v = [p[1] for p in params]
+    params = np.asarray(params, dtype=float).reshape(-1, 2)
+    params_u, params_v = params[:, 0], params[:, 1]
 
-    spans_u = find_spans(knot_vector_u, count_u, params_u)
-    bases_u = basis_functions(degree_u, knot_vector_u, spans_u, params_u)
-    spans_v = find_spans(knot_vector_v, count_v, params_v)
-    bases_v = basis_functions(degree_v, knot_vector_v, spans_v, params_v)
+    spans_u = find_spans_numpy(knot_vector_u, count_u, params_u)
+    bases_u = basis_functions_numpy(degree_u, knot_vector_u, spans_u, params_u)
+    spans_v = find_spans_numpy(knot_vector_v, count_v, params_v)
+    bases_v = basis_functions_numpy(degree_v, knot_vector_v, spans_v, params_v)
 
-    points = []
-    for span_u, basis_u, span_v, basis_v in zip(spans_u, bases_u, spans_v, bases_v):
-        a = basis_v[:degree_v + 1]
-        b = control_points[span_u - degree_u:span_u + 1, span_v - degree_v:span_v + 1]
-        c = basis_u[:degree_u + 1]
-        points.append(np.dot(c, np.dot(a, b)))
-    points = np.array(points)
+    # gather the (degree_u + 1) x (degree_v + 1) control points of each param
+    iu = (spans_u - degree_u)[:, np.newaxis] + np.arange(degree_u + 1)
+    iv = (spans_v - degree_v)[:, np.newaxis] + np.arange(degree_v + 1)
+    b = control_points[iu[:, :, np.newaxis], iv[:, np.newaxis, :]]
+    points = np.einsum('nj,njk->nk', bases_v, np.einsum('ni,nijk->njk', bases_u, b))
 
     if not surface.rational:
         return points
@@ -112,57 +245,88 @@ def evaluate_surface(surface, params):
         return np.delete((1 / w * points), -1, axis=1)
 
 
-def evaluate_surface_derivatives(surface, params, order=1):
-    """
+def evaluate_surface_grid(surface, params_u, params_v):
+    """Evaluates a surface on the tensor grid of the parameters.
+
+    Parameters
+    ----------
+    surface : :class:`Surface`
+    params_u : list of float
+    params_v : list of float
+
+    Returns
+    -------
+    :class:`numpy.array`
+        An array of shape ``(len(params_u), len(params_v), 3)``.
     """
-    if surface.rational:
-        control_points = np.array(surface.weighted_control_points)
+    control_points = surface_control_point_array(surface)
+    degree_u, degree_v = surface.degree
+    knot_vector_u, knot_vector_v = surface.knot_vector
+    count_u, count_v = surface.count
+    Nu = basis_matrix(degree_u, knot_vector_u, params_u, count_u)
+    Nv = basis_matrix(degree_v, knot_vector_v, params_v, count_v)
+    points = np.einsum('ui,ijk,vj->uvk', Nu, control_points, Nv)
+    if not surface.rational:
+        return points
     else:
-        control_points = np.array(surface.control_points)
+        return points[..., :-1] / points[..., -1:]
+
+
+def evaluate_surface_derivatives(surface, params, order=1):
+    """Evaluates the n-th order derivatives of a surface at the parameters.
+
+    Parameters
+    ----------
+    surface : :class:`Surface`
+    params : list of (u, v)
+        The parameters to evaluate in the [0, 1] domain.
+    order : int
+        The derivative order.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        An array of shape ``(len(params), order + 1, order + 1, 3)``, where
+        ``[:, k, l]`` is the k-th derivative in u and the l-th derivative in v.
+    """
+    control_points = surface_control_point_array(surface)
 
     degree_u, degree_v = surface.degree
     knot_vector_u, knot_vector_v = surface.knot_vector
     count_u, count_v = surface.count
 
-    params_u = [p[0] for p in params]
-    params_v = [p[1] for p in params]
+    params = np.asarray(params, dtype=float).reshape(-1, 2)
+    params_u, params_v = params[:, 0], params[:, 1]
 
-    spans_u = find_spans(knot_vector_u, count_u, params_u)
-    bases_u = basis_functions_derivatives(degree_u, knot_vector_u, spans_u, params_u, order)
-    spans_v = find_spans(knot_vector_v, count_v, params_v)
-    bases_v = basis_functions_derivatives(degree_v, knot_vector_v, spans_v, params_v, order)
+    spans_u = find_spans_numpy(knot_vector_u, count_u, params_u)
+    bases_u = basis_functions_derivatives_numpy(degree_u, knot_vector_u, spans_u, params_u, order)
+    spans_v = find_spans_numpy(knot_vector_v, count_v, params_v)
+    bases_v = basis_functions_derivatives_numpy(degree_v, knot_vector_v, spans_v, params_v, order)
 
-    dv = min(degree_v, order)
-    derivatives = []
-    for span_u, basis_u, span_v, basis_v in zip(spans_u, bases_u, spans_v, bases_v):
-        b = control_points[span_u - degree_u:span_u + 1, span_v - degree_v:span_v + 1]
-        temp = np.dot(b.T, np.array(basis_u).T).T
-        dd = min(order, dv)
-        SKL = np.dot(np.array(basis_v[:dd + 1]), temp[:degree_v + 1]).transpose(1, 0, 2)
-        derivatives.append(SKL)
+    iu = (spans_u - degree_u)[:, np.newaxis] + np.arange(degree_u + 1)
+    iv = (spans_v - degree_v)[:, np.newaxis] + np.arange(degree_v + 1)
+    b = control_points[iu[:, :, np.newaxis], iv[:, np.newaxis, :]]
+    derivatives = np.einsum('nlj,nkjd->nkld', bases_v, np.einsum('nki,nijd->nkjd', bases_u, b))
 
     if not surface.rational:
-        return np.array(derivatives)
+        return derivatives
     else:
-        # TODO: numpify this!
-        D = []
-        for SKLw in derivatives:
-            dimension = 4
-            SKL = [[[0.0 for _ in range(dimension)] for _ in range(order + 1)] for _ in range(order + 1)]
-            for k in range(0, order + 1):
-                for l in range(0, order + 1):  # noqa E741
-                    v = list(SKLw[k, l])[:]
+        # Algorithm A4.4, vectorized over the parameters
+        Aders, wders = derivatives[..., :-1], derivatives[..., -1:]
+        SKL = np.zeros(Aders.shape)
+        for k in range(0, order + 1):
+            for l in range(0, order + 1):  # noqa E741
+                v = Aders[:, k, l].copy()
+                for j in range(1, l + 1):
+                    v -= binomial_coefficient(l, j) * wders[:, 0, j] * SKL[:, k, l - j]
+                for i in range(1, k + 1):
+                    v -= binomial_coefficient(k, i) * wders[:, i, 0] * SKL[:, k - i, l]
+                    v2 = np.zeros(v.shape)
                     for j in range(1, l + 1):
-                        v[:] = [tmp - (binomial_coefficient(l, j) * SKLw[0][j][-1] * drv) for tmp, drv in zip(v, SKL[k][l - j])]
-                    for i in range(1, k + 1):
-                        v[:] = [tmp - (binomial_coefficient(k, i) * SKLw[i][0][-1] * drv) for tmp, drv in zip(v, SKL[k - i][l])]
-                        v2 = [0.0 for _ in range(dimension - 1)]
-                        for j in range(1, l + 1):
-                            v2[:] = [tmp + (binomial_coefficient(l, j) * SKLw[i][j][-1] * drv) for tmp, drv in zip(v2, SKL[k - i][l - j])]
-                        v[:] = [tmp - (binomial_coefficient(k, i) * tmp2) for tmp, tmp2 in zip(v, v2)]
-                    SKL[k][l][:] = [tmp / SKLw[0][0][-1] for tmp in v[0:(dimension - 1)]]
-            D.append(SKL)
-        return np.array(D)
+                        v2 += binomial_coefficient(l, j) * wders[:, i, j] * SKL[:, k - i, l - j]
+                    v -= binomial_coefficient(k, i) * v2
+                SKL[:, k, l] = v / wders[:, 0, 0]
+        return SKL
 
 
 def calculate_surface_curvature(derivatives, order=False):
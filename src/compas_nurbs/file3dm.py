@@ -0,0 +1,177 @@
+import numpy as np
+import rhino3dm
+
+from .curve import Curve
+from .curve import RationalCurve
+from .knot_vectors import normalize_knot_vector_numpy
+from .operations import knot_clamp
+from .surface import RationalSurface
+from .surface import Surface
+
+# rhino3dm control points are homogeneous ``(w * x, w * y, w * z, w)``, like the
+# point arrays of rational geometry, and the knot vectors lack the first and last knot.
+
+
+def _knot_vector(knots):
+    """Returns the knot vector of a rhino3dm knot list, padded with the end knots."""
+    knots = knots.ToList()
+    return np.array((knots[0],) + tuple(knots) + (knots[-1],))
+
+
+def _point_array(points, rational):
+    return points if rational else np.ascontiguousarray(points[..., :3])
+
+
+def curve_from_rhino3dm(curve):
+    """Converts a rhino3dm curve into a :class:`Curve` or :class:`RationalCurve`.
+
+    Curves with unclamped knot vectors, e.g. periodic curves, are clamped
+    at the ends of their domain, which is mapped to [0, 1].
+
+    Parameters
+    ----------
+    curve : :class:`rhino3dm.Curve`
+        The curve, converted with ``ToNurbsCurve`` if it is not a NURBS curve.
+
+    Returns
+    -------
+    :class:`Curve` or :class:`RationalCurve`
+    """
+    if not isinstance(curve, rhino3dm.NurbsCurve):
+        curve = curve.ToNurbsCurve()
+    degree, rational = curve.Degree, curve.IsRational
+    points = np.array([(p.X, p.Y, p.Z, p.W) for p in curve.Points])
+    points, knot_vector = knot_clamp(points, degree, _knot_vector(curve.Knots))
+    cls = RationalCurve if rational else Curve
+    return cls._from_point_array(_point_array(points, rational), degree, normalize_knot_vector_numpy(knot_vector), rational)
+
+
+def surface_from_rhino3dm(surface):
+    """Converts a rhino3dm surface into a :class:`Surface` or :class:`RationalSurface`.
+
+    Parameters
+    ----------
+    surface : :class:`rhino3dm.Surface`
+        The surface, converted with ``ToNurbsSurface`` if it is not a NURBS surface.
+
+    Returns
+    -------
+    :class:`Surface` or :class:`RationalSurface`
+    """
+    if not isinstance(surface, rhino3dm.NurbsSurface):
+        surface = surface.ToNurbsSurface()
+    degree, rational = (surface.Degree(0), surface.Degree(1)), surface.IsRational
+    count_u, count_v = surface.Points.CountU, surface.Points.CountV
+    points = surface.Points
+    points = np.array([(p.X, p.Y, p.Z, p.W) for p in map(points.__getitem__, np.ndindex(count_u, count_v))]).reshape(count_u, count_v, 4)
+    knot_vectors = []
+    for axis, knots in enumerate((surface.KnotsU, surface.KnotsV)):
+        points, knot_vector = knot_clamp(points, degree[axis], _knot_vector(knots), axis=axis)
+        knot_vectors.append(normalize_knot_vector_numpy(knot_vector))
+    cls = RationalSurface if rational else Surface
+    return cls._from_point_array(_point_array(points, rational), degree, knot_vectors, rational)
+
+
+def curve_to_rhino3dm(curve):
+    """Converts a curve into a :class:`rhino3dm.NurbsCurve`.
+
+    Parameters
+    ----------
+    curve : :class:`Curve`
+        The curve.
+
+    Returns
+    -------
+    :class:`rhino3dm.NurbsCurve`
+    """
+    rhino_curve = rhino3dm.NurbsCurve(3, curve.rational, curve.degree + 1, curve.count)
+    Point4d, points = rhino3dm.Point4d, rhino_curve.Points
+    if curve.rational:
+        for i, point in enumerate(curve._points.tolist()):
+            points[i] = Point4d(*point)
+    else:
+        for i, (x, y, z) in enumerate(curve._points.tolist()):
+            points[i] = Point4d(x, y, z, 1.)
+    knots = rhino_curve.Knots
+    for i, knot in enumerate(curve._knot_vector[1:-1].tolist()):
+        knots[i] = knot
+    return rhino_curve
+
+
+def surface_to_rhino3dm(surface):
+    """Converts a surface into a :class:`rhino3dm.NurbsSurface`.
+
+    Parameters
+    ----------
+    surface : :class:`Surface`
+        The surface.
+
+    Returns
+    -------
+    :class:`rhino3dm.NurbsSurface`
+    """
+    (degree_u, degree_v), (count_u, count_v) = surface.degree, surface.count
+    rhino_surface = rhino3dm.NurbsSurface.Create(3, surface.rational, degree_u + 1, degree_v + 1, count_u, count_v)
+    Point4d, points = rhino3dm.Point4d, rhino_surface.Points
+    rows = surface._points.reshape(count_u * count_v, -1).tolist()
+    if surface.rational:
+        for index, point in zip(np.ndindex(count_u, count_v), rows):
+            points[index] = Point4d(*point)
+    else:
+        for index, (x, y, z) in zip(np.ndindex(count_u, count_v), rows):
+            points[index] = Point4d(x, y, z, 1.)
+    for knots, knot_vector in zip((rhino_surface.KnotsU, rhino_surface.KnotsV), surface._knot_vector):
+        for i, knot in enumerate(knot_vector[1:-1].tolist()):
+            knots[i] = knot
+    return rhino_surface
+
+
+def read_3dm(path):
+    """Reads all curves and surfaces of a .3dm file.
+
+    Curves of any type are converted into NURBS curves, surfaces of any type
+    into NURBS surfaces, other objects, e.g. breps and meshes, are skipped.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file.
+
+    Returns
+    -------
+    list of :class:`Curve` and :class:`Surface`
+        The curves and surfaces in the order of the file.
+    """
+    model = rhino3dm.File3dm.Read(path)
+    if model is None:
+        raise IOError("Cannot read the file %s" % path)
+    geometries = []
+    for rhino_object in model.Objects:
+        geometry = rhino_object.Geometry
+        if isinstance(geometry, rhino3dm.Curve):
+            geometries.append(curve_from_rhino3dm(geometry))
+        elif isinstance(geometry, rhino3dm.Surface):
+            geometries.append(surface_from_rhino3dm(geometry))
+    return geometries
+
+
+def write_3dm(geometries, path, version=0):
+    """Writes curves and surfaces to a .3dm file.
+
+    Parameters
+    ----------
+    geometries : list of :class:`Curve` and :class:`Surface`
+        The curves and surfaces.
+    path : str
+        The path of the file.
+    version : int, optional
+        The version of the file, ``0`` for the version of rhino3dm. Defaults to ``0``.
+    """
+    model = rhino3dm.File3dm()
+    for geometry in geometries:
+        if isinstance(geometry, Surface):
+            model.Objects.AddSurface(surface_to_rhino3dm(geometry))
+        else:
+            model.Objects.AddCurve(curve_to_rhino3dm(geometry))
+    if not model.Write(path, version):
+        raise IOError("Cannot write the file %s" % path)
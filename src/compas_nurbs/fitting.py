@@ -1,13 +1,28 @@
+import inspect
+
 import numpy as np
-from scipy.linalg import lu_factor, lu_solve
+from scipy.linalg import solve_banded
+from scipy.linalg import solveh_banded
+from scipy.sparse import csr_matrix
+from scipy.sparse import diags
+from scipy.sparse import identity
+from scipy.sparse import kron
+from scipy.sparse.linalg import cg
 
 from compas.geometry import allclose  # noqa: F401
 
-from compas_nurbs.helpers import find_spans
-from compas_nurbs.helpers import basis_functions
-from compas_nurbs.knot_vectors import knot_vector_and_params
+from compas_nurbs.evaluators import basis_functions_derivatives_numpy
+from compas_nurbs.evaluators import basis_functions_numpy
+from compas_nurbs.evaluators import find_spans_numpy
+from compas_nurbs.knot_vectors import curve_parameters_numpy
+from compas_nurbs.knot_vectors import knot_vector_and_params_numpy
+from compas_nurbs.knot_vectors import knot_vector_from_params_numpy
+from compas_nurbs.knot_vectors import knot_vector_uniform_numpy
 from compas_nurbs.knot_vectors import CurveKnotStyle
 
+# scipy 1.12 renamed the relative tolerance of the iterative solvers from ``tol`` to ``rtol``
+CG_TOLERANCE = 'rtol' if 'rtol' in inspect.signature(cg).parameters else 'tol'
+
 
 # TODO: estimate derivatives for degree==3
 # https://link.springer.com/content/pdf/10.1007/s003660050038.pdf
@@ -42,10 +57,175 @@ def global_curve_interpolation(points, degree, knot_style=0, periodic=False):
     True
     """
     points = np.array(points)
-    kv, uk = knot_vector_and_params(points, degree, knot_style, extended=False)
-    M = coefficient_matrix(degree, kv, uk)
-    lu, piv = lu_factor(M)
-    return lu_solve((lu, piv), points), kv
+    kv, uk = knot_vector_and_params_numpy(points, degree, knot_style, extended=False)
+    ab, bands = coefficient_matrix_banded(degree, kv, uk)
+    return solve_banded(bands, ab, points), kv.tolist()
+
+
+def batch_curve_interpolation(point_sets, degree, knot_style=0):
+    """Global curve interpolation through many sets of points at once.
+
+    Point sets with the same number of points and the same parameters share
+    the coefficient matrix. It is factorized once per group, and the points of
+    all sets in the group are solved together as the columns of one right-hand
+    side of shape ``(n, 3 * k)``. With the uniform knot style all sets of the
+    same size end up in one group.
+
+    Parameters
+    ----------
+    point_sets : list of list of point
+        The sets of points to interpolate.
+    degree : int
+        The degree of the output parametric curves.
+    knot_style : int, optional
+        The knot style, either 0, 1, or 2 [uniform, chord, or chord_square_root].
+        Defaults to 0, uniform.
+
+    Returns
+    -------
+    list of tuple (control_points, knot_vector)
+        One result per point set, in the order of the input.
+
+    Examples
+    --------
+    >>> point_sets = [[(0, 0, 0), (1, 2, 0), (2, 0, 0), (3, 1, 0)], [(0, 0, 1), (1, 1, 1), (2, 2, 1), (3, 0, 1)]]
+    >>> results = batch_curve_interpolation(point_sets, 2)
+    >>> control_points, knot_vector = global_curve_interpolation(point_sets[1], 2)
+    >>> allclose(results[1][0], control_points)
+    True
+    """
+    groups = {}
+    for index, points in enumerate(point_sets):
+        if knot_style == CurveKnotStyle.Uniform:
+            key = len(points)
+        else:
+            key = (len(points), curve_parameters_numpy(points, knot_style).tobytes())
+        groups.setdefault(key, []).append(index)
+
+    results = [None] * len(point_sets)
+    for key, indices in groups.items():
+        points = np.array([point_sets[i] for i in indices], dtype=float)  # (k, n, dim)
+        num_sets, num_points, dim = points.shape
+        kv, uk = knot_vector_and_params_numpy(points[0], degree, knot_style, extended=False)
+        ab, bands = coefficient_matrix_banded(degree, kv, uk)
+        kv = kv.tolist()
+        rhs = points.transpose(1, 0, 2).reshape(num_points, num_sets * dim)
+        control_points = solve_banded(bands, ab, rhs).reshape(num_points, num_sets, dim).transpose(1, 0, 2)
+        for i, cp in zip(indices, control_points):
+            results[i] = (cp, kv)
+    return results
+
+
+def global_interpolation_along_axis(points, degree, knot_vector, params, axis=0):
+    """Interpolates all point sets along an axis of an array with shared parameters.
+
+    The coefficient matrix is assembled and factorized once, all the other axes
+    are solved together as columns of one right-hand side, e.g. the rows of a
+    point grid.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        The points, the interpolation runs along ``axis``.
+    degree : int
+        The degree of the interpolation.
+    knot_vector : list of float
+        The knot vector of the interpolation.
+    params : list of float
+        The parameters of the points along ``axis``.
+    axis : int, optional
+        The axis of the points to interpolate. Defaults to 0.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        The control points, of the same shape as the points.
+    """
+    points = np.moveaxis(np.asarray(points, dtype=float), axis, 0)
+    ab, bands = coefficient_matrix_banded(degree, knot_vector, params)
+    control_points = solve_banded(bands, ab, points.reshape(len(points), -1))
+    return np.moveaxis(control_points.reshape(points.shape), 0, axis)
+
+
+def grid_parameters(points, knot_style=0, axis=0):
+    """Computes the parameters of a grid of points in one direction.
+
+    The parameters of all rows along ``axis`` are averaged, rows of zero
+    length are left out. Please refer to The NURBS Book (2nd Edition),
+    pp.376-377 for details.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        The points, of shape ``(n, m, dim)``.
+    knot_style : int, optional
+        The knot style, either 0, 1, or 2 [uniform, chord, or chord_square_root].
+        Defaults to 0, uniform.
+    axis : int, optional
+        The direction of the parameters, 0 for u and 1 for v. Defaults to 0.
+
+    Returns
+    -------
+    list of float
+        Parameters within the range of [0, 1].
+    """
+    points = np.moveaxis(np.asarray(points, dtype=float), axis, 0)
+    if knot_style == CurveKnotStyle.Uniform:
+        return np.linspace(0., 1., len(points)).tolist()
+    lengths = np.linalg.norm(np.diff(points, axis=0), axis=-1)
+    if knot_style == CurveKnotStyle.ChordSquareRoot:
+        lengths = np.sqrt(lengths)
+    elif knot_style != CurveKnotStyle.Chord:
+        raise ValueError("CurveKnotStyle %d is unknown" % knot_style)
+    totals = lengths.sum(axis=0)
+    valid = totals > 0
+    if not np.any(valid):
+        return np.linspace(0., 1., len(points)).tolist()
+    uk = np.cumsum(lengths[:, valid] / totals[valid], axis=0).mean(axis=1)
+    uk = np.concatenate(([0.], uk))
+    uk[-1] = 1.
+    return uk.tolist()
+
+
+def global_surface_interpolation(points, degree, knot_style=0):
+    """Global surface interpolation through a grid of points.
+
+    Each direction's coefficient matrix is factorized once: first all rows are
+    interpolated in u, then the resulting intermediate points in v.
+
+    Please refer to Algorithm A9.4 on The NURBS Book (2nd Edition), pp.380
+    for details.
+
+    Parameters
+    ----------
+    points : list of list of point
+        The grid of points, ``points[i][j]`` lies at the i-th u- and the j-th
+        v-parameter.
+    degree : tuple of int
+        The degree in the u- and the v-direction.
+    knot_style : int, optional
+        The knot style, either 0, 1, or 2 [uniform, chord, or chord_square_root].
+        Defaults to 0, uniform.
+
+    Returns
+    -------
+    tuple (control_points, (knot_vector_u, knot_vector_v))
+
+    Examples
+    --------
+    >>> points = [[(u, v, u * v) for v in range(4)] for u in range(5)]
+    >>> control_points, (knot_vector_u, knot_vector_v) = global_surface_interpolation(points, (3, 2))
+    >>> control_points.shape, len(knot_vector_u), len(knot_vector_v)
+    ((5, 4, 3), 9, 7)
+    """
+    control_points = np.asarray(points, dtype=float)
+    knot_vectors = []
+    for axis in range(2):
+        uk = grid_parameters(points, knot_style, axis)
+        knot_vector = knot_vector_from_params_numpy(degree[axis], uk).tolist()
+        control_points = global_interpolation_along_axis(control_points, degree[axis], knot_vector, uk, axis)
+        knot_vectors.append(knot_vector)
+    return control_points, tuple(knot_vectors)
 
 
 def global_curve_interpolation_with_end_derivatives(points,
@@ -89,13 +269,15 @@ def global_curve_interpolation_with_end_derivatives(points,
     """
 
     points = np.array(points)
-    kv, uk = knot_vector_and_params(points, degree, knot_style, extended=True)
-    M = coefficient_matrix(degree, kv, uk)
+    kv, uk = knot_vector_and_params_numpy(points, degree, knot_style, extended=True)
+    spans, bases = coefficient_matrix_entries(degree, kv, uk)
 
-    M[1][0] = -1.
-    M[1][1] = 1.
-    M[-2][-2] = -1.
-    M[-2][-1] = 1.
+    # the second and the second last row prescribe the end derivatives: P1 - P0 and Pn - Pn-1
+    bases[1] = 0.
+    bases[1][:2] = [-1., 1.]
+    bases[-2] = 0.
+    bases[-2][-2:] = [-1., 1.]
+    ab, bands = banded_matrix(degree, spans, bases)
 
     v0 = np.array(start_derivative) * kv[degree + 1] / degree
     vn = np.array(end_derivative) * (1 - kv[len(kv) - 1 - degree - 1]) / degree
@@ -103,8 +285,81 @@ def global_curve_interpolation_with_end_derivatives(points,
     C = np.insert(C, 1, v0, axis=0)
     C = np.insert(C, -1, vn, axis=0)
 
-    lu, piv = lu_factor(M)
-    return lu_solve((lu, piv), C), kv
+    return solve_banded(bands, ab, C), kv.tolist()
+
+
+def coefficient_matrix_entries(degree, knot_vector, uk):
+    """Evaluates the non-zero entries of the coefficient matrix for global interpolation.
+
+    Row ``i`` holds the ``degree + 1`` basis functions that are non-zero at
+    ``uk[i]``, in the columns ``spans[i] - degree`` to ``spans[i]``.
+
+    Parameters
+    ----------
+    degree : int
+        The degree of the curve.
+    knot_vector : list of float
+        The knot vector of the curve.
+    uk : list of float
+        parameters
+
+    Returns
+    -------
+    tuple (spans, bases)
+        The knot spans and the basis functions of shape ``(len(uk), degree + 1)``.
+    """
+    uk = np.asarray(uk, dtype=float)
+    spans = find_spans_numpy(knot_vector, len(uk), uk)
+    return spans, basis_functions_numpy(degree, knot_vector, spans, uk)
+
+
+def banded_matrix(degree, spans, bases):
+    """Assembles the coefficient matrix in the banded storage of :func:`scipy.linalg.solve_banded`.
+
+    Parameters
+    ----------
+    degree : int
+        The degree of the curve.
+    spans : list of int
+        The knot span of each row.
+    bases : :class:`numpy.array`
+        The non-zero entries of each row.
+
+    Returns
+    -------
+    tuple (ab, (lower, upper))
+        The matrix diagonals and the number of lower and upper diagonals.
+    """
+    num_rows = len(spans)
+    rows = np.repeat(np.arange(num_rows), degree + 1)
+    columns = (np.asarray(spans)[:, np.newaxis] - degree + np.arange(degree + 1)).ravel()
+    values = np.asarray(bases).ravel()
+    mask = values != 0
+    rows, columns, values = rows[mask], columns[mask], values[mask]
+    lower, upper = max(0, (rows - columns).max()), max(0, (columns - rows).max())
+    ab = np.zeros((lower + upper + 1, num_rows))
+    ab[upper + rows - columns, columns] = values
+    return ab, (lower, upper)
+
+
+def coefficient_matrix_banded(degree, knot_vector, uk):
+    """Returns the coefficient matrix for global interpolation in banded form.
+
+    Parameters
+    ----------
+    degree : int
+        The degree of the curve.
+    knot_vector : list of float
+        The knot vector of the curve.
+    uk : list of float
+        parameters
+
+    Returns
+    -------
+    tuple (ab, (lower, upper))
+        The matrix diagonals and the number of lower and upper diagonals.
+    """
+    return banded_matrix(degree, *coefficient_matrix_entries(degree, knot_vector, uk))
 
 
 def coefficient_matrix(degree, knot_vector, uk):
@@ -123,16 +378,380 @@ def coefficient_matrix(degree, knot_vector, uk):
 
     Returns
     -------
-    coefficient matrix, list
+    :class:`numpy.array`
+        The dense coefficient matrix.
+    """
+    spans, bases = coefficient_matrix_entries(degree, knot_vector, uk)
+    M = np.zeros((len(spans), len(spans)))
+    M[np.arange(len(spans))[:, np.newaxis], spans[:, np.newaxis] - degree + np.arange(degree + 1)] = bases
+    return M
+
+
+def approximation_knot_vector(degree, params, num_control_points):
+    """Computes the knot vector for least-squares approximation.
+
+    Please refer to the Equations 9.68 and 9.69 on The NURBS Book (2nd Edition),
+    pp.412, which guarantee that every knot span contains a parameter.
+
+    Parameters
+    ----------
+    degree : int
+        The degree of the curve.
+    params : list of float
+        The parameters of the points in the range of [0, 1].
+    num_control_points : int
+        The number of control points of the curve.
+
+    Returns
+    -------
+    list of float
+        The knot vector.
+    """
+    params = np.asarray(params, dtype=float)
+    d = len(params) / float(num_control_points - degree)
+    jd = np.arange(1, num_control_points - degree) * d
+    i = jd.astype(int)
+    alpha = jd - i
+    inner = (1. - alpha) * params[i - 1] + alpha * params[np.minimum(i, len(params) - 1)]
+    return [0.] * (degree + 1) + inner.tolist() + [1.] * (degree + 1)
+
+
+def _curve_points_at(control_points, degree, spans, bases):
+    """Evaluates points from the basis functions of their spans."""
+    indices = spans[:, np.newaxis] - degree + np.arange(degree + 1)
+    return np.einsum('ij,ijk->ik', bases, control_points[indices])
+
+
+def _least_squares_fit(points, degree, knot_vector, params, num_control_points):
+    """Solves the normal equations of A9.7 with fixed end points."""
+    n = num_control_points - 1
+    spans = find_spans_numpy(knot_vector, num_control_points, params)
+    bases = basis_functions_numpy(degree, knot_vector, spans, params)
+    control_points = np.zeros((num_control_points, points.shape[1]))
+    control_points[0], control_points[-1] = points[0], points[-1]
+    if n < 2:
+        return control_points, spans, bases
+
+    # R_k = Q_k - N_0(u_k) Q_0 - N_n(u_k) Q_m, the end points are fixed
+    columns = spans[:, np.newaxis] - degree + np.arange(degree + 1)
+    first = np.where(columns[:, 0] == 0, bases[:, 0], 0.)
+    last = np.where(columns[:, -1] == n, bases[:, -1], 0.)
+    residuals = points - np.outer(first, points[0]) - np.outer(last, points[-1])
+
+    # accumulate the upper diagonals of the banded normal matrix N^T N and the
+    # right hand side N^T R, one basis function (pair) at a time
+    ab = np.zeros((degree + 1, n + 1))
+    rhs = np.zeros((n + 1, points.shape[1]))
+    for a in range(degree + 1):
+        for d in range(degree + 1 - a):
+            ab[degree - d] += np.bincount(columns[:, a + d], weights=bases[:, a] * bases[:, a + d], minlength=n + 1)
+        for k in range(points.shape[1]):
+            rhs[:, k] += np.bincount(columns[:, a], weights=bases[:, a] * residuals[:, k], minlength=n + 1)
+
+    # drop the first and last row and column, the entries coupling to the first
+    # control point end up in the unused upper left corner of the storage
+    control_points[1:-1] = solveh_banded(ab[:, 1:n], rhs[1:n])
+    return control_points, spans, bases
+
+
+def _correct_parameters(points, control_points, degree, knot_vector, params):
+    """Moves the parameters to the closest points of the curve with one Newton step.
+
+    Please refer to the Equation 9.66 on The NURBS Book (2nd Edition), pp.411.
+    """
+    spans = find_spans_numpy(knot_vector, len(control_points), params)
+    ders = basis_functions_derivatives_numpy(degree, knot_vector, spans, params, 2)
+    indices = spans[:, np.newaxis] - degree + np.arange(degree + 1)
+    C, C1, C2 = np.einsum('ikj,ijl->kil', ders, control_points[indices])
+    difference = C - points
+    numerator = np.einsum('ij,ij->i', C1, difference)
+    denominator = np.einsum('ij,ij->i', C2, difference) + np.einsum('ij,ij->i', C1, C1)
+    step = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+    corrected = np.clip(params - step, 0., 1.)
+    corrected[0], corrected[-1] = params[0], params[-1]
+    return corrected
+
+
+def global_curve_approximation(points, degree, num_control_points, knot_style=0, corrections=0):
+    """Global least-squares curve approximation of points.
+
+    The first and last control point coincide with the first and last point,
+    the others minimize the sum of squared distances between the points and the
+    curve at their parameters. The normal equations are banded and solved in
+    O(m p^2) for m points.
+
+    Please refer to Algorithm A9.7 on The NURBS Book (2nd Edition), pp.410-413
+    for details.
+
+    Parameters
+    ----------
+    points : list of point
+        The points to approximate.
+    degree : int
+        The degree of the output parametric curve.
+    num_control_points : int
+        The number of control points of the curve, at most the number of points.
+    knot_style : int, optional
+        The knot style, either 0, 1, or 2 [uniform, chord, or chord_square_root].
+        Defaults to 0, uniform.
+    corrections : int, optional
+        The number of parameter correction iterations. Each one moves the
+        parameters towards the closest points on the curve and fits again with
+        the same knot vector. Defaults to 0.
+
+    Returns
+    -------
+    tuple (control_points, knot_vector, error)
+        The error is the maximum distance between a point and the curve at its parameter.
+
+    Examples
+    --------
+    >>> import math
+    >>> points = [(t, math.sin(t), 0.) for t in np.linspace(0, 6, 100)]
+    >>> control_points, knot_vector, error = global_curve_approximation(points, 3, 20, knot_style=1)
+    >>> len(control_points), error < 1e-3
+    (20, True)
+    """
+    points = np.asarray(points, dtype=float)
+    if not degree < num_control_points <= len(points):
+        raise ValueError("The number of control points must be larger than the degree and at most the number of points.")
+    params = curve_parameters_numpy(points, knot_style)
+    knot_vector = approximation_knot_vector(degree, params, num_control_points)
+    for iteration in range(corrections + 1):
+        control_points, spans, bases = _least_squares_fit(points, degree, knot_vector, params, num_control_points)
+        if iteration < corrections:
+            params = _correct_parameters(points, control_points, degree, knot_vector, params)
+    error = np.linalg.norm(_curve_points_at(control_points, degree, spans, bases) - points, axis=1).max()
+    return control_points, knot_vector, float(error)
+
+
+def approximate_curve(points, degree, num_control_points=None, tolerance=None, knot_style=0, corrections=0):
+    """Approximate curve by the specified parameters.
+
+    Either the number of control points or a tolerance is given. With a
+    tolerance, the smallest number of control points is searched (growing
+    geometrically, then bisecting) for which the error stays below it.
+
+    Parameters
+    ----------
+    points : list of point
+        The points to approximate.
+    degree : int
+        The degree of the output parametric curve.
+    num_control_points : int, optional
+        The number of control points of the curve.
+    tolerance : float, optional
+        The maximum distance between the points and the curve.
+    knot_style : int, optional
+        The knot style, either 0, 1, or 2 [uniform, chord, or chord_square_root].
+        Defaults to 0, uniform.
+    corrections : int, optional
+        The number of parameter correction iterations. Defaults to 0.
+
+    Returns
+    -------
+    tuple (control_points, knot_vector, error)
+
+    Raises
+    ------
+    ValueError
+        If the knot style is not correct or if not exactly one of the number of
+        control points and the tolerance is passed.
+    """
+    if knot_style not in [CurveKnotStyle.Uniform, CurveKnotStyle.Chord, CurveKnotStyle.ChordSquareRoot]:
+        raise ValueError("Please pass a valid knot style: [0, 1, 2].")
+    if (num_control_points is None) == (tolerance is None):
+        raise ValueError("Please pass either the number of control points OR a tolerance.")
+    if num_control_points is not None:
+        return global_curve_approximation(points, degree, num_control_points, knot_style, corrections)
+
+    points = np.asarray(points, dtype=float)
+    low, high = degree, len(points)
+    count = degree + 1
+    best = None
+    while best is None or high - low > 1:
+        result = global_curve_approximation(points, degree, count, knot_style, corrections)
+        if result[2] <= tolerance:
+            high, best = count, result
+        else:
+            low = count
+            if best is None and count == len(points):
+                return result  # the tolerance is not reachable
+        count = min(2 * count, len(points)) if best is None else (low + high) // 2
+    return best
+
+
+def scattered_points_parameters(points, chunk_size=100000):
+    """Parametrizes scattered points by projecting them onto their best-fit plane.
+
+    The parameters are scaled to the domain [0, 1] in both directions, along
+    the two main axes of the points.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        The points, of shape ``(m, 3)``.
+    chunk_size : int, optional
+        The number of points processed at once. Defaults to 100000.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        The parameters, of shape ``(m, 2)``.
+    """
+    num_points = len(points)
+    centroid = np.zeros(3)
+    covariance = np.zeros((3, 3))
+    for start in range(0, num_points, chunk_size):
+        chunk = np.asarray(points[start:start + chunk_size], dtype=float)
+        centroid += chunk.sum(axis=0)
+        covariance += chunk.T.dot(chunk)
+    centroid /= num_points
+    covariance = covariance / num_points - np.outer(centroid, centroid)
+    axes = np.linalg.eigh(covariance)[1][:, ::-1][:, :2]
+    params = np.empty((num_points, 2))
+    for start in range(0, num_points, chunk_size):
+        params[start:start + chunk_size] = (np.asarray(points[start:start + chunk_size], dtype=float) - centroid).dot(axes)
+    params -= params.min(axis=0)
+    params /= np.where(params.max(axis=0) > 0, params.max(axis=0), 1.)
+    return params
+
+
+def _collocation_matrix(degree, knot_vectors, count, params):
+    """Returns the sparse matrix of the tensor product basis functions at the parameters."""
+    (degree_u, degree_v), (count_u, count_v) = degree, count
+    spans_u = find_spans_numpy(knot_vectors[0], count_u, params[:, 0])
+    spans_v = find_spans_numpy(knot_vectors[1], count_v, params[:, 1])
+    bases_u = basis_functions_numpy(degree_u, knot_vectors[0], spans_u, params[:, 0])
+    bases_v = basis_functions_numpy(degree_v, knot_vectors[1], spans_v, params[:, 1])
+    rows_u = (spans_u - degree_u)[:, np.newaxis] + np.arange(degree_u + 1)
+    rows_v = (spans_v - degree_v)[:, np.newaxis] + np.arange(degree_v + 1)
+    columns = rows_u[:, :, np.newaxis] * count_v + rows_v[:, np.newaxis, :]
+    values = bases_u[:, :, np.newaxis] * bases_v[:, np.newaxis, :]
+    size = (degree_u + 1) * (degree_v + 1)
+    indptr = np.arange(0, len(params) * size + 1, size)
+    return csr_matrix((values.ravel(), columns.ravel(), indptr), shape=(len(params), count_u * count_v))
+
+
+def _difference_matrix(count, order):
+    """Returns the sparse finite difference matrix of the given order."""
+    if count <= order:
+        return csr_matrix((0, count))
+    coefficients = [1., -1.] if order == 1 else [1., -2., 1.]
+    return diags(coefficients, list(range(order + 1)), shape=(count - order, count), format='csr')
+
+
+def fairing_matrix(count):
+    """Returns a thin plate energy of the control net of a surface.
+
+    The second derivatives of the surface are approximated by the second
+    differences of the control points, ``Duu^T Duu + 2 Duv^T Duv + Dvv^T Dvv``.
+
+    Parameters
+    ----------
+    count : tuple of int
+        The number of control points in the u- and the v-direction.
+
+    Returns
+    -------
+    :class:`scipy.sparse.csr_matrix`
+        A positive semi-definite matrix of size ``count_u * count_v``.
+    """
+    count_u, count_v = count
+    uu = kron(_difference_matrix(count_u, 2), identity(count_v))
+    vv = kron(identity(count_u), _difference_matrix(count_v, 2))
+    uv = kron(_difference_matrix(count_u, 1), _difference_matrix(count_v, 1))
+    return (uu.T.dot(uu) + 2 * uv.T.dot(uv) + vv.T.dot(vv)).tocsr()
+
+
+def global_surface_approximation(points, degree, count, params=None, smoothing=1e-3, chunk_size=100000, tolerance=1e-10, maxiter=None):
+    """Least-squares surface approximation of scattered points.
+
+    The points are streamed in chunks: for each chunk the sparse collocation
+    matrix ``A`` of the tensor product basis functions is assembled and added
+    to the normal equations ``A^T A`` and ``A^T Q``, so the memory only depends
+    on the chunk size and the number of control points. The points may hence
+    also be a memory-mapped array. The normal equations, with the optional
+    fairing term, are solved by the conjugate gradient method with a Jacobi
+    preconditioner.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        The points, of shape ``(m, 3)``.
+    degree : tuple of int
+        The degree in the u- and the v-direction.
+    count : tuple of int
+        The number of control points in the u- and the v-direction.
+    params : :class:`numpy.array`, optional
+        The parameters of the points, of shape ``(m, 2)``. Defaults to the
+        projection onto the best-fit plane, see :func:`scattered_points_parameters`.
+    smoothing : float, optional
+        The weight of the thin plate energy of the control net, see
+        :func:`fairing_matrix`, relative to the data. It keeps control points
+        without nearby points in place. Defaults to 1e-3, 0 disables it.
+    chunk_size : int, optional
+        The number of points processed at once. Defaults to 100000.
+    tolerance : float, optional
+        The relative tolerance of the conjugate gradient solver. Defaults to 1e-10.
+    maxiter : int, optional
+        The maximum number of conjugate gradient iterations. Defaults to ten
+        times the number of control points.
+
+    Returns
+    -------
+    tuple (control_points, (knot_vector_u, knot_vector_v), residuals)
+        The residuals are the distances between the points and the surface at
+        their parameters.
+
+    Raises
+    ------
+    ValueError
+        If the number of control points is too small for the degree or if the
+        conjugate gradient solver does not converge.
+
+    Examples
+    --------
+    >>> params = np.random.default_rng(0).random((5000, 2))
+    >>> points = np.column_stack((params * 10, np.sin(params[:, 0] * 3)))
+    >>> control_points, knot_vectors, residuals = global_surface_approximation(points, (3, 3), (8, 8), params=params)
+    >>> control_points.shape, bool(residuals.max() < 0.01)
+    ((8, 8, 3), True)
     """
-    # TODO: use this for evaluators?
-    num_points = len(uk)
-    spans = find_spans(knot_vector, num_points, uk)
-    bases = basis_functions(degree, knot_vector, spans, uk)
-    M = [[0.0 for _ in range(num_points)] for _ in range(num_points)]
-    for i, (span, basis) in enumerate(zip(spans, bases)):
-        M[i][span - degree:span + 1] = basis[:degree + 1]
-    return np.array(M)
+    (degree_u, degree_v), (count_u, count_v) = degree, count
+    if not (degree_u < count_u and degree_v < count_v):
+        raise ValueError("The number of control points must be larger than the degree in both directions.")
+    if params is None:
+        params = scattered_points_parameters(points, chunk_size)
+    knot_vectors = (knot_vector_uniform_numpy(count_u, degree_u).tolist(), knot_vector_uniform_numpy(count_v, degree_v).tolist())
+
+    size = count_u * count_v
+    normal = csr_matrix((size, size))
+    rhs = np.zeros((size, 3))
+    for start in range(0, len(points), chunk_size):
+        A = _collocation_matrix(degree, knot_vectors, count, np.asarray(params[start:start + chunk_size], dtype=float))
+        normal = normal + A.T.dot(A)
+        rhs += A.T.dot(np.asarray(points[start:start + chunk_size], dtype=float))
+
+    if smoothing:
+        fairing = fairing_matrix(count)
+        normal = normal + smoothing * normal.diagonal().sum() / max(fairing.diagonal().sum(), 1.) * fairing
+
+    # Jacobi preconditioner, control points without points and fairing stay zero
+    diagonal = normal.diagonal()
+    preconditioner = diags(np.divide(1., diagonal, out=np.zeros(size), where=diagonal > 0))
+    control_points = np.zeros((size, 3))
+    for k in range(3):
+        control_points[:, k], info = cg(normal, rhs[:, k], atol=0., M=preconditioner, maxiter=maxiter or 10 * size, **{CG_TOLERANCE: tolerance})
+        if info != 0:
+            raise ValueError("The conjugate gradient solver did not converge (info %d), please increase maxiter or the tolerance." % info)
+
+    residuals = np.empty(len(points))
+    for start in range(0, len(points), chunk_size):
+        A = _collocation_matrix(degree, knot_vectors, count, np.asarray(params[start:start + chunk_size], dtype=float))
+        chunk = np.asarray(points[start:start + chunk_size], dtype=float)
+        residuals[start:start + chunk_size] = np.linalg.norm(A.dot(control_points) - chunk, axis=1)
+    return control_points.reshape(count_u, count_v, 3), knot_vectors, residuals
 
 
 def interpolate_curve(points, degree, knot_style=0, start_derivative=None, end_derivative=None, periodic=False):
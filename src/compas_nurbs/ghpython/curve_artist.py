@@ -11,19 +11,21 @@ class CurveArtist(BaseArtist):
         self.curve = curve
 
     def draw(self):
-        points = [rg.Point3d(*p) for p in self.curve.control_points]
-        knots = self.curve.knot_vector[1:-1]
+        data = self.curve.data  # lists, also if the curve stores arrays
+        points = [rg.Point3d(*p) for p in data['control_points']]
+        knots = data['knot_vector'][1:-1]
+        weights = data['weights']
         cvcount = len(points)
         knotcount = cvcount + self.curve.degree - 1
         if len(knots) != knotcount:
             raise Exception("Number of elements in knots must equal the number of elements in points plus degree minus 1")
-        if self.curve.weights and len(self.curve.weights) != cvcount:
+        if weights is not None and len(weights) != cvcount:
             raise Exception("Number of elements in weights should equal the number of elements in points")
-        rational = (self.curve.weights is not None)
+        rational = self.curve.rational
         nc = rg.NurbsCurve(3, rational, self.curve.degree+1, cvcount)
         if rational:
             for i in range(cvcount):
-                nc.Points.SetPoint(i, points[i], self.curve.weights[i])
+                nc.Points.SetPoint(i, points[i], weights[i])
         else:
             for i in range(cvcount):
                 nc.Points.SetPoint(i, points[i])
@@ -32,4 +34,4 @@ class CurveArtist(BaseArtist):
         return nc
 
     def draw_points(self):
-        return [rg.Point3d(*p) for p in self.curve.control_points]
+        return [rg.Point3d(*p) for p in self.curve.data['control_points']]
@@ -0,0 +1,1018 @@
+import numpy as np
+from geomdl.linalg import binomial_coefficient
+
+from .evaluators import evaluate_curve
+from .evaluators import evaluate_surface
+from .evaluators import evaluate_surface_grid
+from .evaluators import surface_control_point_array
+from .operations import bezier_subdivide
+from .operations import curve_bezier_segments
+from .operations import surface_bezier_patches
+from .utilities import readonly
+
+# ==============================================================================
+# bezier segments
+# ==============================================================================
+
+
+def homogeneous_control_points(curve):
+    """Returns the control points of the curve in homogeneous coordinates if it is rational."""
+    return readonly(curve._points)
+
+
+def project_points(points, rational):
+    """Projects homogeneous points into cartesian space."""
+    if not rational:
+        return points
+    return points[..., :-1] / points[..., -1:]
+
+
+def bounding_boxes(points):
+    """Returns the axis aligned bounding boxes of arrays of points.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        An array of shape ``(..., num_points, 3)``.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        An array of shape ``(..., 2, 3)`` with the minimum and the maximum corner.
+    """
+    return np.stack((points.min(axis=-2), points.max(axis=-2)), axis=-2)
+
+
+def curve_segments(curve):
+    """Returns the Bezier segments of a curve together with their bounding boxes.
+
+    The decomposition is cached on the curve until its geometry changes.
+
+    Parameters
+    ----------
+    curve : :class:`Curve`
+        The curve.
+
+    Returns
+    -------
+    tuple (segments, intervals, boxes)
+        The (homogeneous) control points of the segments, their parameter
+        intervals and their bounding boxes.
+    """
+    if 'segments' not in curve._cache:
+        segments, intervals = curve_bezier_segments(homogeneous_control_points(curve), curve.degree, curve.knot_vector)
+        boxes = bounding_boxes(project_points(segments, curve.rational))
+        curve._cache['segments'] = segments, intervals, boxes
+    return curve._cache['segments']
+
+
+class SegmentIndex(object):
+    """A sweep index over the Bezier segments of a collection of curves.
+
+    The segment boxes are sorted by their minimum x-coordinate, so a query only
+    runs the (vectorized) overlap test on the boxes that start before the query
+    box ends.
+
+    Parameters
+    ----------
+    curves : list of :class:`Curve`
+        The curves to index.
+    """
+
+    def __init__(self, curves):
+        self.curves = curves
+        boxes, owners, indices = [], [], []
+        for i, curve in enumerate(curves):
+            _, _, curve_boxes = curve_segments(curve)
+            boxes.append(curve_boxes)
+            owners.append(np.full(len(curve_boxes), i))
+            indices.append(np.arange(len(curve_boxes)))
+        boxes = np.concatenate(boxes)
+        order = np.argsort(boxes[:, 0, 0], kind='stable')
+        self.boxes = boxes[order]
+        self.owners = np.concatenate(owners)[order]
+        self.indices = np.concatenate(indices)[order]
+
+    def query(self, box, tolerance=0.0):
+        """Returns the curve and segment indices of all boxes overlapping ``box``.
+
+        Parameters
+        ----------
+        box : :class:`numpy.array`
+            The query box as ``[[xmin, ymin, zmin], [xmax, ymax, zmax]]``.
+        tolerance : float, optional
+            The distance by which boxes are allowed to be apart.
+
+        Returns
+        -------
+        tuple of :class:`numpy.array`
+            The curve indices and the segment indices.
+        """
+        end = np.searchsorted(self.boxes[:, 0, 0], box[1, 0] + tolerance, side='right')
+        boxes = self.boxes[:end]
+        mask = np.all(boxes[:, 1] >= box[0] - tolerance, axis=1) & np.all(boxes[:, 0] <= box[1] + tolerance, axis=1)
+        return self.owners[:end][mask], self.indices[:end][mask]
+
+
+# ==============================================================================
+# curve - curve
+# ==============================================================================
+
+
+def _flatness(points):
+    """Returns the maximum distance of the control points to the chord, relative to the chord length."""
+    chord = points[-1] - points[0]
+    length = np.sqrt(chord.dot(chord))
+    vectors = points - points[0]
+    if length == 0:
+        return np.inf
+    projections = vectors.dot(chord / length)
+    distances = (vectors * vectors).sum(axis=1) - projections ** 2
+    return np.sqrt(max(distances.max(), 0.0)) / length
+
+
+def _segment_segment_parameters(a0, a1, b0, b1):
+    """Returns the parameters of the closest points of two line segments."""
+    u, v, w = a1 - a0, b1 - b0, a0 - b0
+    a, b, c, d, e = u.dot(u), u.dot(v), v.dot(v), u.dot(w), v.dot(w)
+    denominator = a * c - b * b
+    if denominator < 1e-24:
+        return 0.5, 0.5
+    s = min(max((b * e - c * d) / denominator, 0.0), 1.0)
+    t = min(max((a * e - b * d) / denominator, 0.0), 1.0)
+    return s, t
+
+
+def _boxes_overlap(a, b, tolerance):
+    return np.all(a[1] >= b[0] - tolerance) and np.all(b[1] >= a[0] - tolerance)
+
+
+def bezier_intersection_candidates(segment_a, interval_a, segment_b, interval_b, rational_a, rational_b, tolerance, flatness=1e-2, max_depth=32):
+    """Finds approximate intersection parameters of two Bezier segments by recursive subdivision.
+
+    Segment pairs with disjoint bounding boxes are culled, the rest is split
+    until both control polygons are flat, i.e. their control points deviate
+    less than ``flatness`` times the chord length from the chord. The closest
+    points of the chords are then used as approximation of the intersection.
+
+    Returns
+    -------
+    list of (float, float)
+        The approximate curve parameters.
+    """
+    candidates = []
+    stack = [(segment_a, interval_a, segment_b, interval_b, 0)]
+    while stack:
+        a, ia, b, ib, depth = stack.pop()
+        pa, pb = project_points(a, rational_a), project_points(b, rational_b)
+        if not _boxes_overlap(bounding_boxes(pa), bounding_boxes(pb), tolerance):
+            continue
+        fa, fb = _flatness(pa), _flatness(pb)
+        if (fa < flatness and fb < flatness) or depth >= max_depth:
+            s, t = _segment_segment_parameters(pa[0], pa[-1], pb[0], pb[-1])
+            candidates.append((ia[0] + s * (ia[1] - ia[0]), ib[0] + t * (ib[1] - ib[0])))
+            continue
+        if fa >= fb:
+            mid = 0.5 * (ia[0] + ia[1])
+            left, right = bezier_subdivide(a)
+            stack.append((left, (ia[0], mid), b, ib, depth + 1))
+            stack.append((right, (mid, ia[1]), b, ib, depth + 1))
+        else:
+            mid = 0.5 * (ib[0] + ib[1])
+            left, right = bezier_subdivide(b)
+            stack.append((a, ia, left, (ib[0], mid), depth + 1))
+            stack.append((a, ia, right, (mid, ib[1]), depth + 1))
+    return candidates
+
+
+def refine_curve_curve_intersections(curve_a, curve_b, s, t, max_iterations=20):
+    """Refines approximate intersections with (Gauss-)Newton iterations.
+
+    All parameter pairs are refined simultaneously.
+
+    Parameters
+    ----------
+    curve_a : :class:`Curve`
+    curve_b : :class:`Curve`
+    s : list of float
+        The approximate parameters on ``curve_a``.
+    t : list of float
+        The approximate parameters on ``curve_b``.
+
+    Returns
+    -------
+    tuple (s, t, distances)
+        The refined parameters and the remaining distances between the curve points.
+    """
+    s, t = np.array(s, dtype=float), np.array(t, dtype=float)
+    for _ in range(max_iterations):
+        da = curve_a.derivatives_at(s, order=1)
+        db = curve_b.derivatives_at(t, order=1)
+        f = da[:, 0] - db[:, 0]
+        ja, jb = da[:, 1], -db[:, 1]
+        # normal equations of the 3x2 system [ja jb] * delta = -f
+        a, b, c = (ja * ja).sum(axis=1), (ja * jb).sum(axis=1), (jb * jb).sum(axis=1)
+        ra, rb = -(ja * f).sum(axis=1), -(jb * f).sum(axis=1)
+        determinant = a * c - b * b
+        singular = np.abs(determinant) < 1e-30
+        determinant[singular] = 1.0
+        ds = np.where(singular, 0.0, (c * ra - b * rb) / determinant)
+        dt = np.where(singular, 0.0, (a * rb - b * ra) / determinant)
+        s_new, t_new = np.clip(s + ds, 0.0, 1.0), np.clip(t + dt, 0.0, 1.0)
+        converged = np.all(np.abs(s_new - s) < 1e-14) and np.all(np.abs(t_new - t) < 1e-14)
+        s, t = s_new, t_new
+        if converged:
+            break
+    distances = np.linalg.norm(evaluate_curve(curve_a, s) - evaluate_curve(curve_b, t), axis=1)
+    return s, t, distances
+
+
+def _intersect_segments(curve, segment_indices, other, other_segment_indices, tolerance):
+    segments_a, intervals_a, _ = curve_segments(curve)
+    segments_b, intervals_b, _ = curve_segments(other)
+    candidates = []
+    for i, j in zip(segment_indices, other_segment_indices):
+        candidates += bezier_intersection_candidates(segments_a[i], intervals_a[i], segments_b[j], intervals_b[j],
+                                                     curve.rational, other.rational, tolerance)
+    if not candidates:
+        return []
+    s, t = np.array(candidates).T
+    s, t, distances = refine_curve_curve_intersections(curve, other, s, t)
+    s, t = s[distances <= tolerance], t[distances <= tolerance]
+    order = np.argsort(s, kind='stable')
+    s, t = s[order], t[order]
+    points = evaluate_curve(curve, s)
+    results = []
+    for i in range(len(s)):
+        if any(np.linalg.norm(points[i] - points[j]) <= tolerance for j in results):
+            continue
+        results.append(i)
+    return [(float(s[i]), float(t[i])) for i in results]
+
+
+def curve_curves_intersections(curve, curves, tolerance=1e-6):
+    """Intersects a curve with a collection of curves.
+
+    All Bezier segments of ``curves`` are stored in one :class:`SegmentIndex`,
+    which every segment of ``curve`` is queried against. Overlapping segment
+    pairs are subdivided and the candidates refined with Newton iterations.
+
+    Parameters
+    ----------
+    curve : :class:`Curve`
+        The curve to intersect.
+    curves : list of :class:`Curve`
+        The curves to intersect with.
+    tolerance : float, optional
+        The distance below which the curves are considered intersecting.
+
+    Returns
+    -------
+    list of list of (float, float)
+        For each curve in ``curves`` the parameter pairs ``(t_curve, t_other)``
+        of the intersections, sorted by ``t_curve``.
+    """
+    index = SegmentIndex(curves)
+    _, _, boxes = curve_segments(curve)
+    pairs = [([], []) for _ in curves]
+    for i, box in enumerate(boxes):
+        owners, indices = index.query(box, tolerance)
+        for owner, j in zip(owners, indices):
+            pairs[owner][0].append(i)
+            pairs[owner][1].append(j)
+    return [_intersect_segments(curve, a, other, b, tolerance) if a else [] for other, (a, b) in zip(curves, pairs)]
+
+
+def curve_curve_intersections(curve_a, curve_b, tolerance=1e-6):
+    """Intersects two curves.
+
+    Parameters
+    ----------
+    curve_a : :class:`Curve`
+    curve_b : :class:`Curve`
+    tolerance : float, optional
+        The distance below which the curves are considered intersecting.
+
+    Returns
+    -------
+    list of (float, float)
+        The parameter pairs ``(t_a, t_b)`` of the intersections.
+    """
+    return curve_curves_intersections(curve_a, [curve_b], tolerance)[0]
+
+
+# ==============================================================================
+# surface - planes
+# ==============================================================================
+
+
+def surface_grid(surface, resolution):
+    """Returns the parameters and points of a surface sampled on a regular grid.
+
+    The grid is cached on the surface until its geometry changes.
+
+    Parameters
+    ----------
+    surface : :class:`Surface`
+        The surface.
+    resolution : tuple of int
+        The number of samples in u- and v-direction.
+
+    Returns
+    -------
+    tuple (params_u, params_v, points)
+        The grid parameters and an array of points of shape ``(nu, nv, 3)``.
+    """
+    key = ('grid', tuple(resolution))
+    if key not in surface._cache:
+        params_u = np.linspace(0.0, 1.0, resolution[0])
+        params_v = np.linspace(0.0, 1.0, resolution[1])
+        surface._cache[key] = params_u, params_v, evaluate_surface_grid(surface, params_u, params_v)
+    return surface._cache[key]
+
+
+def _grid_crossings(values, spacing):
+    """Finds the crossings of all levels ``k * spacing`` on the edges of a grid.
+
+    Returns
+    -------
+    tuple
+        For every crossing the edge index, the level index and the linear
+        interpolation factor along the edge.
+    """
+    nu, nv = values.shape
+    q = np.floor(values / spacing).astype(int)
+    flat_values, flat_q = values.ravel(), q.ravel()
+    ids = np.arange(nu * nv).reshape(nu, nv)
+    # edges in v-direction first, then in u-direction
+    starts = np.concatenate((ids[:, :-1].ravel(), ids[:-1, :].ravel()))
+    ends = np.concatenate((ids[:, 1:].ravel(), ids[1:, :].ravel()))
+    qa, qb = flat_q[starts], flat_q[ends]
+    counts = np.abs(qa - qb)
+    edges = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    levels = np.minimum(qa, qb)[edges] + 1 + offsets
+    fa, fb = flat_values[starts[edges]], flat_values[ends[edges]]
+    factors = (levels * spacing - fa) / (fb - fa)
+    return starts, ends, edges, levels, factors
+
+
+def _cell_segments(values, spacing, edges, levels):
+    """Pairs the crossings of every grid cell into contour segments (marching squares)."""
+    nu, nv = values.shape
+    num_v_edges = nu * (nv - 1)
+    is_v_edge = edges < num_v_edges
+    i = np.where(is_v_edge, edges // (nv - 1), (edges - num_v_edges) // nv)
+    j = np.where(is_v_edge, edges % (nv - 1), (edges - num_v_edges) % nv)
+    crossings = np.arange(len(edges))
+
+    # each crossing belongs to the (up to two) cells adjacent to its edge, the
+    # local edge index runs around the cell: 0 (i, j)-(i, j + 1), 1 (i, j + 1)-(i + 1, j + 1),
+    # 2 (i + 1, j)-(i + 1, j + 1) and 3 (i, j)-(i + 1, j)
+    adjacent = []
+    for mask, ci, cj, local in ((is_v_edge & (i < nu - 1), i, j, 0),
+                                (is_v_edge & (i > 0), i - 1, j, 2),
+                                (~is_v_edge & (j < nv - 1), i, j, 3),
+                                (~is_v_edge & (j > 0), i, j - 1, 1)):
+        adjacent.append(np.stack((crossings[mask], ci[mask] * (nv - 1) + cj[mask], np.full(mask.sum(), local))))
+    crossings, cells, local = np.concatenate(adjacent, axis=1)
+
+    order = np.lexsort((local, cells, levels[crossings]))
+    crossings, cells = crossings[order], cells[order]
+    cell_levels = levels[crossings]
+    boundaries = np.flatnonzero((np.diff(cells) != 0) | (np.diff(cell_levels) != 0)) + 1
+    starts = np.concatenate(([0], boundaries))
+    sizes = np.diff(np.concatenate((starts, [len(crossings)])))
+
+    two = starts[sizes == 2]
+    pairs = [np.stack((crossings[two], crossings[two + 1]), axis=1)]
+    saddles = starts[sizes == 4]
+    if len(saddles):
+        ci, cj = cells[saddles] // (nv - 1), cells[saddles] % (nv - 1)
+        center = 0.25 * (values[ci, cj] + values[ci + 1, cj] + values[ci, cj + 1] + values[ci + 1, cj + 1])
+        level = cell_levels[saddles] * spacing
+        # if the center is on the side of corner (i, j), the corners (i, j + 1)
+        # and (i + 1, j) are cut off, otherwise the corners (i, j) and (i + 1, j + 1)
+        connected = (center >= level) == (values[ci, cj] >= level)
+        e0, e1, e2, e3 = (crossings[saddles + k] for k in range(4))
+        pairs.append(np.stack((e0, np.where(connected, e1, e3)), axis=1))
+        pairs.append(np.stack((e2, np.where(connected, e3, e1)), axis=1))
+    return np.concatenate(pairs)
+
+
+def _chain_segments(pairs, num_crossings):
+    """Chains segments sharing crossings into polylines, returns lists of crossing indices."""
+    neighbors = [[] for _ in range(num_crossings)]
+    for a, b in pairs:
+        neighbors[a].append(b)
+        neighbors[b].append(a)
+    visited = [False for _ in range(num_crossings)]
+    chains = []
+    # open chains start at crossings with a single neighbor, closed loops anywhere
+    starts = [k for k in range(num_crossings) if len(neighbors[k]) == 1] + list(range(num_crossings))
+    for start in starts:
+        if visited[start] or not neighbors[start]:
+            continue
+        chain = [start]
+        visited[start] = True
+        current = start
+        while True:
+            following = [k for k in neighbors[current] if not visited[k]]
+            if not following:
+                break
+            current = following[0]
+            visited[current] = True
+            chain.append(current)
+        if len(neighbors[start]) == 2 and start in neighbors[current] and len(chain) > 2:
+            chain.append(start)  # closed loop
+        chains.append(chain)
+    return chains
+
+
+def _refine_crossings(surface, uv_a, uv_b, values_a, values_b, levels, origin, normal, iterations=8):
+    """Moves the crossings onto the exact zero sets along their grid edges (Illinois method)."""
+    ta, tb = np.zeros(len(levels)), np.ones(len(levels))
+    fa, fb = values_a - levels, values_b - levels
+    side = np.zeros(len(levels))
+    for _ in range(iterations):
+        t = np.clip((ta * fb - tb * fa) / (fb - fa), 0.0, 1.0)
+        points = evaluate_surface(surface, uv_a + t[:, np.newaxis] * (uv_b - uv_a))
+        f = np.dot(points - origin, normal) - levels
+        replace_a = np.sign(f) == np.sign(fa)
+        # halve the value of an end point that is retained twice in a row
+        fb = np.where(replace_a & (side == 1), 0.5 * fb, fb)
+        fa = np.where(~replace_a & (side == -1), 0.5 * fa, fa)
+        ta, fa = np.where(replace_a, t, ta), np.where(replace_a, f, fa)
+        tb, fb = np.where(replace_a, tb, t), np.where(replace_a, fb, f)
+        side = np.where(replace_a, 1, -1)
+    t = np.clip((ta * fb - tb * fa) / (fb - fa), 0.0, 1.0)
+    return evaluate_surface(surface, uv_a + t[:, np.newaxis] * (uv_b - uv_a))
+
+
+def surface_plane_contours(surface, origin, normal, spacing, resolution):
+    """Intersects a surface with a stack of parallel planes.
+
+    The signed distance to the planes is computed on a cached parameter grid.
+    The crossings of all planes with the grid edges are found, paired into
+    segments (marching squares) and chained into polylines in one vectorized
+    pass. Finally the crossings are moved onto the exact surface.
+
+    Parameters
+    ----------
+    surface : :class:`Surface`
+        The surface to contour.
+    origin : point
+        A point on one of the planes.
+    normal : vector
+        The normal of the planes.
+    spacing : float
+        The distance between the planes.
+    resolution : tuple of int
+        The number of grid samples in u- and v-direction.
+
+    Returns
+    -------
+    list of (float, list of :class:`numpy.array`)
+        The offsets of the intersected planes from ``origin`` along
+        ``normal``, each with its polylines as arrays of points.
+    """
+    origin = np.asarray(origin, dtype=float)
+    normal = np.asarray(normal, dtype=float)
+    normal = normal / np.linalg.norm(normal)
+    params_u, params_v, points = surface_grid(surface, resolution)
+    values = np.dot(points - origin, normal)
+    # avoid grid values exactly on a plane
+    values = np.where(np.mod(values, spacing) == 0, values + 1e-12 * spacing, values)
+
+    starts, ends, edges, levels, _ = _grid_crossings(values, spacing)
+    if not len(edges):
+        return []
+    pairs = _cell_segments(values, spacing, edges, levels)
+
+    uv = np.stack(np.meshgrid(params_u, params_v, indexing='ij'), axis=-1).reshape(-1, 2)
+    flat_values = values.ravel()
+    a, b = starts[edges], ends[edges]
+    crossing_points = _refine_crossings(surface, uv[a], uv[b], flat_values[a], flat_values[b], levels * spacing, origin, normal)
+
+    contours = {}
+    for chain in _chain_segments(pairs, len(edges)):
+        contours.setdefault(levels[chain[0]], []).append(crossing_points[chain])
+    return [(float(level * spacing), contours[level]) for level in sorted(contours)]
+
+
+# ==============================================================================
+# curves - planes
+# ==============================================================================
+
+
+def bernstein_basis(degree, params):
+    """Returns the Bernstein polynomials of the degree evaluated at the parameters.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        An array of shape ``(len(params), degree + 1)``.
+    """
+    params = np.asarray(params, dtype=float)[..., np.newaxis]
+    i = np.arange(degree + 1)
+    binomials = np.array([binomial_coefficient(degree, k) for k in range(degree + 1)], dtype=float)
+    return binomials * params ** i * (1.0 - params) ** (degree - i)
+
+
+CURVE_PLANE_INTERSECTION_DTYPE = np.dtype([('curve', np.int64), ('plane', np.int64), ('param', np.float64), ('point', np.float64, (3,))])
+
+
+def _bezier_halves(coefficients):
+    """Splits Bezier functions (rows of Bernstein coefficients) at 0.5 with de Casteljau's algorithm."""
+    left, right = [coefficients[:, 0]], [coefficients[:, -1]]
+    for _ in range(coefficients.shape[1] - 1):
+        coefficients = 0.5 * (coefficients[:, :-1] + coefficients[:, 1:])
+        left.append(coefficients[:, 0])
+        right.append(coefficients[:, -1])
+    return np.stack(left, axis=1), np.stack(right[::-1], axis=1)
+
+
+def _bezier_roots(coefficients, iterations, depth=48, tolerance=1e-14):
+    """Finds the roots of Bezier functions (rows of Bernstein coefficients) in [0, 1].
+
+    The functions are halved until the coefficients of every piece change sign
+    at most once. By the variation diminishing property a piece without a sign
+    change has no root and a piece with one sign change has exactly one, which
+    is refined with the Illinois method between the ends of the piece,
+    vectorized over all pieces that have not converged yet. Pieces that still
+    change sign more than once after ``depth`` halvings are (near) tangent and
+    only kept if their ends differ in sign.
+
+    Returns
+    -------
+    tuple (rows, params)
+        The row index and the local parameter of each root.
+    """
+    degree = coefficients.shape[1] - 1
+    rows, starts, pieces = np.arange(len(coefficients)), np.zeros(len(coefficients)), coefficients
+    isolated = []
+    for level in range(depth + 1):
+        above = pieces >= 0
+        changes = (above[:, :-1] != above[:, 1:]).sum(axis=1)
+        single = (changes == 1) if level < depth else (above[:, 0] != above[:, -1])
+        isolated.append((rows[single], starts[single], np.full(single.sum(), 0.5 ** level), pieces[single]))
+        split = changes > 1
+        if level == depth or not split.any():
+            break
+        left, right = _bezier_halves(pieces[split])
+        rows, starts = np.tile(rows[split], 2), np.concatenate((starts[split], starts[split] + 0.5 ** (level + 1)))
+        pieces = np.concatenate((left, right))
+    rows, starts, widths, pieces = [np.concatenate(arrays) for arrays in zip(*isolated)]
+
+    ta, tb = np.zeros(len(rows)), np.ones(len(rows))
+    fa, fb = pieces[:, 0], pieces[:, -1]
+    scale = np.abs(coefficients[rows]).max(axis=1)
+    side = np.zeros(len(rows))
+    roots = np.empty(len(rows))
+    active = np.arange(len(rows))
+    for _ in range(iterations):
+        t = (ta * fb - tb * fa) / (fb - fa)
+        f = (bernstein_basis(degree, t) * pieces[active]).sum(axis=1)
+        done = (np.abs(f) <= tolerance * scale[active]) | (tb - ta <= tolerance)
+        roots[active[done]] = t[done]
+        replace_a = (f >= 0) == (fa >= 0)
+        # halve the value of an end point that is retained twice in a row
+        fb = np.where(replace_a & (side == 1), 0.5 * fb, fb)
+        fa = np.where(~replace_a & (side == -1), 0.5 * fa, fa)
+        ta, fa = np.where(replace_a, t, ta), np.where(replace_a, f, fa)
+        tb, fb = np.where(replace_a, tb, t), np.where(replace_a, fb, f)
+        side = np.where(replace_a, 1, -1)
+        keep = ~done
+        active, ta, tb, fa, fb, side = active[keep], ta[keep], tb[keep], fa[keep], fb[keep], side[keep]
+        if not len(active):
+            break
+    roots[active] = (ta * fb - tb * fa) / (fb - fa)
+    return rows, starts + widths * roots
+
+
+def _segment_plane_candidates(points, normals, offsets):
+    """Returns the segment-plane pairs whose planes pass between the extreme control points of the segment.
+
+    The planes are grouped by normal, the control points of all segments are
+    projected onto every distinct normal and the sorted plane offsets searched
+    for the range of each segment, so that only the candidate pairs are built.
+    """
+    unique_normals, inverse = np.unique(normals, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    segment_ids, plane_ids = [], []
+    for index, normal in enumerate(unique_normals):
+        group = np.nonzero(inverse == index)[0]
+        group = group[np.argsort(offsets[group])]
+        projections = points.dot(normal)
+        pad = 1e-12 * np.abs(projections).max(axis=1)
+        lower = np.searchsorted(offsets[group], projections.min(axis=1) - pad, side='left')
+        upper = np.searchsorted(offsets[group], projections.max(axis=1) + pad, side='right')
+        counts = upper - lower
+        segment_ids.append(np.repeat(np.arange(len(points)), counts))
+        first = np.repeat(lower - np.cumsum(counts) + counts, counts)
+        plane_ids.append(group[first + np.arange(counts.sum())])
+    return np.concatenate(segment_ids), np.concatenate(plane_ids)
+
+
+def curves_planes_intersections(curves, planes, iterations=30):
+    """Intersects many curves with many planes at once.
+
+    The curves are decomposed into Bezier segments, which lie in the convex
+    hull of their control points. For every distinct plane normal the range
+    of the control points along the normal is looked up in the sorted plane
+    offsets, so only the segment-plane pairs that may intersect are built.
+    The signed distance of a segment to a plane is itself a Bezier function
+    whose coefficients are the distances of the control points, its roots are
+    isolated by subdivision and solved vectorized across all curves and planes
+    of the same degree.
+
+    Crossings are detected as sign changes, i.e. points where a curve only
+    touches a plane are not reported.
+
+    Parameters
+    ----------
+    curves : list of :class:`Curve`
+        The curves.
+    planes : list of :class:`compas.geometry.Plane` or list of (point, normal)
+        The planes.
+    iterations : int, optional
+        The number of root refinement iterations. Defaults to 30.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        A structured array with the fields ``curve``, ``plane``, ``param`` and
+        ``point``, sorted by curve, plane and parameter.
+    """
+    origins = np.array([plane[0] for plane in planes], dtype=float).reshape(-1, 3)
+    normals = np.array([plane[1] for plane in planes], dtype=float).reshape(-1, 3)
+    normals /= np.linalg.norm(normals, axis=1)[:, np.newaxis]
+    offsets = (origins * normals).sum(axis=1)
+
+    # stack the segments of all curves with the same degree in homogeneous coordinates
+    groups = {}
+    for index, curve in enumerate(curves):
+        segments, intervals, _ = curve_segments(curve)
+        if not curve.rational:
+            segments = np.concatenate((segments, np.ones(segments.shape[:-1] + (1,))), axis=-1)
+        group = groups.setdefault(curve.degree, ([], [], []))
+        group[0].append(segments)
+        group[1].append(intervals)
+        group[2].append(np.full(len(segments), index))
+
+    results = []
+    for degree, (segments, intervals, owners) in groups.items():
+        segments, intervals, owners = np.concatenate(segments), np.concatenate(intervals), np.concatenate(owners)
+        segment_ids, plane_ids = _segment_plane_candidates(segments[:, :, :3] / segments[:, :, 3:], normals, offsets)
+        if not len(segment_ids):
+            continue
+        # bernstein coefficients of the (weighted) signed distances of the candidate pairs
+        candidates = segments[segment_ids]
+        coefficients = np.einsum('nik,nk->ni', candidates[:, :, :3], normals[plane_ids]) - candidates[:, :, 3] * offsets[plane_ids][:, np.newaxis]
+        rows, t = _bezier_roots(coefficients, iterations)
+        segment_ids, plane_ids = segment_ids[rows], plane_ids[rows]
+        a, b = intervals[segment_ids, 0], intervals[segment_ids, 1]
+        points = np.einsum('ni,nik->nk', bernstein_basis(degree, t), segments[segment_ids])
+        result = np.empty(len(t), dtype=CURVE_PLANE_INTERSECTION_DTYPE)
+        result['curve'] = owners[segment_ids]
+        result['plane'] = plane_ids
+        result['param'] = a + t * (b - a)
+        result['point'] = points[:, :3] / points[:, 3:]
+        results.append(result)
+
+    if not results:
+        return np.empty(0, dtype=CURVE_PLANE_INTERSECTION_DTYPE)
+    results = np.concatenate(results)
+    return results[np.lexsort((results['param'], results['plane'], results['curve']))]
+
+
+# ==============================================================================
+# surface - surface
+# ==============================================================================
+
+
+def surface_patches(surface):
+    """Returns the Bezier patches of a surface together with their bounding boxes.
+
+    The decomposition is cached on the surface until its geometry changes.
+
+    Parameters
+    ----------
+    surface : :class:`Surface`
+        The surface.
+
+    Returns
+    -------
+    tuple (patches, intervals_u, intervals_v, boxes)
+        The (homogeneous) control points of the patches, their parameter
+        intervals in u- and v-direction and their bounding boxes.
+    """
+    if 'patches' not in surface._cache:
+        control_points = surface_control_point_array(surface)
+        patches, intervals_u, intervals_v = surface_bezier_patches(control_points, surface.degree, surface.knot_vector)
+        points = project_points(patches, surface.rational)
+        boxes = bounding_boxes(points.reshape(points.shape[:2] + (-1, 3)))
+        surface._cache['patches'] = patches, intervals_u, intervals_v, boxes
+    return surface._cache['patches']
+
+
+def _patch_flatness(points):
+    """Returns the maximum deviation of a control net from the bilinear patch through its corners, relative to its diagonal."""
+    nu, nv = points.shape[:2]
+    s = np.linspace(0.0, 1.0, nu)[:, np.newaxis, np.newaxis]
+    t = np.linspace(0.0, 1.0, nv)[np.newaxis, :, np.newaxis]
+    bilinear = (1 - s) * (1 - t) * points[0, 0] + s * (1 - t) * points[-1, 0] + (1 - s) * t * points[0, -1] + s * t * points[-1, -1]
+    diagonal = max(np.linalg.norm(points[-1, -1] - points[0, 0]), np.linalg.norm(points[-1, 0] - points[0, -1]))
+    if diagonal == 0:
+        return np.inf
+    return np.linalg.norm(points - bilinear, axis=-1).max() / diagonal
+
+
+def _subdivide_patch(patch, interval, direction):
+    """Splits a Bezier patch in halves in the direction, returns both halves with their intervals."""
+    if direction == 1:
+        patch = patch.transpose(1, 0, 2)
+    left, right = bezier_subdivide(patch)
+    if direction == 1:
+        left, right = left.transpose(1, 0, 2), right.transpose(1, 0, 2)
+    a, b = interval[direction]
+    mid = 0.5 * (a + b)
+    interval_left, interval_right = [list(i) for i in interval], [list(i) for i in interval]
+    interval_left[direction][1] = mid
+    interval_right[direction][0] = mid
+    return (left, interval_left), (right, interval_right)
+
+
+def _split_direction(points):
+    """Returns the parameter direction in which the control net extends most."""
+    extent_u = np.linalg.norm(points[-1] - points[0], axis=-1).max()
+    extent_v = np.linalg.norm(points[:, -1] - points[:, 0], axis=-1).max()
+    return 0 if extent_u >= extent_v else 1
+
+
+def surface_intersection_seeds(surface_a, surface_b, tolerance, flatness=0.05, min_size=0.0, max_depth=16):
+    """Finds approximate points of the intersection of two surfaces.
+
+    Pairs of knot span patches with disjoint cached bounding boxes are culled,
+    the remaining pairs are subdivided until both patches are flat or their
+    bounding boxes are smaller than ``min_size``.
+
+    Returns
+    -------
+    list of (u_a, v_a, u_b, v_b)
+        The approximate parameters, the centers of the flat patch pairs.
+    """
+    patches_a, intervals_ua, intervals_va, boxes_a = surface_patches(surface_a)
+    patches_b, intervals_ub, intervals_vb, boxes_b = surface_patches(surface_b)
+    boxes_a, boxes_b = boxes_a.reshape(-1, 2, 3), boxes_b.reshape(-1, 2, 3)
+    overlaps = np.all(boxes_a[:, np.newaxis, 1] >= boxes_b[np.newaxis, :, 0] - tolerance, axis=2) & \
+        np.all(boxes_b[np.newaxis, :, 1] >= boxes_a[:, np.newaxis, 0] - tolerance, axis=2)
+
+    num_va, num_vb = len(intervals_va), len(intervals_vb)
+    stack = []
+    for a, b in zip(*np.nonzero(overlaps)):
+        ia, ja, ib, jb = a // num_va, a % num_va, b // num_vb, b % num_vb
+        stack.append((patches_a[ia, ja], [intervals_ua[ia], intervals_va[ja]],
+                      patches_b[ib, jb], [intervals_ub[ib], intervals_vb[jb]], 0))
+
+    seeds = []
+    while stack:
+        pa, ia, pb, ib, depth = stack.pop()
+        xa, xb = project_points(pa, surface_a.rational), project_points(pb, surface_b.rational)
+        box_a, box_b = bounding_boxes(xa.reshape(-1, 3)), bounding_boxes(xb.reshape(-1, 3))
+        if not _boxes_overlap(box_a, box_b, tolerance):
+            continue
+        small = max(np.linalg.norm(box_a[1] - box_a[0]), np.linalg.norm(box_b[1] - box_b[0])) < min_size
+        fa, fb = _patch_flatness(xa), _patch_flatness(xb)
+        if (fa < flatness and fb < flatness) or small or depth >= max_depth:
+            seeds.append([np.mean(ia[0]), np.mean(ia[1]), np.mean(ib[0]), np.mean(ib[1])])
+            continue
+        if fa >= fb:
+            for patch, interval in _subdivide_patch(pa, ia, _split_direction(xa)):
+                stack.append((patch, interval, pb, ib, depth + 1))
+        else:
+            for patch, interval in _subdivide_patch(pb, ib, _split_direction(xb)):
+                stack.append((pa, ia, patch, interval, depth + 1))
+    return seeds
+
+
+def _first_derivatives(surface, uv):
+    derivatives = surface.derivatives_at(uv, order=1)
+    return derivatives[:, 0, 0], derivatives[:, 1, 0], derivatives[:, 0, 1]
+
+
+def refine_surface_surface_points(surface_a, surface_b, params, max_iterations=20):
+    """Moves approximate intersection points onto both surfaces with (minimum norm) Newton iterations.
+
+    All parameters are refined simultaneously.
+
+    Parameters
+    ----------
+    surface_a : :class:`Surface`
+    surface_b : :class:`Surface`
+    params : list of (u_a, v_a, u_b, v_b)
+        The approximate parameters.
+
+    Returns
+    -------
+    tuple (params, distances)
+        The refined parameters and the remaining distances between the surface points.
+    """
+    q = np.array(params, dtype=float).reshape(-1, 4)
+    for _ in range(max_iterations):
+        pa, ua, va = _first_derivatives(surface_a, q[:, :2])
+        pb, ub, vb = _first_derivatives(surface_b, q[:, 2:])
+        f = pa - pb
+        jacobian = np.stack((ua, va, -ub, -vb), axis=2)  # (n, 3, 4)
+        jjt = np.einsum('nij,nkj->nik', jacobian, jacobian)
+        singular = np.abs(np.linalg.det(jjt)) < 1e-30
+        jjt[singular] = np.eye(3)
+        delta = -np.einsum('nji,nj->ni', jacobian, np.linalg.solve(jjt, f[..., np.newaxis])[..., 0])
+        delta[singular] = 0.0
+        q_new = np.clip(q + delta, 0.0, 1.0)
+        converged = np.abs(q_new - q).max() < 1e-14
+        q = q_new
+        if converged:
+            break
+    distances = np.linalg.norm(evaluate_surface(surface_a, q[:, :2]) - evaluate_surface(surface_b, q[:, 2:]), axis=1)
+    return q, distances
+
+
+class _Marcher(object):
+    """Traces an intersection branch of two surfaces from a point on both surfaces."""
+
+    def __init__(self, surface_a, surface_b, tolerance, max_step, max_angle=0.1, max_steps=10000):
+        self.surface_a = surface_a
+        self.surface_b = surface_b
+        self.tolerance = tolerance
+        self.max_step = max_step
+        self.min_step = max(10 * tolerance, 1e-6 * max_step)
+        self.max_angle = max_angle
+        self.max_steps = max_steps
+
+    def evaluate(self, q):
+        da = self.surface_a.derivatives_at([q[:2]], order=1)[0]
+        db = self.surface_b.derivatives_at([q[2:]], order=1)[0]
+        return da[0, 0], da[1, 0], da[0, 1], db[0, 0], db[1, 0], db[0, 1]
+
+    @staticmethod
+    def tangent(pa, ua, va, pb, ub, vb):
+        t = np.cross(np.cross(ua, va), np.cross(ub, vb))
+        length = np.linalg.norm(t)
+        if length < 1e-12 * np.linalg.norm(ua) * np.linalg.norm(va) * np.linalg.norm(ub) * np.linalg.norm(vb):
+            return None  # tangential surfaces
+        return t / length
+
+    @staticmethod
+    def predict(u, v, delta):
+        a, b, c = u.dot(u), u.dot(v), v.dot(v)
+        ra, rb = u.dot(delta), v.dot(delta)
+        determinant = a * c - b * b
+        return np.array([c * ra - b * rb, a * rb - b * ra]) / determinant
+
+    def correct(self, q, target, direction, fixed=None):
+        """Newton iterations on (Sa - Sb = 0, (Sa - target) . direction = 0), or with one fixed parameter."""
+        for _ in range(10):
+            pa, ua, va, pb, ub, vb = self.evaluate(q)
+            f = np.zeros(4)
+            f[:3] = pa - pb
+            jacobian = np.zeros((4, 4))
+            jacobian[:3] = np.array([ua, va, -ub, -vb]).T
+            if fixed is None:
+                f[3] = (pa - target).dot(direction)
+                jacobian[3, :2] = [ua.dot(direction), va.dot(direction)]
+            else:
+                jacobian[3, fixed] = 1.0
+            try:
+                delta = np.linalg.solve(jacobian, -f)
+            except np.linalg.LinAlgError:
+                return None
+            q = np.clip(q + delta, 0.0, 1.0)
+            if np.linalg.norm(f[:3]) < 1e-2 * self.tolerance and np.abs(delta).max() < 1e-12:
+                break
+        pa, _, _, pb, _, _ = self.evaluate(q)
+        if np.linalg.norm(pa - pb) > self.tolerance:
+            return None
+        return q
+
+    def march(self, q, direction, start):
+        """Marches from q in the direction until the domain boundary is hit or the branch closes."""
+        params, points = [], []
+        pa, ua, va, pb, ub, vb = self.evaluate(q)
+        h = self.max_step
+        closed = False
+        for _ in range(self.max_steps):
+            # predictor in parameter space
+            dq = np.concatenate((self.predict(ua, va, h * direction), self.predict(ub, vb, h * direction)))
+            alpha, fixed = 1.0, None
+            for k in range(4):
+                if q[k] + dq[k] > 1.0 or q[k] + dq[k] < 0.0:
+                    bound = 1.0 if q[k] + dq[k] > 1.0 else 0.0
+                    a = (bound - q[k]) / dq[k]
+                    if a < alpha:
+                        alpha, fixed = a, k
+            if fixed is not None and alpha * h < self.min_step:
+                break  # on the boundary
+            q_new = q + alpha * dq
+            if fixed is not None:
+                q_new[fixed] = round(q_new[fixed])
+            q_new = self.correct(q_new, pa + alpha * h * direction, direction, fixed)
+            if q_new is None:
+                if h <= self.min_step:
+                    break
+                h = max(0.5 * h, self.min_step)
+                continue
+            derivatives = self.evaluate(q_new)
+            tangent = self.tangent(*derivatives)
+            if tangent is None:
+                break
+            if tangent.dot(direction) < 0:
+                tangent = -tangent
+            angle = np.arccos(min(1.0, tangent.dot(direction)))
+            if angle > self.max_angle and h > self.min_step:
+                h = max(0.5 * h, self.min_step)
+                continue
+            q, direction = q_new, tangent
+            pa, ua, va, pb, ub, vb = derivatives
+            if len(points) > 2 and np.linalg.norm(pa - start) < h:
+                closed = True
+                break
+            params.append(q)
+            points.append(pa)
+            if fixed is not None:
+                break
+            if angle < 0.25 * self.max_angle:
+                h = min(1.5 * h, self.max_step)
+        return params, points, closed
+
+    def trace(self, q):
+        pa, ua, va, pb, ub, vb = self.evaluate(q)
+        direction = self.tangent(pa, ua, va, pb, ub, vb)
+        if direction is None:
+            return np.array([pa])
+        _, forward, closed = self.march(q, direction, pa)
+        if closed:
+            return np.array([pa] + forward + [pa])
+        _, backward, _ = self.march(q, -direction, pa)
+        return np.array(backward[::-1] + [pa] + forward)
+
+
+def _distances_to_polyline(points, polyline):
+    """Returns the distances of the points to a polyline."""
+    if len(polyline) == 1:
+        return np.linalg.norm(points - polyline[0], axis=1)
+    a, b = polyline[:-1], polyline[1:]
+    ab = b - a
+    lengths = np.maximum((ab * ab).sum(axis=1), 1e-300)
+    t = np.clip((np.einsum('nk,mk->nm', points, ab) - (a * ab).sum(axis=1)) / lengths, 0.0, 1.0)
+    closest = a[np.newaxis] + t[..., np.newaxis] * ab[np.newaxis]
+    return np.linalg.norm(closest - points[:, np.newaxis], axis=2).min(axis=1)
+
+
+def surface_surface_intersections(surface_a, surface_b, tolerance=1e-6, max_step=None, max_angle=0.1):
+    """Intersects two surfaces.
+
+    Pairs of knot span patches are culled by their cached bounding boxes and
+    subdivided to find seed points, which are moved onto both surfaces. From
+    each seed the intersection branch is traced by marching along the cross
+    product of the surface normals, with a Newton corrector that uses the
+    derivative evaluator. Seeds lying on already traced branches are skipped.
+
+    Parameters
+    ----------
+    surface_a : :class:`Surface`
+    surface_b : :class:`Surface`
+    tolerance : float, optional
+        The distance below which points are considered on both surfaces.
+    max_step : float, optional
+        The maximum marching step. Defaults to 1/50 of the smaller bounding box diagonal.
+    max_angle : float, optional
+        The maximum angle (in radians) between the tangents of successive points.
+
+    Returns
+    -------
+    list of :class:`numpy.array`
+        The intersection branches as arrays of points. Closed branches end
+        with their first point.
+    """
+    if max_step is None:
+        boxes = [surface_patches(surface)[3].reshape(-1, 2, 3) for surface in (surface_a, surface_b)]
+        max_step = min(np.linalg.norm(b[:, 1].max(axis=0) - b[:, 0].min(axis=0)) for b in boxes) / 50.0
+    # patches smaller than the marching step do not need to be subdivided further
+    seeds = surface_intersection_seeds(surface_a, surface_b, tolerance, min_size=2 * max_step)
+    if not seeds:
+        return []
+    seeds, distances = refine_surface_surface_points(surface_a, surface_b, seeds)
+    seeds = seeds[distances <= tolerance]
+    if not len(seeds):
+        return []
+    marcher = _Marcher(surface_a, surface_b, tolerance, max_step, max_angle)
+    points = evaluate_surface(surface_a, seeds[:, :2])
+    # chord deviation of the polylines from the exact branches
+    threshold = max(10 * tolerance, 0.25 * max_step * max_angle)
+    branches = []
+    for q, point in zip(seeds, points):
+        if any(_distances_to_polyline(point[np.newaxis], branch)[0] <= threshold for branch in branches):
+            continue
+        branches.append(marcher.trace(q))
+    return branches
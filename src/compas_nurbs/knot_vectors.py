@@ -1,8 +1,12 @@
 import math
-from compas.geometry import Bezier
+
+import compas
 from compas.geometry import distance_point_point
 from .helpers import EPSILON
 
+if not compas.IPY:
+    import numpy as np
+
 
 class CurveKnotStyle(object):
     """
@@ -54,8 +58,8 @@ def bezier_spaced_parameters(num_points):
     -----
     If degree >= 5 this provides a more stable knotvector for 'uniform' knot style.
     """
-    curve = Bezier([[0.0, 0.0, 0.0], [0.5, 0.0, 0.0], [0.5, 1.0, 0.0], [1., 1., 0]])
-    return [curve.point_at(t).y for t in equally_spaced_parameters(num_points)]
+    # y-coordinate of the Bezier curve [(0, 0), (0.5, 0), (0.5, 1), (1, 1)]
+    return [3 * t * t - 2 * t * t * t for t in equally_spaced_parameters(num_points)]
 
 
 def chord_lengths(points):
@@ -99,10 +103,7 @@ def chord_spaced_parameters(points):
     --------
     >>>
     """
-    cds = chord_lengths(points)
-    d = sum(cds)
-    uk = [0.] + cds + [1.]
-    return [sum(uk[0:i + 1]) / d for i in range(len(points))]
+    return _cumulative_parameters(chord_lengths(points))
 
 
 def chord_sqrt_spaced_parameters(points):
@@ -126,10 +127,15 @@ def chord_sqrt_spaced_parameters(points):
     --------
     >>>
     """
-    cds = [math.sqrt(v) for v in chord_lengths(points)]
-    d = sum(cds)
-    uk = [0.] + cds + [1.]
-    return [sum(uk[0:i + 1]) / d for i in range(len(points))]
+    return _cumulative_parameters([math.sqrt(v) for v in chord_lengths(points)])
+
+
+def _cumulative_parameters(lengths):
+    """Returns the running sums of the lengths, divided by their total."""
+    uk = [0.]
+    for length in lengths:
+        uk.append(uk[-1] + length)
+    return [u / uk[-1] for u in uk]
 
 
 def knot_vector_uniform(num_points, degree, periodic=False):
@@ -183,9 +189,10 @@ def knot_vector_from_params(degree, params, periodic=False):
     Is the same as geomdl.fitting.compute_knot_vector
     """
     kv = [0.0 for _ in range(degree + 1)]
+    window = sum(params[1:degree + 1])
     for j in range(1, len(params) - degree):
-        v = (1.0 / degree) * sum([params[j] for j in range(j, j + degree)])
-        kv.append(v)
+        kv.append(window / degree)
+        window += params[j + degree] - params[j]
     kv += [1.0 for _ in range(degree + 1)]
     return kv
 
@@ -298,3 +305,327 @@ def knot_vector_multiplicities(knot_vector):
             mults.append([knot, 0])
         mults[-1][1] = mults[-1][1] + 1
     return mults
+
+
+def knot_vector_union(knot_vectors):
+    """Merges knot vectors of the same degree and domain.
+
+    Parameters
+    ----------
+    knot_vectors : list of list of float
+        The knot vectors.
+
+    Returns
+    -------
+    list of float
+        The knot vector that contains every knot with its maximum multiplicity.
+    """
+    mults = []
+    for knot_vector in knot_vectors:
+        for knot, mult in knot_vector_multiplicities(knot_vector):
+            mults.append((knot, mult))
+    mults.sort()
+    union = []
+    for knot, mult in mults:
+        if union and abs(knot - union[-1][0]) < EPSILON:
+            union[-1][1] = max(union[-1][1], mult)
+        else:
+            union.append([knot, mult])
+    return [knot for knot, mult in union for _ in range(mult)]
+
+
+def knot_vector_difference(knot_vector, other):
+    """Returns the knots of a knot vector that are missing in another one.
+
+    Parameters
+    ----------
+    knot_vector : list of float
+        The knot vector.
+    other : list of float
+        The knot vector whose knots are removed.
+
+    Returns
+    -------
+    list of float
+        The missing knots, e.g. to insert into ``other``.
+    """
+    other = knot_vector_multiplicities(other)
+    knots = []
+    for knot, mult in knot_vector_multiplicities(knot_vector):
+        existing = sum(m for k, m in other if abs(k - knot) < EPSILON)
+        knots += [knot for _ in range(mult - existing)]
+    return knots
+
+
+# ==============================================================================
+# numpy
+# ==============================================================================
+
+
+def equally_spaced_parameters_numpy(num_points):
+    """Computes equally spaced parameters for interpolation.
+
+    Array version of :func:`equally_spaced_parameters`.
+
+    Parameters
+    ----------
+    num_points : int
+        Number of points to compute parameters for.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        Parameters within the range of [0, 1].
+    """
+    return np.linspace(0., 1., num_points)
+
+
+def bezier_spaced_parameters_numpy(num_points):
+    """Computes bezier spaced parameters for interpolation.
+
+    Array version of :func:`bezier_spaced_parameters`.
+
+    Parameters
+    ----------
+    num_points : int
+        Number of points to compute parameters for.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        Parameters within the range of [0, 1].
+    """
+    t = equally_spaced_parameters_numpy(num_points)
+    return 3 * t ** 2 - 2 * t ** 3
+
+
+def chord_lengths_numpy(points):
+    """Returns the chord lengths.
+
+    Array version of :func:`chord_lengths`.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        Points on the curve, of shape ``(n, dim)``.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        The n - 1 lengths between the n points.
+    """
+    vectors = np.diff(np.asarray(points, dtype=float), axis=0)
+    return np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+
+
+def chord_spaced_parameters_numpy(points):
+    """Computes parameters based on chord length for interpolation.
+
+    Array version of :func:`chord_spaced_parameters`.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        Points on the curve, of shape ``(n, dim)``.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        Parameters within the range of [0, 1].
+
+    Examples
+    --------
+    >>> chord_spaced_parameters_numpy([(0, 0, 0), (1, 0, 0), (3, 0, 0)]).tolist()
+    [0.0, 0.3333333333333333, 1.0]
+    """
+    return _cumulative_parameters_numpy(chord_lengths_numpy(points))
+
+
+def chord_sqrt_spaced_parameters_numpy(points):
+    """Computes parameters based on the square root of the chord length for interpolation.
+
+    Array version of :func:`chord_sqrt_spaced_parameters`.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        Points on the curve, of shape ``(n, dim)``.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        Parameters within the range of [0, 1].
+    """
+    return _cumulative_parameters_numpy(np.sqrt(chord_lengths_numpy(points)))
+
+
+def _cumulative_parameters_numpy(lengths):
+    uk = np.concatenate(([0.], np.cumsum(lengths)))
+    return uk / uk[-1]
+
+
+def curve_parameters_numpy(points, knot_style):
+    """Computes the parameters of points for interpolation or approximation.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        Points on the curve, of shape ``(n, dim)``.
+    knot_style : int
+        The knot style: 0 for 'Uniform', 1 for 'Chord', 2 for 'ChordSquareRoot'
+
+    Returns
+    -------
+    :class:`numpy.array`
+        Parameters within the range of [0, 1].
+    """
+    if knot_style == CurveKnotStyle.Uniform:
+        return equally_spaced_parameters_numpy(len(points))
+    elif knot_style == CurveKnotStyle.Chord:
+        return chord_spaced_parameters_numpy(points)
+    elif knot_style == CurveKnotStyle.ChordSquareRoot:
+        return chord_sqrt_spaced_parameters_numpy(points)
+    raise ValueError("CurveKnotStyle %d is unknown" % knot_style)
+
+
+def knot_vector_uniform_numpy(num_points, degree, periodic=False):
+    """Computes a uniform knot vector.
+
+    Array version of :func:`knot_vector_uniform`.
+
+    Parameters
+    ----------
+    num_points : int
+        Number of points to compute parameters for.
+    degree : int
+        The degree of the curve.
+
+    Returns
+    -------
+    :class:`numpy.array`
+        The knot vector in the domain of [0, 1].
+    """
+    inner = np.arange(1, num_points - degree) / float(num_points - degree)
+    return np.concatenate((np.zeros(degree + 1), inner, np.ones(degree + 1)))
+
+
+def knot_vector_from_params_numpy(degree, params, periodic=False):
+    """Computes a knot vector from parameters using the averaging method.
+
+    Array version of :func:`knot_vector_from_params`, the averages of the
+    sliding windows are the differences of the cumulative sum.
+
+    Parameters
+    ----------
+    degree : int
+        The degree of the curve
+    params : :class:`numpy.array`
+        Parameters on the curve in the range of [0, 1].
+
+    Returns
+    -------
+    :class:`numpy.array`
+        The knot vector.
+    """
+    sums = np.concatenate(([0.], np.cumsum(params)))
+    inner = (sums[1 + degree:len(params)] - sums[1:len(params) - degree]) / degree
+    return np.concatenate((np.zeros(degree + 1), inner, np.ones(degree + 1)))
+
+
+def knot_vector_and_params_numpy(points, degree, knot_style, extended=False, periodic=False):
+    """Returns the knot vector for curve interpolation.
+
+    Array version of :func:`knot_vector_and_params`.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        Points on the curve, of shape ``(n, dim)``.
+    degree : int
+        The degree of the curve
+    knot_style : int
+        The knot style: 0 for 'Uniform', 1 for 'Chord', 2 for 'ChordSquareRoot'
+    extended : bool
+        `True` if the knot vector and params should be calculated for interpolation
+        with end derivatives. Defaults to `False`.
+
+    Returns
+    -------
+    tuple : (knot_vector, parameters)
+        The knot vector and the parameters for the interpolation.
+    """
+    uk = curve_parameters_numpy(points, knot_style)
+    if extended:  # extend parameters for end derivatives estimation
+        uk = np.concatenate(([uk[0], 0.], uk[1:-1], [1., uk[-1]]))
+
+    return knot_vector_from_params_numpy(degree, uk), uk
+
+
+def normalize_knot_vector_numpy(knot_vector):
+    """Returns a normalized knot vector within the [0, 1] domain.
+
+    Array version of :func:`normalize_knot_vector`.
+
+    Parameters
+    ----------
+    knot_vector : :class:`numpy.array`
+        A knot vector
+
+    Returns
+    -------
+    :class:`numpy.array`
+        The normalized knot vector.
+    """
+    knot_vector = np.asarray(knot_vector, dtype=float)
+    return (knot_vector - knot_vector[0]) / (knot_vector[-1] - knot_vector[0])
+
+
+def check_knot_vector_numpy(knot_vector, num_points, degree):
+    """Checks the validity of the knot vector.
+
+    Array version of :func:`check_knot_vector`.
+
+    Parameters
+    ----------
+    knot_vector : :class:`numpy.array`
+        The knot vector to check.
+    num_points : int
+        Number of points to compute parameters for.
+    degree : int
+        The degree
+
+    Returns
+    -------
+    bool
+        True if the knot vector is valid, False otherwise.
+    """
+    if len(knot_vector) != degree + num_points + 1:
+        return False
+    return bool(np.all(np.diff(knot_vector) >= 0))
+
+
+def knot_vector_multiplicities_numpy(knot_vector):
+    """Determines the multiplicities of the values in a knot vector.
+
+    Array version of :func:`knot_vector_multiplicities`, consecutive knots
+    closer than ``EPSILON`` are the same knot.
+
+    Parameters
+    ----------
+    knot_vector : :class:`numpy.array`
+        The knot vector.
+
+    Returns
+    -------
+    tuple (knots, multiplicities)
+        The distinct knots and their multiplicities.
+
+    Examples
+    --------
+    >>> knots, mults = knot_vector_multiplicities_numpy([0, 0, 0, 0.5, 1, 1, 1])
+    >>> knots.tolist(), mults.tolist()
+    ([0.0, 0.5, 1.0], [3, 1, 3])
+    """
+    knot_vector = np.asarray(knot_vector, dtype=float)
+    starts = np.flatnonzero(np.concatenate(([True], np.diff(knot_vector) > EPSILON)))
+    return knot_vector[starts], np.diff(np.append(starts, len(knot_vector)))
@@ -1,7 +1,16 @@
 import numpy as np
+from geomdl.linalg import binomial_coefficient
+
+from .evaluators import basis_functions_numpy
+from .evaluators import basis_matrix
+from .evaluators import find_spans_numpy
 from .helpers import EPSILON
 from .helpers import knotspan
+from .knot_vectors import knot_vector_difference
 from .knot_vectors import knot_vector_multiplicities
+from .knot_vectors import knot_vector_multiplicities_numpy
+from .knot_vectors import knot_vector_union
+from .utilities import readonly
 
 
 def normalize_vectors(vectors):
@@ -36,23 +45,224 @@ def curve_is_planar(curve):
 
 
 def unify_curves(curves):
+    """Makes curves compatible, i.e. of the same degree and with the same knot vector.
+
+    The curves are raised to the maximum degree and the union of their knot
+    vectors is inserted. Curves sharing a degree and knot vector are elevated
+    and refined together in one array operation.
+
+    Parameters
+    ----------
+    curves : list of :class:`Curve`
+        The curves, with the same dimension.
+
+    Returns
+    -------
+    tuple (control_points, degree, knot_vector, rational)
+        The control points of all curves as an array of shape
+        ``(num_curves, count, dimension)``, in homogeneous coordinates if any
+        curve is rational, and the common degree and knot vector.
     """
+    rational = any(crv.rational for crv in curves)
+    degree = max(crv.degree for crv in curves)
+    points = [homogeneous_points(crv.control_points, crv.weights) if rational else np.asarray(crv.control_points, dtype=float) for crv in curves]
+    knot_vectors = [list(crv.knot_vector) for crv in curves]
+
+    # 1. raise all curves to the maximum degree
+    groups = _group_by_knot_vector(curves, lambda i: (curves[i].degree, tuple(knot_vectors[i])))
+    for indices in groups:
+        crv = curves[indices[0]]
+        if crv.degree == degree:
+            continue
+        elevated, knot_vector = elevate_degree(np.stack([points[i] for i in indices]), crv.degree, knot_vectors[indices[0]], degree - crv.degree, axis=1)
+        for i, pts in zip(indices, elevated):
+            points[i], knot_vectors[i] = pts, knot_vector
+
+    # 2. insert the missing knots of the union of all knot vectors
+    knot_vector = knot_vector_union(knot_vectors)
+    groups = _group_by_knot_vector(curves, lambda i: tuple(knot_vectors[i]))
+    for indices in groups:
+        knots2insert = knot_vector_difference(knot_vector, knot_vectors[indices[0]])
+        if not knots2insert:
+            continue
+        refined, _ = knot_refine(np.stack([points[i] for i in indices]), degree, knot_vectors[indices[0]], knots2insert, axis=1)
+        for i, pts in zip(indices, refined):
+            points[i] = pts
+    return np.stack(points), degree, knot_vector, rational
+
+
+def _group_by_knot_vector(curves, key):
+    groups = {}
+    for i in range(len(curves)):
+        groups.setdefault(key(i), []).append(i)
+    return list(groups.values())
+
+
+def degree_elevation(control_points, degree, knot_vector, t):
+    """Raises the degree of stacked control point sets.
+
+    Corresponds to Algorithm A5.9 (Piegl & Tiller), run on whole rows of
+    control points, so any number of control point sets that share the knot
+    vector are elevated at once.
+
+    Parameters
+    ----------
+    control_points : :class:`numpy.array`
+        The control points, the first axis runs along the knot vector.
+    degree : int
+        The degree.
+    knot_vector : list of float
+        The (clamped) knot vector.
+    t : int
+        The number of degrees to elevate.
+
+    Returns
+    -------
+    tuple (control_points, knot_vector)
+        The control points and knot vector of the elevated curve.
     """
-    # 1. Raise degree to maximum degree
-    max_degree = max([crv.degree for crv in curves])
-    knot_vector = curves[0].knot_vector
-    for crv in curves:
-        if crv.degree != max_degree:
-            raise NotImplementedError("Sorry, lofting curves of different degrees is currently not yet implemented")
-        if crv.knot_vector != knot_vector:
-            raise NotImplementedError("Sorry, lofting curves with different knot vectors is currently not yet implemented")
-    # curve_elevate_degree(curve, final_degree)
-    # unify knot vector
-    return curves
+    p, U, Pw = degree, [float(u) for u in knot_vector], control_points
+    n = len(Pw) - 1
+    m = n + p + 1
+    ph = p + t
+    ph2 = ph // 2
+    # coefficients for degree elevating the Bezier segments
+    bezalfs = np.zeros((ph + 1, p + 1))
+    bezalfs[0][0] = bezalfs[ph][p] = 1.0
+    for i in range(1, ph2 + 1):
+        inv = 1.0 / binomial_coefficient(ph, i)
+        for j in range(max(0, i - t), min(p, i) + 1):
+            bezalfs[i][j] = inv * binomial_coefficient(p, j) * binomial_coefficient(t, i - j)
+    for i in range(ph2 + 1, ph):
+        for j in range(max(0, i - t), min(p, i) + 1):
+            bezalfs[i][j] = bezalfs[ph - i][p - j]
+
+    num_knots = len(knot_vector_multiplicities(U))
+    Qw = [None for _ in range(n + 1 + t * num_knots)]
+    Uh = [None for _ in range(m + 1 + t * num_knots)]
+    bpts = [Pw[i] for i in range(p + 1)]
+    ebpts = [None for _ in range(ph + 1)]
+    Nextbpts = [None for _ in range(max(p - 1, 0))]
+    alfs = [None for _ in range(max(p - 1, 0))]
+
+    mh, kind, r, a, b, cind, ua = ph, ph + 1, -1, p, p + 1, 1, U[0]
+    Qw[0] = Pw[0]
+    for i in range(ph + 1):
+        Uh[i] = ua
+    while b < m:
+        i = b
+        while b < m and abs(U[b] - U[b + 1]) < EPSILON:
+            b = b + 1
+        mul = b - i + 1
+        mh = mh + mul + t
+        ub = U[b]
+        oldr = r
+        r = p - mul
+        # insert knot U[b] r times
+        lbz = (oldr + 2) // 2 if oldr > 0 else 1
+        rbz = ph - (r + 1) // 2 if r > 0 else ph
+        if r > 0:
+            numer = ub - ua
+            for k in range(p, mul, -1):
+                alfs[k - mul - 1] = numer / (U[a + k] - ua)
+            for j in range(1, r + 1):
+                save = r - j
+                s = mul + j
+                for k in range(p, s - 1, -1):
+                    bpts[k] = alfs[k - s] * bpts[k] + (1.0 - alfs[k - s]) * bpts[k - 1]
+                Nextbpts[save] = bpts[p]
+        # degree elevate the Bezier segment
+        for i in range(lbz, ph + 1):
+            ebpts[i] = sum(bezalfs[i][j] * bpts[j] for j in range(max(0, i - t), min(p, i) + 1))
+        if oldr > 1:
+            # remove knot U[a] oldr times
+            first, last = kind - 2, kind
+            den = ub - ua
+            bet = (ub - Uh[kind - 1]) / den
+            for tr in range(1, oldr):
+                i, j = first, last
+                kj = j - kind + 1
+                while j - i > tr:
+                    if i < cind:
+                        alf = (ub - Uh[i]) / (ua - Uh[i])
+                        Qw[i] = alf * Qw[i] + (1.0 - alf) * Qw[i - 1]
+                    if kj >= lbz:
+                        if j - tr <= kind - ph + oldr:
+                            gam = (ub - Uh[j - tr]) / den
+                            ebpts[kj] = gam * ebpts[kj] + (1.0 - gam) * ebpts[kj + 1]
+                        else:
+                            ebpts[kj] = bet * ebpts[kj] + (1.0 - bet) * ebpts[kj + 1]
+                    i, j, kj = i + 1, j - 1, kj - 1
+                first, last = first - 1, last + 1
+        if a != p:
+            for i in range(ph - oldr):
+                Uh[kind] = ua
+                kind = kind + 1
+        for j in range(lbz, rbz + 1):
+            Qw[cind] = ebpts[j]
+            cind = cind + 1
+        if b < m:
+            for j in range(r):
+                bpts[j] = Nextbpts[j]
+            for j in range(r, p + 1):
+                bpts[j] = Pw[b - p + j]
+            a, b, ua = b, b + 1, ub
+        else:
+            for i in range(ph + 1):
+                Uh[kind + i] = ub
+    nh = mh - ph - 1
+    return np.array(Qw[:nh + 1]), [float(u) for u in Uh[:nh + ph + 2]]
+
+
+def elevate_degree(control_points, degree, knot_vector, t, axis=0):
+    """Raises the degree of all control point sets of an array at once.
+
+    Parameters
+    ----------
+    control_points : :class:`numpy.array`
+        The control points. The axis ``axis`` runs along the knot vector, all
+        other axes are elevated together.
+    degree : int
+        The degree along ``axis``.
+    knot_vector : list of float
+        The knot vector along ``axis``.
+    t : int
+        The number of degrees to elevate.
+    axis : int, optional
+        The axis of the control points along the knot vector. Defaults to 0.
+
+    Returns
+    -------
+    tuple (control_points, knot_vector)
+        The elevated control points and knot vector.
+    """
+    control_points = np.asarray(control_points, dtype=float)
+    if t == 0:
+        return control_points.copy(), list(knot_vector)
+    if t < 0:
+        raise ValueError("The degree can only be raised")
+    control_points, knot_vector = degree_elevation(np.moveaxis(control_points, axis, 0), degree, knot_vector, t)
+    return np.moveaxis(control_points, 0, axis), knot_vector
 
 
 def curve_elevate_degree(curve, final_degree):
-    raise NotImplementedError
+    """Raises the degree of a (rational) curve.
+
+    Parameters
+    ----------
+    curve : :class:`Curve`
+        The curve.
+    final_degree : int
+        The new degree, larger than or equal to the degree of the curve.
+
+    Returns
+    -------
+    tuple (control_points, weights, knot_vector)
+        The control points, weights (``None`` if not rational) and knot vector
+        of the elevated curve.
+    """
+    points, knot_vector = elevate_degree(control_point_array(curve), curve.degree, curve.knot_vector, final_degree - curve.degree)
+    return split_weights(points, curve.rational) + (knot_vector,)
 
 
 def surface_normals(surface, params):
@@ -61,42 +271,45 @@ def surface_normals(surface, params):
     return normalize_vectors(vectors)
 
 
-def curve_knot_refine(curve, knots2insert):
-    """Insert a collection of knots on a curve.
+def knot_refinement(control_points, degree, knot_vector, knots2insert):
+    """Inserts a collection of knots into stacked control point sets.
 
-    Corresponds to Algorithm A5.4 (Piegl & Tiller)
+    Corresponds to Algorithm A5.4 (Piegl & Tiller), run on whole rows of
+    control points, so any number of control point sets that share the knot
+    vector are refined at once. Only the rows within the affected spans are
+    computed, the others are copied as slices.
 
     Parameters
     ----------
-    curve : :class:`Curve`
-        The curve to insert the knots into
+    control_points : :class:`numpy.array`
+        The control points, the first axis runs along the knot vector.
+    degree : int
+        The degree.
+    knot_vector : list of float
+        The knot vector.
     knots2insert : list of float
-        The knots to insert - a list of parameter positions within the curve domain.
+        The knots to insert, in ascending order.
 
     Returns
     -------
-    :class:`Curve`
-        A new curve with the knots inserted.
+    tuple (control_points, knot_vector)
+        The refined control points, with ``len(knots2insert)`` more rows, and
+        the refined knot vector.
     """
-    control_points, degree, knots = curve
-    control_points = np.array(control_points)
+    knots = [float(u) for u in knot_vector]
     n = len(control_points) - 1
     m = n + degree + 1
     r = len(knots2insert) - 1
     a = knotspan(degree, knots2insert[0], knots)
     b = knotspan(degree, knots2insert[r], knots)
 
-    control_points_post = [None for _ in range(len(control_points) + len(knots2insert))]
+    control_points_post = np.empty((len(control_points) + len(knots2insert),) + control_points.shape[1:])
     knots_post = [None for _ in range(len(knots) + len(knots2insert))]
 
-    for i in range(0, a - degree + 1):
-        control_points_post[i] = control_points[i]
-    for i in range(b - 1, n + 1):
-        control_points_post[i + r + 1] = control_points[i]
-    for i in range(0, a + 1):
-        knots_post[i] = knots[i]
-    for i in range(b + degree, m + 1):
-        knots_post[i + r + 1] = knots[i]
+    control_points_post[:a - degree + 1] = control_points[:a - degree + 1]
+    control_points_post[b + r:] = control_points[b - 1:]
+    knots_post[:a + 1] = knots[:a + 1]
+    knots_post[b + degree + r + 1:] = knots[b + degree:m + 1]
     i = ((b + degree) - 1)
     k = ((b + degree) + r)
     j = r
@@ -119,99 +332,740 @@ def curve_knot_refine(curve, knots2insert):
         k = (k - 1)
         j = (j - 1)
 
-    return control_points_post, degree, knots_post
+    return control_points_post, knots_post
 
 
-def surface_knot_refine(surface, knots2insert, direction):
-    """Performs knot refinement on a Surface by inserting knots at various parameters.
+def knot_refine(control_points, degree, knot_vector, knots2insert, axis=0):
+    """Inserts a collection of knots into all control point sets of an array at once.
+
+    Parameters
+    ----------
+    control_points : :class:`numpy.array`
+        The control points. The axis ``axis`` runs along the knot vector, all
+        other axes are refined together, e.g. the rows of a surface or a batch
+        of curves sharing the knot vector.
+    degree : int
+        The degree along ``axis``.
+    knot_vector : list of float
+        The knot vector along ``axis``.
+    knots2insert : list of float
+        The knots to insert - a list of parameter positions within the domain.
+    axis : int, optional
+        The axis of the control points along the knot vector. Defaults to 0.
+
+    Returns
+    -------
+    tuple (control_points, knot_vector)
+        The refined control points and knot vector.
+    """
+    control_points = np.asarray(control_points, dtype=float)
+    knots2insert = sorted(knots2insert)
+    if not knots2insert:
+        return control_points.copy(), list(knot_vector)
+    if knots2insert[0] < knot_vector[degree] or knots2insert[-1] > knot_vector[-degree - 1]:
+        raise ValueError("The knots to insert must be within the domain")
+    control_points, knot_vector = knot_refinement(np.moveaxis(control_points, axis, 0), degree, knot_vector, [float(u) for u in knots2insert])
+    return np.moveaxis(control_points, 0, axis), knot_vector
+
+
+def curve_knot_refine(curve, knots2insert):
+    """Insert a collection of knots on a curve.
+
+    Parameters
+    ----------
+    curve : tuple (control_points, degree, knot_vector)
+        The curve to insert the knots into. Trailing dimensions of the control
+        points are refined together.
+    knots2insert : list of float
+        The knots to insert - a list of parameter positions within the curve domain.
+
+    Returns
+    -------
+    tuple (control_points, degree, knot_vector)
+        The refined curve.
+    """
+    control_points, degree, knot_vector = curve
+    control_points, knot_vector = knot_refine(control_points, degree, knot_vector, knots2insert)
+    return control_points, degree, knot_vector
+
+
+def homogeneous_points(control_points, weights):
+    """Returns the weighted control points ``(w * x, w * y, w * z, w)``.
+    """
+    weights = np.asarray(weights, dtype=float)[..., np.newaxis]
+    return np.concatenate((weights * np.asarray(control_points, dtype=float), weights), axis=-1)
+
+
+def control_point_array(bspline):
+    """Returns the control points of a curve or surface as a read-only array, in homogeneous coordinates if rational.
+    """
+    return readonly(bspline._points)
+
+
+def split_weights(points, rational):
+    """Splits homogeneous points into control points and weights (``None`` if not rational).
+    """
+    if not rational:
+        return points, None
+    return points[..., :-1] / points[..., -1:], points[..., -1]
+
+
+def transformation_matrices(transformations):
+    """Returns one or many transformations as an array of shape ``(4, 4)`` or ``(n, 4, 4)``.
+
+    Parameters
+    ----------
+    transformations : :class:`compas.geometry.Transformation` or list
+        A transformation or 4x4 matrix, or a list or array of them.
+    """
+    if hasattr(transformations, 'matrix'):
+        return np.asarray(transformations.matrix, dtype=float)
+    return np.asarray([getattr(t, 'matrix', t) for t in transformations], dtype=float)
+
+
+def transform_point_array(points, matrices, rational):
+    """Transforms control points with one or one matrix per point.
+
+    Homogeneous points ``(w * x, w * y, w * z, w)`` are multiplied with the
+    matrices as they are, which is exact for rational geometry. Cartesian
+    points are divided by the resulting fourth coordinate, like
+    :func:`compas.geometry.transform_points_numpy`.
+
+    Parameters
+    ----------
+    points : :class:`numpy.array`
+        The control points, of shape ``(n, 3)`` or ``(n, 4)`` if rational.
+    matrices : :class:`numpy.array`
+        A matrix of shape ``(4, 4)``, or matrices of shape ``(n, 4, 4)``.
+    rational : bool
+        ``True`` if the points are homogeneous.
+
+    Returns
+    -------
+    :class:`numpy.array`
+    """
+    if matrices.ndim == 2:
+        if rational:
+            return points.dot(matrices.T)
+        points = points.dot(matrices[:, :3].T) + matrices[:, 3]
+    else:
+        if rational:
+            return np.einsum('nij,nj->ni', matrices, points)
+        points = np.einsum('nij,nj->ni', matrices[:, :, :3], points) + matrices[:, :, 3]
+    return points[:, :3] / points[:, 3:]
+
+
+def transform_geometries(geometries, transformations, lazy=False):
+    """Transforms many curves and surfaces at once.
+
+    The control points of all geometries of the same kind (rational or not)
+    are transformed with one vectorized operation, without the per-object
+    checks of the setters.
+
+    Parameters
+    ----------
+    geometries : list of :class:`compas_nurbs.bspline.BSpline`
+        The curves and surfaces to transform in place.
+    transformations : :class:`compas.geometry.Transformation` or list
+        One transformation for all geometries, or one per geometry.
+    lazy : bool, optional
+        If ``True``, the transformations are composed with the pending
+        transformations of the geometries and only applied when their control
+        points are used next, see :meth:`compas_nurbs.bspline.BSpline.transform`.
+        Defaults to ``False``.
+
+    Examples
+    --------
+    >>> from compas.geometry import Translation
+    >>> curves = [Curve([(0, 0, 0), (1, i, 0), (2, 0, 0)], 2) for i in range(3)]
+    >>> transform_geometries(curves, [Translation.from_vector([0, 0, i]) for i in range(3)])
+    >>> [curve.control_points[1].tolist() for curve in curves]
+    [[1.0, 0.0, 0.0], [1.0, 1.0, 1.0], [1.0, 2.0, 2.0]]
+    """
+    matrices = transformation_matrices(transformations)
+    if matrices.ndim == 3 and len(matrices) != len(geometries):
+        raise ValueError("There must be one transformation per geometry.")
+    if lazy:
+        for i, geometry in enumerate(geometries):
+            geometry.transform(matrices if matrices.ndim == 2 else matrices[i], lazy=True)
+        return
+    for rational in (False, True):
+        indices = [i for i, geometry in enumerate(geometries) if geometry.rational == rational]
+        if not indices:
+            continue
+        arrays = [geometries[i]._points for i in indices]
+        sizes = [array.size // array.shape[-1] for array in arrays]
+        points = np.concatenate([array.reshape(-1, array.shape[-1]) for array in arrays])
+        if matrices.ndim == 3:
+            points = transform_point_array(points, np.repeat(matrices[indices], sizes, axis=0), rational)
+        else:
+            points = transform_point_array(points, matrices, rational)
+        for i, array, part in zip(indices, arrays, np.split(points, np.cumsum(sizes)[:-1])):
+            geometries[i]._set_point_array(part.reshape(array.shape))
+
+
+def curve_insert_knots(curve, knots2insert):
+    """Inserts knots into a (rational) curve.
+
+    Parameters
+    ----------
+    curve : :class:`Curve`
+        The curve.
+    knots2insert : list of float
+        The knots to insert.
+
+    Returns
+    -------
+    tuple (control_points, weights, knot_vector)
+        The control points, weights (``None`` if not rational) and knot vector
+        of the refined curve.
+    """
+    points, knot_vector = knot_refine(control_point_array(curve), curve.degree, curve.knot_vector, knots2insert)
+    return split_weights(points, curve.rational) + (knot_vector,)
+
+
+def surface_insert_knots(surface, knots2insert, direction):
+    """Inserts knots into a (rational) surface, refining all rows at once.
 
     Parameters
     ----------
     surface : :class:`Surface`
-        The surface to insert the knots into
+        The surface.
     knots2insert : list of float
-        The knots to insert - a list of parameter positions within the surface domain.
+        The knots to insert.
     direction : int
         The surface direction, either 0 (u) or 1 (v).
 
     Returns
     -------
-    :class:`Surface`
-        A new surface with the knots inserted.
+    tuple (control_points, weights, knot_vector)
+        The control points, weights (``None`` if not rational) and knot vectors
+        of the refined surface.
     """
+    knot_vector = list(surface.knot_vector)
     degree = surface.degree[direction]
-    knots = surface.knot_vector[direction]
-    if direction == 0:
-        control_points = surface.control_points.transpose(1, 0, 2)
-    else:
-        control_points = surface.control_points
+    points, knot_vector[direction] = knot_refine(control_point_array(surface), degree, knot_vector[direction], knots2insert, axis=direction)
+    return split_weights(points, surface.rational) + (knot_vector,)
 
-    new_points = []
-    for cptrow in control_points:
-        control_points, _, knot_vector = curve_knot_refine((cptrow, degree, knots), knots2insert)
-        new_points.append(control_points)
 
-    new_knots = knot_vector
-    if direction == 0:
-        new_points = np.array(new_points).transpose(1, 0, 2)
-        knot_vector = [new_knots, surface.knot_vector[1]]
+def remove_knot(control_points, degree, knot_vector, r, num, tolerance):
+    """Removes a knot up to ``num`` times, as long as the control points change by less than ``tolerance``.
+
+    Corresponds to Algorithm A5.8 (Piegl & Tiller). The removability test
+    takes the maximum distance over all trailing axes, so all rows of a
+    surface are tested and updated together.
+
+    Parameters
+    ----------
+    control_points : :class:`numpy.array`
+        The control points, with the first axis along the knot vector.
+    degree : int
+        The degree.
+    knot_vector : list of float
+        The knot vector.
+    r : int
+        The index of the last occurrence of the knot in the knot vector.
+    num : int
+        The number of times the knot should be removed.
+    tolerance : float
+        The maximum distance between the control points computed from the left
+        and from the right.
+
+    Returns
+    -------
+    tuple (control_points, knot_vector, t, error)
+        The new control points and knot vector, the number of removals and the
+        largest distance of the removals, which bounds the change of the curve.
+    """
+    P = np.array(control_points, dtype=float)
+    U = list(knot_vector)
+    p, n = degree, len(P) - 1
+    m, order = n + p + 1, p + 1
+    u = U[r]
+    s = 1
+    while s <= r and abs(U[r - s] - u) < EPSILON:
+        s += 1
+    fout = (2 * r - s - p) // 2
+    first, last = r - p, r - s
+    temp = np.zeros((2 * p + 2 + num * 2,) + P.shape[1:])
+
+    def distance(a, b):
+        return np.linalg.norm(a - b, axis=-1).max()
+
+    t, error = 0, 0.0
+    while t < num:
+        off = first - 1
+        temp[0], temp[last + 1 - off] = P[off], P[last + 1]
+        i, j, ii, jj = first, last, 1, last - off
+        while j - i > t:
+            alfi = (u - U[i]) / (U[i + order + t] - U[i])
+            alfj = (u - U[j - t]) / (U[j + order] - U[j - t])
+            temp[ii] = (P[i] - (1.0 - alfi) * temp[ii - 1]) / alfi
+            temp[jj] = (P[j] - alfj * temp[jj + 1]) / (1.0 - alfj)
+            i, ii, j, jj = i + 1, ii + 1, j - 1, jj - 1
+        if j - i < t:
+            d = distance(temp[ii - 1], temp[jj + 1])
+        else:
+            alfi = (u - U[i]) / (U[i + order + t] - U[i])
+            d = distance(P[i], alfi * temp[ii + t + 1] + (1.0 - alfi) * temp[ii - 1])
+        if d > tolerance:
+            break
+        error = max(error, d)
+        i, j = first, last
+        while j - i > t:
+            P[i], P[j] = temp[i - off], temp[j - off]
+            i, j = i + 1, j - 1
+        first, last = first - 1, last + 1
+        t += 1
+    if t == 0:
+        return P, U, 0, error
+    for k in range(r + 1, m + 1):
+        U[k - t] = U[k]
+    j = i = fout
+    for k in range(1, t):
+        if k % 2 == 1:
+            i += 1
+        else:
+            j -= 1
+    for k in range(i + 1, n + 1):
+        P[j] = P[k]
+        j += 1
+    return P[:n + 1 - t], U[:m + 1 - t], t, error
+
+
+def knot_removal(control_points, degree, knot_vector, tolerance, axis=0, rational=False):
+    """Removes as many interior knots as possible within a tolerance.
+
+    Every interior knot is removed with :func:`remove_knot` as long as the
+    deviation from the original at samples around the knot stays within the
+    tolerance. All control point sets along the other axes, e.g. the rows of
+    a surface, are reduced together.
+
+    The knots are visited from left to right and each removal only works on
+    a window of a few spans around the knot, the deviation is evaluated only
+    where the bound accumulated from the removals exceeds the tolerance.
+
+    Parameters
+    ----------
+    control_points : :class:`numpy.array`
+        The control points (in homogeneous coordinates if rational).
+    degree : int
+        The degree along ``axis``.
+    knot_vector : list of float
+        The knot vector along ``axis``.
+    tolerance : float
+        The maximum deviation.
+    axis : int, optional
+        The axis of the control points along the knot vector. Defaults to 0.
+    rational : bool, optional
+        ``True`` if the control points are homogeneous.
+
+    Returns
+    -------
+    tuple (control_points, knot_vector, deviation)
+        The reduced control points and knot vector and the maximum deviation
+        at the samples.
+    """
+    P = np.moveaxis(np.array(control_points, dtype=float), axis, 0).copy()
+    U = np.array(knot_vector, dtype=float)
+    p = degree
+    knots, multiplicities = knot_vector_multiplicities_numpy(U)
+    params = np.unique(np.concatenate([np.linspace(a, b, 2 * p + 3) for a, b in zip(knots[:-1], knots[1:])]))
+
+    def values(points, knots, params):
+        spans = find_spans_numpy(knots, len(points), params)
+        bases = basis_functions_numpy(p, knots, spans, params)
+        values = np.einsum('kj,kj...->k...', bases, points[spans[:, np.newaxis] - p + np.arange(p + 1)])
+        return split_weights(values, rational)[0]
+
+    reference = values(P, U, params)
+    if rational:
+        # bound for homogeneous coordinates, see equation (5.30) in The NURBS Book
+        weights = P[..., -1]
+        step_tolerance = tolerance * weights.min() / (1 + np.linalg.norm(P[..., :-1] / weights[..., np.newaxis], axis=-1).max())
     else:
-        knot_vector = [surface.knot_vector[0], new_knots]
+        step_tolerance = tolerance
+    # upper bounds of the deviation at the samples, raised by the change of each removal
+    # and measured by evaluation only if they exceed the tolerance
+    bound = np.zeros(len(params))
 
-    return new_points, surface.degree, knot_vector
+    # The reduced control points are compacted into the front of P, the points
+    # from ``h`` on are not reached yet, so each removal only touches a window
+    # of a few spans around the knot at the end of the compacted part.
+    g, h = 0, 0
 
+    def advance(count):
+        k = min(count - g, len(P) - h)
+        if k > 0:
+            P[g:g + k] = P[h:h + k]
+            U[g + p + 1:g + p + 1 + k] = U[h + p + 1:h + p + 1 + k]
+        return max(k, 0)
 
-def surface_isocurve(surface, direction, param):
-    """Extract an isocurve from a surface.
+    r = p  # the last index of the current knot
+    for s in multiplicities[1:-1].tolist():
+        r += s
+        k = advance(r + 2 * p + 4)
+        g, h = g + k, h + k
+        while s:
+            a = max(r - 2 * p - 2, 0)
+            reduced, reduced_U, t, error = remove_knot(P[a:g], p, U[a:g + p + 1], r - a, 1, step_tolerance)
+            if not t:
+                break
+            # only the curve over the support of the changed control points differs
+            local = slice(np.searchsorted(params, U[r - p], 'left'), np.searchsorted(params, U[r - s + p + 1], 'right'))
+            estimate = bound[local] + error * tolerance / step_tolerance
+            if estimate.size and estimate.max() > tolerance:
+                estimate = np.linalg.norm(values(reduced, reduced_U, params[local]) - reference[local], axis=-1)
+                if estimate.max() > tolerance:
+                    break
+            bound[local] = estimate
+            P[a:g - 1], U[a:g + p] = reduced, reduced_U
+            g, r, s = g - 1, r - 1, s - 1
+    k = advance(len(P))
+    P = P[:g + k]
+    U = U[:g + k + p + 1]
+    deviation = np.linalg.norm(values(P, U, params) - reference, axis=-1).max()
+    return np.moveaxis(P, 0, axis), U.tolist(), float(deviation)
+
+
+def curve_remove_knots(curve, tolerance):
+    """Removes the knots of a (rational) curve that are not needed within a tolerance.
+
+    Parameters
+    ----------
+    curve : :class:`Curve`
+        The curve.
+    tolerance : float
+        The maximum deviation.
+
+    Returns
+    -------
+    tuple (control_points, weights, knot_vector, deviation)
+        The control points, weights (``None`` if not rational) and knot vector
+        of the reduced curve, and its maximum deviation from the curve.
+    """
+    points, knot_vector, deviation = knot_removal(control_point_array(curve), curve.degree, curve.knot_vector, tolerance, rational=curve.rational)
+    return split_weights(points, curve.rational) + (knot_vector, deviation)
+
+
+def surface_remove_knots(surface, tolerance, direction):
+    """Removes the knots of a (rational) surface in one direction that are not needed within a tolerance.
+
+    As the surface is a convex combination of the curves along the rows of
+    control points, the deviation of the surface is bounded by the deviation
+    of the rows, which are reduced together.
 
     Parameters
     ----------
     surface : :class:`Surface`
         The surface.
+    tolerance : float
+        The maximum deviation.
     direction : int
         The surface direction, either 0 (u) or 1 (v).
-    param : float
-        The parameter at which to obtain the isocurve.
 
     Returns
     -------
-    :class:`Curve`
-        A curve in the provided direction.
+    tuple (control_points, weights, knot_vector, deviation)
+        The control points, weights (``None`` if not rational) and knot vectors
+        of the reduced surface, and its maximum deviation from the surface.
     """
-    knot_vector = surface.knot_vector[direction]
+    knot_vectors = list(surface.knot_vector)
     degree = surface.degree[direction]
+    points, knot_vectors[direction], deviation = knot_removal(control_point_array(surface), degree, knot_vectors[direction], tolerance, direction, surface.rational)
+    return split_weights(points, surface.rational) + (knot_vectors, deviation)
+
+
+def knot_split(control_points, degree, knot_vector, params, axis=0):
+    """Splits control points at the parameters with a single knot refinement.
+
+    Every split parameter is raised to the multiplicity ``degree``, after
+    which the pieces share their end control points and are cut out of the
+    refined control points.
+
+    Parameters
+    ----------
+    control_points : :class:`numpy.array`
+        The control points, with the axis ``axis`` along the knot vector.
+    degree : int
+        The degree along ``axis``.
+    knot_vector : list of float
+        The (clamped) knot vector along ``axis``.
+    params : list of float
+        The split parameters. Parameters at the ends of the domain are ignored.
+    axis : int, optional
+        The axis of the control points along the knot vector. Defaults to 0.
+
+    Returns
+    -------
+    list of (control_points, knot_vector)
+        The pieces in ascending order, with knot vectors on the original domain.
+    """
+    start, end = knot_vector[degree], knot_vector[-degree - 1]
+    if any(t < start - EPSILON or t > end + EPSILON for t in params):
+        raise ValueError("The split parameters must be within the domain")
+    params = sorted(set(float(t) for t in params if start + EPSILON < t < end - EPSILON))
+    knots2insert = []
+    for t in params:
+        mult = sum(1 for knot in knot_vector if abs(knot - t) < EPSILON)
+        knots2insert += [t for _ in range(degree - mult)]
+    control_points, knot_vector = knot_refine(control_points, degree, knot_vector, knots2insert, axis=axis)
+    knots = np.array(knot_vector)
+    # the curve passes through the control point before the first occurence of a split knot
+    indices = [0] + [int(np.searchsorted(knots, t - EPSILON)) - 1 for t in params] + [control_points.shape[axis] - 1]
+    breaks = [start] + params + [end]
+    pieces = []
+    for a, b, i, j in zip(breaks[:-1], breaks[1:], indices[:-1], indices[1:]):
+        interior = knots[(knots > a + EPSILON) & (knots < b - EPSILON)].tolist()
+        piece_knot_vector = [a for _ in range(degree + 1)] + interior + [b for _ in range(degree + 1)]
+        pieces.append((np.take(control_points, range(i, j + 1), axis=axis), piece_knot_vector))
+    return pieces
+
+
+def knot_clamp(control_points, degree, knot_vector, axis=0):
+    """Clamps an unclamped knot vector, e.g. of a periodic curve, at the ends of its domain.
+
+    The ends of the domain ``[knot_vector[degree], knot_vector[-degree - 1]]``
+    are raised to the multiplicity ``degree`` with a single knot refinement,
+    then the control points which only influence the curve outside of the
+    domain are removed.
+
+    Parameters
+    ----------
+    control_points : :class:`numpy.array`
+        The control points, with the axis ``axis`` along the knot vector.
+    degree : int
+        The degree along ``axis``.
+    knot_vector : list of float
+        The knot vector along ``axis``.
+    axis : int, optional
+        The axis of the control points along the knot vector. Defaults to 0.
+
+    Returns
+    -------
+    tuple (control_points, knot_vector)
+        The control points and the clamped knot vector, on the original domain.
+    """
+    knots = np.asarray(knot_vector, dtype=float)
+    start, end = knots[degree], knots[-degree - 1]
+    if abs(knots[0] - start) < EPSILON and abs(knots[-1] - end) < EPSILON:
+        return control_points, knots
+    knots2insert = []
+    for t in (start, end):
+        mult = int(np.sum(np.abs(knots - t) < EPSILON))
+        knots2insert += [t for _ in range(degree - mult)]
+    if knots2insert:
+        control_points, knots = knot_refine(control_points, degree, knots.tolist(), knots2insert, axis=axis)
+        knots = np.asarray(knots, dtype=float)
+    # the clamped curve starts at the control point ``degree`` before the last occurence of the
+    # start knot, and ends at the control point before the first occurence of the end knot
+    i = int(np.searchsorted(knots, start + EPSILON)) - 1 - degree
+    j = int(np.searchsorted(knots, end - EPSILON)) - 1
+    interior = knots[(knots > start + EPSILON) & (knots < end - EPSILON)]
+    knots = np.concatenate(([start] * (degree + 1), interior, [end] * (degree + 1)))
+    return np.take(control_points, range(i, j + 1), axis=axis), knots
+
+
+def curve_split(curve, params):
+    """Splits a (rational) curve at the parameters.
+
+    Parameters
+    ----------
+    curve : :class:`Curve`
+        The curve.
+    params : list of float
+        The split parameters.
 
-    surface.control_points = np.array(surface.control_points)
+    Returns
+    -------
+    list of (control_points, weights, knot_vector)
+        The pieces, with weights ``None`` if not rational.
+    """
+    pieces = knot_split(control_point_array(curve), curve.degree, curve.knot_vector, params)
+    return [split_weights(points, curve.rational) + (knot_vector,) for points, knot_vector in pieces]
 
+
+def surface_split(surface, params, direction):
+    """Splits a (rational) surface at the parameters in one direction.
+
+    Parameters
+    ----------
+    surface : :class:`Surface`
+        The surface.
+    params : list of float
+        The split parameters.
+    direction : int
+        The surface direction, either 0 (u) or 1 (v).
+
+    Returns
+    -------
+    list of (control_points, weights, knot_vector)
+        The pieces, with weights ``None`` if not rational.
+    """
+    degree, knot_vector = surface.degree[direction], surface.knot_vector[direction]
+    results = []
+    for points, piece_knot_vector in knot_split(control_point_array(surface), degree, knot_vector, params, axis=direction):
+        knot_vectors = list(surface.knot_vector)
+        knot_vectors[direction] = piece_knot_vector
+        results.append(split_weights(points, surface.rational) + (knot_vectors,))
+    return results
+
+
+def curve_bezier_segments(control_points, degree, knot_vector):
+    """Decomposes a clamped B-spline into its Bezier segments.
+
+    Every interior knot is raised to the multiplicity ``degree`` with
+    :func:`curve_knot_refine`, after which each knot span is described by
+    ``degree + 1`` control points.
+
+    Parameters
+    ----------
+    control_points : list of point
+        The (weighted) control points.
+    degree : int
+        The degree of the curve.
+    knot_vector : list of float
+        The knot vector of the curve.
+
+    Returns
+    -------
+    tuple (segments, intervals)
+        The control points of the segments as an array of shape
+        ``(num_segments, degree + 1, dimension)`` and the parameter interval
+        of each segment as an array of shape ``(num_segments, 2)``.
+    """
     knot_mults = knot_vector_multiplicities(knot_vector)
-    req_knot_idx = -1
-    for i in range(len(knot_mults)):
-        if abs(param - knot_mults[i][0]) < EPSILON:
-            req_knot_idx = i
-            break
-    num_knots2insert = degree + 1
-    if req_knot_idx >= 0:
-        num_knots2insert = (num_knots2insert - knot_mults[req_knot_idx][1])
+    knots2insert = []
+    for knot, mult in knot_mults[1:-1]:
+        knots2insert += [knot for _ in range(degree - mult)]
+    if knots2insert:
+        control_points, _, _ = curve_knot_refine((control_points, degree, knot_vector), knots2insert)
+    control_points = np.array(control_points)
+    breaks = [knot for knot, _ in knot_mults]
+    segments = np.array([control_points[i * degree:(i + 1) * degree + 1] for i in range(len(breaks) - 1)])
+    intervals = np.array([breaks[:-1], breaks[1:]]).T
+    return segments, intervals
 
-    if num_knots2insert > 0:
-        knots2insert = [param for _ in range(num_knots2insert)]
-        newsrf_control_points, newsrf_degree, newsrf_knot_vector = surface_knot_refine(surface, knots2insert, direction)
-    else:
-        newsrf_control_points, newsrf_degree, newsrf_knot_vector = surface.control_points, surface.degree, surface.knot_vector
 
-    span = knotspan(degree, param, knot_vector)
+def surface_bezier_patches(control_points, degree, knot_vector):
+    """Decomposes a clamped B-spline surface into its Bezier patches.
 
-    if abs(param - knot_vector[0]) < EPSILON:
-        span = 0
-    else:
-        if abs(param - knot_vector[-1]) < EPSILON:
-            if direction == 1:
-                span = len(newsrf_control_points[0]) - 1
-            else:
-                span = len(newsrf_control_points) - 1
+    Parameters
+    ----------
+    control_points : list of list of point
+        The (weighted) control points.
+    degree : tuple of int
+        The degrees in u- and v-direction.
+    knot_vector : tuple of list of float
+        The knot vectors in u- and v-direction.
 
-    if direction == 1:
-        control_points = [row[span] for row in newsrf_control_points]
-        return control_points, newsrf_degree[0], newsrf_knot_vector[0]
-    else:
-        return newsrf_control_points[span], newsrf_degree[1], newsrf_knot_vector[1]
+    Returns
+    -------
+    tuple (patches, intervals_u, intervals_v)
+        The control points of the patches as an array of shape
+        ``(num_u, num_v, degree_u + 1, degree_v + 1, dimension)`` and the
+        parameter intervals of the patches in both directions.
+    """
+    degree_u, degree_v = degree
+    # the rows are refined together, as knot refinement only combines whole points
+    segments_u, intervals_u = curve_bezier_segments(np.array(control_points), degree_u, knot_vector[0])
+    columns = segments_u.transpose(2, 0, 1, 3)  # (count_v, num_u, degree_u + 1, dimension)
+    segments_v, intervals_v = curve_bezier_segments(columns, degree_v, knot_vector[1])
+    patches = segments_v.transpose(2, 0, 3, 1, 4)
+    return patches, intervals_u, intervals_v
+
+
+def bezier_subdivide(control_points, t=0.5):
+    """Splits a Bezier segment at the local parameter ``t``.
+
+    Parameters
+    ----------
+    control_points : list of point
+        The (weighted) control points of the segment.
+    t : float, optional
+        The split parameter within [0, 1]. Defaults to 0.5.
+
+    Returns
+    -------
+    tuple (left, right)
+        The control points of both halves.
+    """
+    degree = len(control_points) - 1
+    knot_vector = [0.0 for _ in range(degree + 1)] + [1.0 for _ in range(degree + 1)]
+    points, _, _ = curve_knot_refine((control_points, degree, knot_vector), [t for _ in range(degree)])
+    points = np.array(points)
+    return points[:degree + 1], points[degree:]
+
+
+def surface_knot_refine(surface, knots2insert, direction):
+    """Performs knot refinement on a Surface by inserting knots at various parameters.
+
+    All rows of control points are refined in one operation.
+
+    Parameters
+    ----------
+    surface : :class:`Surface`
+        The surface to insert the knots into
+    knots2insert : list of float
+        The knots to insert - a list of parameter positions within the surface domain.
+    direction : int
+        The surface direction, either 0 (u) or 1 (v).
+
+    Returns
+    -------
+    tuple (control_points, degree, knot_vector)
+        The refined surface.
+    """
+    knot_vector = list(surface.knot_vector)
+    control_points, knot_vector[direction] = knot_refine(surface.control_points, surface.degree[direction], knot_vector[direction], knots2insert, axis=direction)
+    return control_points, surface.degree, knot_vector
+
+
+def surface_isocurves(surface, direction, params):
+    """Extracts isocurves from a surface.
+
+    The control points of the isocurves are obtained by contracting the
+    control net with the basis functions at the parameters, one matrix
+    product for all parameters. The surface is not modified.
+
+    Parameters
+    ----------
+    surface : :class:`Surface`
+        The surface.
+    direction : int
+        The surface direction of the parameters, either 0 (u) or 1 (v).
+    params : list of float
+        The parameters at which to obtain the isocurves.
+
+    Returns
+    -------
+    tuple (control_points, weights, degree, knot_vector)
+        The control points of all isocurves as an array of shape
+        ``(len(params), count, 3)``, their weights (``None`` if not rational),
+        and their common degree and knot vector.
+    """
+    basis = basis_matrix(surface.degree[direction], surface.knot_vector[direction], np.asarray(params, dtype=float), surface.count[direction])
+    points = np.tensordot(basis, control_point_array(surface), axes=(1, direction))
+    other = 1 - direction
+    return split_weights(points, surface.rational) + (surface.degree[other], list(surface.knot_vector[other]))
+
+
+def surface_isocurve(surface, direction, param):
+    """Extract an isocurve from a surface.
+
+    Parameters
+    ----------
+    surface : :class:`Surface`
+        The surface.
+    direction : int
+        The surface direction, either 0 (u) or 1 (v).
+    param : float
+        The parameter at which to obtain the isocurve.
+
+    Returns
+    -------
+    tuple (control_points, degree, knot_vector)
+        A curve in the other direction.
+    """
+    control_points, _, degree, knot_vector = surface_isocurves(surface, direction, [param])
+    return control_points[0], degree, knot_vector
@@ -0,0 +1,334 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .evaluators import evaluate_curve
+from .evaluators import evaluate_curve_derivatives
+from .evaluators import evaluate_surface
+from .evaluators import evaluate_surface_derivatives
+from .evaluators import evaluate_surface_grid
+from .intersections import curve_segments
+from .intersections import surface_patches
+
+
+def is_surface(geometry):
+    return not isinstance(geometry.degree, int)
+
+
+def geometry_bounding_box(geometry):
+    """Returns the axis-aligned bounding box of a curve or surface.
+
+    The box of the control points contains the geometry (convex hull
+    property). It is cached on the geometry until its geometry changes.
+
+    Parameters
+    ----------
+    geometry : :class:`Curve` or :class:`Surface`
+
+    Returns
+    -------
+    :class:`numpy.array`
+        The box as ``[[xmin, ymin, zmin], [xmax, ymax, zmax]]``.
+    """
+    if 'bounding_box' not in geometry._cache:
+        points = np.array(geometry.control_points, dtype=float).reshape(-1, 3)
+        geometry._cache['bounding_box'] = np.stack((points.min(axis=0), points.max(axis=0)))
+    return geometry._cache['bounding_box']
+
+
+def _segment_boxes(geometry):
+    if is_surface(geometry):
+        return surface_patches(geometry)[3].reshape(-1, 2, 3)
+    return curve_segments(geometry)[2]
+
+
+def _box_distances(boxes_a, boxes_b):
+    """Returns the distances between all pairs of boxes, a lower bound of the distance of their contents."""
+    gaps = np.maximum(boxes_a[:, np.newaxis, 0] - boxes_b[np.newaxis, :, 1], boxes_b[np.newaxis, :, 0] - boxes_a[:, np.newaxis, 1])
+    return np.linalg.norm(np.maximum(gaps, 0.0), axis=-1)
+
+
+class BoundingBoxIndex(object):
+    """A sweep-and-prune index over the bounding boxes of curves and surfaces.
+
+    The boxes are sorted along the axis with the largest spread of the box
+    centers. Candidate pairs are generated from the sorted intervals along
+    this axis and filtered by the other two, all in vectorized passes.
+
+    Transforming a geometry resets its cached box, :meth:`update` then only
+    recomputes the boxes of the modified geometries.
+
+    Parameters
+    ----------
+    geometries : list of :class:`Curve` or :class:`Surface`
+        The geometries to index.
+
+    Examples
+    --------
+    >>> from compas.geometry import Translation
+    >>> curves = [Curve([(i, 0, 0), (i + 0.5, 1, 0), (i, 2, 0)], 2) for i in range(4)]
+    >>> index = BoundingBoxIndex(curves)
+    >>> index.pairs(clearance=0.6).tolist()
+    [[0, 1], [1, 2], [2, 3]]
+    >>> curves[3].transform(Translation.from_vector([-2.5, 0, 0]))
+    >>> index.update()
+    [3]
+    >>> index.pairs(clearance=0.6).tolist()
+    [[0, 1], [0, 3], [1, 2], [1, 3]]
+    """
+
+    def __init__(self, geometries):
+        self.geometries = list(geometries)
+        self.boxes = np.array([geometry_bounding_box(geometry) for geometry in self.geometries], dtype=float).reshape(-1, 2, 3)
+        self._sort()
+
+    def _sort(self):
+        centers = self.boxes.sum(axis=1)
+        self.axis = int(np.argmax(centers.var(axis=0))) if len(centers) else 0
+        self.order = np.argsort(self.boxes[:, 0, self.axis], kind='stable')
+        self.starts = self.boxes[self.order, 0, self.axis]
+        self.max_extent = (self.boxes[:, 1, self.axis] - self.boxes[:, 0, self.axis]).max() if len(self.boxes) else 0.0
+
+    def add(self, geometry):
+        """Adds a geometry to the index.
+
+        Parameters
+        ----------
+        geometry : :class:`Curve` or :class:`Surface`
+
+        Returns
+        -------
+        int
+            The index of the geometry.
+        """
+        self.geometries.append(geometry)
+        self.boxes = np.concatenate((self.boxes, geometry_bounding_box(geometry)[np.newaxis]))
+        self._sort()
+        return len(self.geometries) - 1
+
+    def update(self, indices=None):
+        """Updates the boxes of modified geometries.
+
+        Parameters
+        ----------
+        indices : list of int, optional
+            The geometries to update. Defaults to all geometries whose cached
+            box was reset, e.g. by :meth:`BSpline.transform`.
+
+        Returns
+        -------
+        list of int
+            The indices of the updated geometries.
+        """
+        if indices is None:
+            indices = [i for i, geometry in enumerate(self.geometries) if 'bounding_box' not in geometry._cache]
+        if indices:
+            for i in indices:
+                self.boxes[i] = geometry_bounding_box(self.geometries[i])
+            self._sort()
+        return list(indices)
+
+    def query(self, box, clearance=0.0):
+        """Returns the geometries whose boxes are within ``clearance`` of a box.
+
+        Parameters
+        ----------
+        box : :class:`numpy.array`
+            The query box as ``[[xmin, ymin, zmin], [xmax, ymax, zmax]]``.
+        clearance : float, optional
+            The distance by which boxes are allowed to be apart.
+
+        Returns
+        -------
+        :class:`numpy.array`
+            The sorted indices of the geometries.
+        """
+        box = np.asarray(box, dtype=float)
+        start = np.searchsorted(self.starts, box[0, self.axis] - clearance - self.max_extent, side='left')
+        end = np.searchsorted(self.starts, box[1, self.axis] + clearance, side='right')
+        candidates = self.order[start:end]
+        boxes = self.boxes[candidates]
+        mask = np.all(boxes[:, 1] >= box[0] - clearance, axis=1) & np.all(boxes[:, 0] <= box[1] + clearance, axis=1)
+        return np.sort(candidates[mask])
+
+    def pairs(self, clearance=0.0, indices=None, chunk_size=1000000):
+        """Returns the pairs of geometries whose boxes are within ``clearance``.
+
+        Parameters
+        ----------
+        clearance : float, optional
+            The distance by which boxes are allowed to be apart.
+        indices : list of int, optional
+            Only return pairs involving these geometries, e.g. the ones that
+            were just updated. Defaults to all geometries.
+        chunk_size : int, optional
+            The maximum number of pairs tested at once along the sweep axis.
+
+        Returns
+        -------
+        :class:`numpy.array`
+            The candidate pairs ``(i, j)`` with ``i < j``, sorted lexicographically.
+        """
+        if indices is not None:
+            pairs = [np.stack(np.broadcast_arrays(i, self.query(self.boxes[i], clearance)), axis=1) for i in indices]
+            return _unique_pairs(np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=int))
+        # for each box, all boxes starting after it and before its end (plus clearance) along the sweep axis
+        ends = np.searchsorted(self.starts, self.boxes[self.order, 1, self.axis] + clearance, side='right')
+        counts = ends - np.arange(len(ends)) - 1
+        totals = np.cumsum(counts)
+        blocks = np.searchsorted(totals, np.arange(chunk_size, totals[-1] if len(totals) else 0, chunk_size)) + 1
+        blocks = np.unique(np.concatenate(([0], blocks, [len(counts)])))
+        pairs = []
+        for first, last in zip(blocks[:-1], blocks[1:]):
+            rows = np.repeat(np.arange(first, last), counts[first:last])
+            offsets = np.arange(len(rows)) - np.repeat(totals[first:last] - counts[first:last] - (totals[first - 1] if first else 0), counts[first:last])
+            a, b = self.order[rows], self.order[rows + offsets + 1]
+            mask = np.all(self.boxes[a, 1] >= self.boxes[b, 0] - clearance, axis=1) & np.all(self.boxes[b, 1] >= self.boxes[a, 0] - clearance, axis=1)
+            pairs.append(np.stack((a[mask], b[mask]), axis=1))
+        return _unique_pairs(np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=int))
+
+
+def _unique_pairs(pairs):
+    pairs = np.sort(pairs, axis=1)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    return np.unique(pairs, axis=0).reshape(-1, 2)
+
+
+# ==============================================================================
+# exact distances
+# ==============================================================================
+
+
+def _samples(geometry):
+    if 'samples' in geometry._cache:
+        return geometry._cache['samples']
+    if is_surface(geometry):
+        params = [np.linspace(0., 1., max(8, 4 * c)) for c in geometry.count]
+        points = evaluate_surface_grid(geometry, *params).reshape(-1, 3)
+        params = np.stack(np.meshgrid(*params, indexing='ij'), axis=-1).reshape(-1, 2)
+    else:
+        params = np.linspace(0., 1., max(8, 4 * geometry.count))
+        points = evaluate_curve(geometry, params)
+        params = params[:, np.newaxis]
+    geometry._cache['samples'] = params, points, cKDTree(points)
+    return geometry._cache['samples']
+
+
+def _local_derivatives(geometry, params):
+    """Returns the point, the jacobian (3, k) and the second derivatives (k, k, 3) at the parameters."""
+    if is_surface(geometry):
+        d = evaluate_surface_derivatives(geometry, [params], order=2)[0]
+        return d[0, 0], np.stack((d[1, 0], d[0, 1]), axis=1), np.array([[d[2, 0], d[1, 1]], [d[1, 1], d[0, 2]]])
+    d = evaluate_curve_derivatives(geometry, [params[0]], order=2)[0]
+    return d[0], d[1][:, np.newaxis], d[2][np.newaxis, np.newaxis]
+
+
+def _points(geometry, params):
+    if is_surface(geometry):
+        return evaluate_surface(geometry, [params])[0]
+    return evaluate_curve(geometry, [params[0]])[0]
+
+
+def _closest_points_newton(geometry_a, geometry_b, x, max_iterations=30, tolerance=1e-12):
+    """Minimizes the distance between two geometries with projected Newton steps from the parameters ``x``."""
+    k = 2 if is_surface(geometry_a) else 1
+    x = np.array(x, dtype=float)
+    f = None
+    for _ in range(max_iterations):
+        pa, ja, ha = _local_derivatives(geometry_a, x[:k])
+        pb, jb, hb = _local_derivatives(geometry_b, x[k:])
+        r = pa - pb
+        f = r.dot(r)
+        J = np.hstack((ja, -jb))
+        g = J.T.dot(r)
+        H = J.T.dot(J)
+        H[:k, :k] += ha.dot(r)
+        H[k:, k:] -= hb.dot(r)
+        # parameters on the boundary of the domain that would leave it stay fixed
+        free = ~(((x <= 0.0) & (g > 0)) | ((x >= 1.0) & (g < 0)))
+        if not free.any():
+            break
+        Hf = H[np.ix_(free, free)]
+        try:
+            np.linalg.cholesky(Hf)
+        except np.linalg.LinAlgError:
+            # not convex here, fall back to the Gauss-Newton matrix
+            Hf = J[:, free].T.dot(J[:, free]) + 1e-12 * np.eye(free.sum())
+        step = np.zeros_like(x)
+        step[free] = -np.linalg.lstsq(Hf, g[free], rcond=None)[0]
+        alpha = 1.0
+        while alpha > 1e-4:
+            y = np.clip(x + alpha * step, 0.0, 1.0)
+            s = _points(geometry_a, y[:k]) - _points(geometry_b, y[k:])
+            if s.dot(s) <= f:
+                break
+            alpha *= 0.5
+        else:
+            break
+        moved = np.abs(y - x).max()
+        x, f = y, s.dot(s)
+        if moved < tolerance:
+            break
+    return np.sqrt(f), x
+
+
+def closest_points(geometry_a, geometry_b, starts=3):
+    """Computes the minimum distance between two curves or surfaces.
+
+    The closest pairs of sample points are found with a k-d tree and refined
+    with projected Newton iterations on the squared distance. The samples and
+    their tree are cached on the geometries.
+
+    Parameters
+    ----------
+    geometry_a : :class:`Curve` or :class:`Surface`
+    geometry_b : :class:`Curve` or :class:`Surface`
+    starts : int, optional
+        The number of sample pairs that are refined.
+
+    Returns
+    -------
+    tuple (distance, params_a, params_b)
+        The minimum distance and the parameters of the closest points.
+    """
+    params_a, points_a, _ = _samples(geometry_a)
+    params_b, _, tree_b = _samples(geometry_b)
+    distances, nearest = tree_b.query(points_a)
+    best = None
+    for i in np.argsort(distances)[:starts]:
+        distance, x = _closest_points_newton(geometry_a, geometry_b, np.concatenate((params_a[i], params_b[nearest[i]])))
+        if best is None or distance < best[0]:
+            best = distance, x
+    distance, x = best
+    k = len(params_a[0])
+    return float(distance), x[:k].tolist(), x[k:].tolist()
+
+
+def find_clashes(index, clearance=0.0, indices=None):
+    """Finds the pairs of indexed geometries that are closer than ``clearance``.
+
+    Candidate pairs from the index are culled with the cached bounding boxes
+    of the Bezier segments (patches) before the exact distance is computed.
+
+    Parameters
+    ----------
+    index : :class:`BoundingBoxIndex`
+        The index of the geometries.
+    clearance : float, optional
+        The minimum allowed distance.
+    indices : list of int, optional
+        Only check pairs involving these geometries.
+
+    Returns
+    -------
+    list of (int, int, float)
+        The clashing pairs and their distances.
+    """
+    clashes = []
+    for i, j in index.pairs(clearance, indices).tolist():
+        a, b = index.geometries[i], index.geometries[j]
+        if _box_distances(_segment_boxes(a), _segment_boxes(b)).min() > clearance:
+            continue
+        distance, _, _ = closest_points(a, b)
+        if distance <= clearance:
+            clashes.append((i, j, distance))
+    return clashes
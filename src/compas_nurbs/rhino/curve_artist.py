@@ -15,12 +15,14 @@ class CurveArtist(BaseArtist):
         self.curve = curve
 
     def draw(self):
-        points = [rg.Point3d(*p) for p in self.curve.control_points]
-        knots = self.curve.knot_vector[1:-1]
-        return rs.AddNurbsCurve(points, knots, self.curve.degree, self.curve.weights)
+        data = self.curve.data  # lists, also if the curve stores arrays
+        points = [rg.Point3d(*p) for p in data['control_points']]
+        knots = data['knot_vector'][1:-1]
+        weights = data['weights'] if self.curve.rational else None
+        return rs.AddNurbsCurve(points, knots, self.curve.degree, weights)
 
     def draw_points(self):
-        return rs.AddPoints(self.curve.control_points)
+        return rs.AddPoints(self.curve.data['control_points'])
 
     def redraw(self, timeout=None):
         """Redraw the Rhino view.
@@ -16,17 +16,19 @@ class SurfaceArtist(BaseArtist):
         self.surface = surface
 
     def draw(self):
+        data = self.surface.data  # lists, also if the surface stores arrays
         point_count = self.surface.count
-        points = [rg.Point3d(*p) for pl in self.surface.control_points for p in pl]
-        weights = list(flatten(self.surface.weights))
-        knots_u = self.surface.knot_vector[0][1:-1]
-        knots_v = self.surface.knot_vector[1][1:-1]
+        points = [rg.Point3d(*p) for pl in data['control_points'] for p in pl]
+        weights = list(flatten(data['weights']))
+        knots_u = data['knot_vector'][0][1:-1]
+        knots_v = data['knot_vector'][1][1:-1]
         degree = self.surface.degree
-        ns = rg.NurbsSurface.Create(3, weights is not None, degree[0] + 1, degree[1] + 1, point_count[0], point_count[1])
+        rational = self.surface.rational
+        ns = rg.NurbsSurface.Create(3, rational, degree[0] + 1, degree[1] + 1, point_count[0], point_count[1])
         index = 0
         for i in range(point_count[0]):
             for j in range(point_count[1]):
-                if weights:
+                if rational:
                     cp = rg.ControlPoint(points[index], weights[index])
                     ns.Points.SetControlPoint(i, j, cp)
                 else:
@@ -42,7 +44,7 @@ class SurfaceArtist(BaseArtist):
         sc.doc.Objects.AddSurface(ns)
 
     def draw_points(self):
-        return rs.AddPoints(self.surface.control_points)
+        return rs.AddPoints([p for pl in self.surface.data['control_points'] for p in pl])
 
     def redraw(self, timeout=None):
         """Redraw the Rhino view.
@@ -0,0 +1,271 @@
+import weakref
+
+import numpy as np
+
+from .curve import Curve
+from .curve import RationalCurve
+from .surface import RationalSurface
+from .surface import Surface
+
+MAGIC = b'CNURBS'
+VERSION = 1
+
+#: The geometry types, stored by their position.
+TYPES = (Curve, RationalCurve, Surface, RationalSurface)
+
+#: The header of a buffer, ``flags`` is 1 if it contains a single geometry.
+HEADER = np.dtype([('magic', 'S6'), ('version', '<u2'), ('count', '<u4'), ('flags', '<u4')])
+
+#: One record per geometry, the offsets of the control points and knot vectors are counted in floats from the start of the data.
+INDEX = np.dtype([('type', '<u4'), ('rational', '<u4'), ('degree', '<u4', (2,)), ('count', '<u4', (2,)), ('points', '<u8'), ('knots', '<u8')])
+
+
+def _type_index(geometry):
+    for i, cls in enumerate(TYPES):
+        if type(geometry) is cls:
+            return i
+    for i, cls in reversed(list(enumerate(TYPES))):
+        if isinstance(geometry, cls):
+            return i
+    raise TypeError("Cannot serialize objects of type %s" % type(geometry).__name__)
+
+
+def encode(geometries):
+    """Encodes curves and surfaces as an index and one flat array of floats.
+
+    Parameters
+    ----------
+    geometries : list of :class:`compas_nurbs.bspline.BSpline`
+        The curves and surfaces.
+
+    Returns
+    -------
+    tuple (index, arrays)
+        The index, an array of :data:`INDEX` records, and the arrays which
+        make up the data, in order.
+    """
+    records, arrays, offset = [], [], 0
+    for geometry in geometries:
+        points = geometry._points
+        if isinstance(geometry, Surface):
+            degree, count, knot_vectors = tuple(geometry.degree), tuple(geometry.count), geometry._knot_vector
+        else:
+            degree, count, knot_vectors = (geometry.degree, 0), (geometry.count, 0), [geometry._knot_vector]
+        knots = offset + points.size
+        records.append((_type_index(geometry), geometry.rational, degree, count, offset, knots))
+        arrays.append(points.ravel())
+        arrays.extend(knot_vectors)
+        offset = knots + sum(len(knot_vector) for knot_vector in knot_vectors)
+    return np.array(records, dtype=INDEX), arrays
+
+
+def decode_geometry(record, data):
+    """Constructs a curve or surface from its index record, with views of the data.
+
+    Parameters
+    ----------
+    record : tuple
+        The index record, see :data:`INDEX`.
+    data : :class:`numpy.array`
+        The flat array of floats.
+
+    Returns
+    -------
+    :class:`compas_nurbs.bspline.BSpline`
+    """
+    type_index, rational, degree, count, points, knots = record
+    cls = TYPES[type_index]
+    dim = 4 if rational else 3
+    if issubclass(cls, Surface):
+        degree, count = tuple(int(d) for d in degree), tuple(int(c) for c in count)
+        size = count[0] + degree[0] + 1
+        knot_vector = [data[knots:knots + size], data[knots + size:knots + size + count[1] + degree[1] + 1]]
+    else:
+        degree, count = int(degree[0]), (int(count[0]),)
+        knot_vector = data[knots:knots + count[0] + degree + 1]
+    control_points = data[points:points + dim * int(np.prod(count))].reshape(count + (dim,))
+    return cls._from_point_array(control_points, degree, knot_vector, bool(rational))
+
+
+def decode(buffer):
+    """Returns the header, index and data of a buffer as read-only views.
+
+    Parameters
+    ----------
+    buffer : bytes or :class:`mmap.mmap`
+        The buffer, e.g. the contents of a file.
+
+    Returns
+    -------
+    tuple (header, index, data)
+    """
+    header = np.frombuffer(buffer, HEADER, 1)[0]
+    if header['magic'] != MAGIC:
+        raise ValueError("The buffer does not contain binary geometry.")
+    if header['version'] > VERSION:
+        raise ValueError("Unsupported version %d of binary geometry." % header['version'])
+    count = int(header['count'])
+    index = np.frombuffer(buffer, INDEX, count, HEADER.itemsize)
+    data = np.frombuffer(buffer, '<f8', offset=HEADER.itemsize + INDEX.itemsize * count)
+    return header, index, data
+
+
+def dumps(geometries):
+    """Serializes curves and surfaces to a compact binary buffer.
+
+    The buffer consists of a small header, an index with one record per
+    geometry and the control points (in homogeneous coordinates if rational)
+    and knot vectors of all geometries as little-endian float64 values.
+
+    Parameters
+    ----------
+    geometries : :class:`compas_nurbs.bspline.BSpline` or list of :class:`compas_nurbs.bspline.BSpline`
+        A curve or surface, or a list of them.
+
+    Returns
+    -------
+    bytes
+
+    Examples
+    --------
+    >>> curve = Curve([(0, 0, 0), (1, 1, 0), (2, 0, 0)], 2)
+    >>> surface = Surface([[(0, 0, 0), (0, 1, 1)], [(1, 0, 0), (1, 1, 2)]], (1, 1))
+    >>> allclose(loads(dumps([curve, surface]))[1].points_at([(0.5, 0.5)]), surface.points_at([(0.5, 0.5)]))
+    True
+    >>> loads(dumps(curve)).control_points.tolist()
+    [[0.0, 0.0, 0.0], [1.0, 1.0, 0.0], [2.0, 0.0, 0.0]]
+    """
+    header, index, arrays = _encode_buffer(geometries)
+    data = np.concatenate(arrays).astype('<f8', copy=False) if arrays else np.zeros(0, '<f8')
+    return b''.join((header.tobytes(), index.tobytes(), data.tobytes()))
+
+
+def _encode_buffer(geometries):
+    single = not isinstance(geometries, (list, tuple))
+    if single:
+        geometries = [geometries]
+    index, arrays = encode(geometries)
+    header = np.array([(MAGIC, VERSION, len(index), int(single))], dtype=HEADER)
+    return header, index, arrays
+
+
+def loads(buffer):
+    """Deserializes curves and surfaces from a binary buffer.
+
+    The control points and knot vectors of the geometries are read-only
+    views of the buffer, nothing is copied.
+
+    Parameters
+    ----------
+    buffer : bytes
+        A buffer written by :func:`dumps`.
+
+    Returns
+    -------
+    :class:`compas_nurbs.bspline.BSpline` or list of :class:`compas_nurbs.bspline.BSpline`
+    """
+    header, index, data = decode(buffer)
+    geometries = [decode_geometry(record, data) for record in index.tolist()]
+    return geometries[0] if header['flags'] & 1 else geometries
+
+
+def dump(geometries, fp):
+    """Writes curves and surfaces to a binary file, see :func:`dumps`.
+
+    Parameters
+    ----------
+    geometries : :class:`compas_nurbs.bspline.BSpline` or list of :class:`compas_nurbs.bspline.BSpline`
+        A curve or surface, or a list of them.
+    fp : str or file
+        The path of the file, or a file object opened in binary mode.
+    """
+    if not hasattr(fp, 'write'):
+        with open(fp, 'wb') as f:
+            return dump(geometries, f)
+    header, index, arrays = _encode_buffer(geometries)
+    fp.write(header.tobytes())
+    fp.write(index.tobytes())
+    for array in arrays:  # written one by one, without a copy of all data in memory
+        fp.write(np.ascontiguousarray(array, dtype='<f8').data)
+
+
+def load(fp):
+    """Reads curves and surfaces from a binary file, see :func:`loads`.
+
+    Parameters
+    ----------
+    fp : str or file
+        The path of the file, or a file object opened in binary mode.
+
+    Returns
+    -------
+    :class:`compas_nurbs.bspline.BSpline` or list of :class:`compas_nurbs.bspline.BSpline`
+    """
+    if hasattr(fp, 'read'):
+        return loads(fp.read())
+    with open(fp, 'rb') as f:
+        return loads(f.read())
+
+
+class GeometryLibrary(object):
+    """A read-only library of curves and surfaces in a memory-mapped file.
+
+    The file is written with :func:`dump`. Opening it only reads the header
+    and index, the geometries are constructed when they are accessed, with
+    read-only views of the map as control points and knot vectors. Hence the
+    operating system loads the pages on demand and shares them between all
+    processes which open the same file.
+
+    Changes of the geometries, e.g. transformations, are not written back.
+    A geometry is constructed again once no reference to it is left.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file.
+
+    Attributes
+    ----------
+    index : :class:`numpy.array`
+        The index records, see :data:`INDEX`, e.g. to select geometries by
+        type or size without constructing them.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'library.bin')
+    >>> dump([Curve([(0, 0, 0), (1, i, 0), (2, 0, 0)], 2) for i in range(10)], path)
+    >>> library = GeometryLibrary(path)
+    >>> len(library)
+    10
+    >>> library[4].control_points.tolist()
+    [[0.0, 0.0, 0.0], [1.0, 4.0, 0.0], [2.0, 0.0, 0.0]]
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode='r')
+        _, self.index, self._data = decode(self._map)
+        self._geometries = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        geometry = self._geometries.get(key)
+        if geometry is None:
+            geometry = decode_geometry(self.index[key].tolist(), self._data)
+            self._geometries[key] = geometry
+        return geometry
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __reduce__(self):
+        # worker processes open the file again and share its pages
+        return (GeometryLibrary, (self.path,))
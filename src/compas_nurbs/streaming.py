@@ -0,0 +1,195 @@
+import numpy as np
+
+from .helpers import EPSILON
+from .operations import knot_removal
+
+
+class IncrementalCurve(object):
+    """A cubic curve through a growing sequence of points, e.g. live sensor data.
+
+    Each new point is appended with local cubic interpolation: every span
+    between two consecutive points is a cubic Bezier segment whose tangents
+    are estimated from the neighbouring points (Bessel's method), and the
+    segments join tangent continuously at double knots. The parameters are the
+    accumulated chord lengths. Appending a point only changes the last segment,
+    hence the work per point does not depend on the number of points.
+
+    Please refer to The NURBS Book (2nd Edition), pp.395-397 for details.
+
+    All segments but the last one are final, :meth:`compact` reduces them with
+    knot removal and keeps them as a prefix which is not touched again.
+
+    Parameters
+    ----------
+    points : list of point, optional
+        Initial points.
+    window : int, optional
+        If given, the final segments are compacted automatically as soon as
+        there are more than ``window`` of them.
+    tolerance : float, optional
+        The tolerance of the automatic compaction. Defaults to 1e-6.
+
+    Examples
+    --------
+    >>> import math
+    >>> builder = IncrementalCurve()
+    >>> builder.extend([(t, math.sin(t / 10.), 0) for t in range(100)])
+    >>> builder.curve.count
+    200
+    >>> deviation = builder.compact(tolerance=1e-3)
+    >>> builder.curve.count < 40
+    True
+    """
+
+    def __init__(self, points=None, window=None, tolerance=1e-6):
+        self.window = window
+        self.tolerance = tolerance
+        self.deviation = 0.0
+        self._frozen_points = np.empty((0, 3))  # grows by doubling, the first _num_frozen rows are used
+        self._num_frozen = 0
+        self._frozen_knots = None
+        self._segments = []  # inner control points of the active segments
+        self._points = []  # the points at the breaks of the active segments
+        self._breaks = []
+        self._num_points = 0
+        self._delta = None
+        self._direction = None
+        self._curve = None
+        if points is not None:
+            self.extend(points)
+
+    def __len__(self):
+        return self._num_points
+
+    def append(self, point):
+        """Appends a point to the end of the curve.
+
+        Parameters
+        ----------
+        point : point
+            The new point, repeated points are skipped.
+
+        Returns
+        -------
+        bool
+            ``True`` if the point was added.
+        """
+        point = np.array(point, dtype=float)
+        if not self._breaks:
+            self._points, self._breaks, self._num_points = [point], [0.], 1
+            return True
+        end = self._points[-1]
+        delta = np.linalg.norm(point - end)
+        if delta < EPSILON:
+            return False
+        direction = (point - end) / delta
+
+        if not self._segments:
+            tangent = direction
+        else:
+            # Bessel's tangent at the previous end point, which is now interior
+            tangent = (delta * self._direction + self._delta * direction) / (self._delta + delta)
+            self._segments[-1][1] = end - self._delta / 3. * tangent
+            if self._frozen_knots is None and len(self._segments) == 1:
+                start_tangent = 2 * self._direction - tangent
+                self._segments[0][0] = self._points[0] + self._delta / 3. * start_tangent
+        end_tangent = 2 * direction - tangent
+        self._segments.append([end + delta / 3. * tangent, point - delta / 3. * end_tangent])
+
+        self._points.append(point)
+        self._breaks.append(self._breaks[-1] + delta)
+        self._delta, self._direction = delta, direction
+        self._num_points += 1
+        self._curve = None
+        if self.window and len(self._segments) > self.window:
+            self.compact(self.tolerance)
+        return True
+
+    def extend(self, points):
+        """Appends many points to the end of the curve.
+
+        Parameters
+        ----------
+        points : list of point
+            The new points.
+        """
+        for point in points:
+            self.append(point)
+
+    def _active_knots(self, start):
+        """Returns the knots of the active segments after the given start knots."""
+        knots = list(start)
+        for knot in self._breaks[1:-1]:
+            knots += [knot, knot]
+        return knots + [self._breaks[-1]] * 4
+
+    @property
+    def curve(self):
+        """:class:`compas_nurbs.Curve` : The current curve, with the domain [0, 1]."""
+        from compas_nurbs import Curve
+        if len(self._breaks) < 2:
+            raise ValueError("The curve needs at least two distinct points.")
+        if self._curve is None:
+            if self._frozen_knots is None:
+                frozen, start = self._points[:1], [self._breaks[0]] * 4
+            else:
+                frozen, start = self._frozen_points[:self._num_frozen], self._frozen_knots[:-1]
+            control_points = np.concatenate((frozen, np.reshape(self._segments, (-1, 3)), self._points[-1:]))
+            knot_vector = np.array(self._active_knots(start)) / self._breaks[-1]
+            self._curve = Curve.from_arrays(control_points, 3, knot_vector)
+        return self._curve
+
+    def _freeze(self, control_points):
+        """Appends control points to the compacted prefix, the array is doubled when it is full."""
+        count = self._num_frozen + len(control_points)
+        if count > len(self._frozen_points):
+            frozen = np.empty((max(count, 2 * len(self._frozen_points)), 3))
+            frozen[:self._num_frozen] = self._frozen_points[:self._num_frozen]
+            self._frozen_points = frozen
+        self._frozen_points[self._num_frozen:count] = control_points
+        self._num_frozen = count
+
+    def compact(self, tolerance=1e-6):
+        """Reduces the final segments by knot removal.
+
+        All segments but the last one are final. They are reduced within the
+        tolerance and appended to the compacted prefix of the curve, so each
+        part of the curve is reduced only once and the deviation from the
+        local interpolation stays within the tolerance.
+
+        Parameters
+        ----------
+        tolerance : float, optional
+            The maximum deviation. Defaults to 1e-6.
+
+        Returns
+        -------
+        float
+            The maximum deviation of the compacted segments.
+        """
+        if len(self._segments) < 2:
+            return 0.0
+        control_points = [self._points[0]]
+        for segment in self._segments[:-1]:
+            control_points += segment
+        control_points.append(self._points[-2])
+        knot_vector = [self._breaks[0]] * 4
+        for knot in self._breaks[1:-2]:
+            knot_vector += [knot, knot]
+        knot_vector += [self._breaks[-2]] * 4
+        control_points, knot_vector, deviation = knot_removal(np.array(control_points), 3, knot_vector, tolerance)
+
+        if self._frozen_knots is None:
+            self._freeze(control_points)
+            self._frozen_knots = list(knot_vector)
+        else:
+            # the parts meet at a triple knot
+            self._freeze(control_points[1:])
+            del self._frozen_knots[-1]
+            self._frozen_knots.extend(knot_vector[4:])
+        self._segments = self._segments[-1:]
+        self._points = self._points[-2:]
+        self._breaks = self._breaks[-2:]
+        self._curve = None
+        self.deviation = max(self.deviation, deviation)
+        return deviation
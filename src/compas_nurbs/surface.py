@@ -1,17 +1,18 @@
 import compas
-from compas.geometry import Shape, Vector, Point
+from compas.geometry import Shape, Vector, Point, Plane, Polyline
 
 from compas_nurbs.bspline import BSpline
 from compas_nurbs.curve import Curve
+from compas_nurbs.curve import RationalCurve
 from compas_nurbs.curvature import SurfaceCurvature
+from compas_nurbs.helpers import EPSILON
+from compas_nurbs.knot_vectors import CurveKnotStyle
+from compas_nurbs.utilities import readonly
 
 if not compas.IPY:
-    from compas_nurbs.evaluators import evaluate_surface
-    from compas_nurbs.evaluators import evaluate_surface_derivatives
-    from compas_nurbs.evaluators import calculate_surface_curvature
-    from compas_nurbs.operations import surface_normals
-    from compas_nurbs.operations import unify_curves
-    from compas_nurbs.operations import surface_isocurve
+    import numpy as np
+    from compas_nurbs.knot_vectors import knot_vector_from_params_numpy
+    from compas_nurbs.knot_vectors import normalize_knot_vector_numpy
 
 
 class Surface(BSpline, Shape):
@@ -44,11 +45,17 @@ class Surface(BSpline, Shape):
     >>> surface = Surface(control_points_2d, (degree_u, degree_v))
     """
 
+    __slots__ = ()
+
     def __init__(self, control_points, degree, knot_vector=None, rational=False, weights=None):
         super(Surface, self).__init__(control_points, degree, knot_vector, rational, weights)
 
     def _build_backend(self):
-        self._surface = self  # no numpy surface
+        pass  # no numpy surface, the evaluators use the control point array
+
+    @property
+    def _surface(self):
+        return self
 
     # ==========================================================================
     # constructors
@@ -61,7 +68,8 @@ class Surface(BSpline, Shape):
         Parameters
         ----------
         curves: list of :class:`Curve`
-            A list of curves.
+            A list of curves. Curves of different degrees and knot vectors are
+            made compatible by degree elevation and knot insertion.
         degree_v : int
             The degree of the resulting surface in v-direction.
 
@@ -74,24 +82,98 @@ class Surface(BSpline, Shape):
         --------
         >>>
         """
-        curves = unify_curves(curves)
-        degree_u = curves[0].degree
-        knot_vector_u = curves[0].knot_vector
+        from compas_nurbs.operations import unify_curves
+        from compas_nurbs.operations import split_weights
+        from compas_nurbs.fitting import global_interpolation_along_axis
+        from compas_nurbs.fitting import grid_parameters
+        control_points, degree_u, knot_vector_u, rational = unify_curves(curves)
         degree_v = min(degree_v, len(curves) - 1)
-        control_points = []
-        count_u = len(curves[0].control_points)
-        knot_vector_v = []
-        for i in range(count_u):
-            points = [crv.control_points[i] for crv in curves]
-            c = Curve.from_points(points, degree_v)
-            control_points.append(c.control_points)
-            knot_vector_v = knot_vector_v or c.knot_vector
+        # all columns share the parameters, interpolate them at once
+        params = grid_parameters(control_points, axis=0)
+        knot_vector_v = knot_vector_from_params_numpy(degree_v, params).tolist()
+        columns = global_interpolation_along_axis(control_points, degree_v, knot_vector_v, params, axis=0)
+        control_points, weights = split_weights(columns.transpose(1, 0, 2), rational)
+        weights = weights.tolist() if rational else None
         # Rhino lofts into the opposite direction (u=>v)
-        return cls(control_points, (degree_u, degree_v), (knot_vector_u, knot_vector_v))
+        return cls(control_points.tolist(), (degree_u, degree_v), (knot_vector_u, knot_vector_v), rational=rational, weights=weights)
+
+    @classmethod
+    def from_points(cls, points, degree=(3, 3), knot_style=0):
+        """Constructs a surface interpolating a grid of points.
+
+        Parameters
+        ----------
+        points : list of list of point
+            The grid of points, ``points[i][j]`` lies at the i-th u- and the
+            j-th v-parameter.
+        degree : tuple of int, optional
+            The degree in the u- and the v-direction, limited by the number of
+            points. Defaults to ``(3, 3)``.
+        knot_style : int, optional
+            The knot style, either 0, 1, or 2 [uniform, chord, or chord_square_root].
+            Defaults to 0, uniform.
+
+        Returns
+        -------
+        :class:`Surface`
+            The interpolated surface.
+
+        Examples
+        --------
+        >>> points = [[(u, v, u * v) for v in range(4)] for u in range(5)]
+        >>> surface = Surface.from_points(points, knot_style=1)
+        >>> allclose(surface.points_at([(0., 0.), (0.5, 1.), (1., 1.)]), [(0, 0, 0), (2, 3, 6), (4, 3, 12)])
+        True
+        """
+        from compas_nurbs.fitting import global_surface_interpolation
+        if knot_style not in [CurveKnotStyle.Uniform, CurveKnotStyle.Chord, CurveKnotStyle.ChordSquareRoot]:
+            raise ValueError("Please pass a valid knot style: [0, 1, 2].")
+        degree = (min(degree[0], len(points) - 1), min(degree[1], len(points[0]) - 1))
+        control_points, knot_vectors = global_surface_interpolation(points, degree, knot_style)
+        return cls(control_points.tolist(), degree, knot_vectors)
 
     @classmethod
-    def from_points(cls, points):
-        pass
+    def from_points_approx(cls, points, degree=(3, 3), count=(10, 10), params=None, smoothing=1e-3, chunk_size=100000):
+        """Constructs a surface approximating scattered points in the least-squares sense.
+
+        Parameters
+        ----------
+        points : list of point
+            The points to approximate, e.g. a scan.
+        degree : tuple of int, optional
+            The degree in the u- and the v-direction. Defaults to ``(3, 3)``.
+        count : tuple of int, optional
+            The number of control points in the u- and the v-direction.
+            Defaults to ``(10, 10)``.
+        params : list of tuple (u, v), optional
+            The parameters of the points. Defaults to the projection onto the
+            best-fit plane of the points.
+        smoothing : float, optional
+            The weight of the thin plate energy of the control net. Defaults to 1e-3.
+        chunk_size : int, optional
+            The number of points processed at once. Defaults to 100000.
+
+        Returns
+        -------
+        tuple (:class:`Surface`, list of float)
+            The approximating surface and the distances between the points and
+            the surface at their parameters.
+
+        Examples
+        --------
+        >>> points = [(x, y, 0.1 * x * y) for x in range(10) for y in range(10)]
+        >>> params = [(x / 9., y / 9.) for x in range(10) for y in range(10)]
+        >>> surface, residuals = Surface.from_points_approx(points, count=(4, 4), params=params, smoothing=0)
+        >>> max(residuals) < 1e-6
+        True
+        """
+        from compas_nurbs.fitting import global_surface_approximation
+        if params is not None:
+            params = np.asarray(params, dtype=float)
+        control_points, knot_vectors, residuals = global_surface_approximation(np.asarray(points, dtype=float), degree, count,
+                                                                               params=params, smoothing=smoothing,
+                                                                               chunk_size=chunk_size)
+        return cls(control_points.tolist(), degree, knot_vectors), residuals.tolist()
 
     # ==========================================================================
     # evaluate
@@ -116,6 +198,7 @@ class Surface(BSpline, Shape):
         >>> surface.points_at(params)
         [Point(0.600, 0.800, 1.159), Point(0.600, 4.000, -0.164), Point(3.000, 0.800, 1.763), Point(3.000, 4.000, 0.562)]
         """
+        from compas_nurbs.evaluators import evaluate_surface
         points = evaluate_surface(self._surface, params)
         return [Point(*p) for p in points]
 
@@ -138,6 +221,7 @@ class Surface(BSpline, Shape):
         >>> surface.normals_at(params)
         [Vector(-0.822, 0.203, 0.533), Vector(-0.605, 0.324, 0.727), Vector(0.503, 0.424, 0.753), Vector(0.181, 0.181, 0.967)]
         """
+        from compas_nurbs.operations import surface_normals
         normals = surface_normals(self._surface, params)
         return [Vector(*n) for n in normals]
 
@@ -169,6 +253,7 @@ class Surface(BSpline, Shape):
         >>> close(curvature.mean, -0.12646)
         True
         """
+        from compas_nurbs.evaluators import calculate_surface_curvature
         derivatives = self._surface.derivatives_at(params, order=2)
         kappa1, kappa2, direction1, direction2, normal, mean, gauss = calculate_surface_curvature(derivatives)
         return [SurfaceCurvature((k1, k2), (d1, d2), n, m, g) for k1, k2, d1, d2, n, m, g in zip(kappa1, kappa2, direction1, direction2, normal, mean, gauss)]
@@ -188,18 +273,149 @@ class Surface(BSpline, Shape):
         :class:`numpy.array`
             A two-dimensional array.
         """
+        from compas_nurbs.evaluators import evaluate_surface_derivatives
         return evaluate_surface_derivatives(self._surface, params, order=order)
 
     # ==========================================================================
     # operations
     # ==========================================================================
 
+    def insert_knots(self, direction, knots):
+        """Inserts knots into the surface without changing its shape.
+
+        All rows of control points are refined in one operation.
+
+        Parameters
+        ----------
+        direction : int
+            The surface direction, either 0 (u) or 1 (v).
+        knots : list of float
+            The knots to insert, within the domain.
+
+        Returns
+        -------
+        :class:`Surface`
+            A new surface with the knots inserted.
+
+        Examples
+        --------
+        >>> refined = surface.insert_knots(0, [0.25, 0.5, 0.5])
+        >>> refined.count
+        [7, 3]
+        >>> allclose(refined.points_at([(0.3, 0.6)]), surface.points_at([(0.3, 0.6)]))
+        True
+        """
+        from compas_nurbs.operations import surface_insert_knots
+        return self._derive(*surface_insert_knots(self, knots, direction))
+
+    def split(self, direction, params):
+        """Splits the surface at the parameters in one direction.
+
+        All pieces are obtained from a single knot insertion.
+
+        Parameters
+        ----------
+        direction : int
+            The surface direction, either 0 (u) or 1 (v).
+        params : list of float
+            The split parameters. Parameters at the ends of the domain are ignored.
+
+        Returns
+        -------
+        list of :class:`Surface`
+            The pieces, each with normalized knot vectors.
+
+        Examples
+        --------
+        >>> pieces = surface.split(1, [0.5])
+        >>> allclose(pieces[1].points_at([(0.3, 0.0)]), surface.points_at([(0.3, 0.5)]))
+        True
+        """
+        from compas_nurbs.operations import surface_split
+        return [self._derive(*piece) for piece in surface_split(self, params, direction)]
+
+    def trim(self, u_range=None, v_range=None):
+        """Trims the surface to a parameter rectangle.
+
+        Parameters
+        ----------
+        u_range : tuple of float, optional
+            The parameter interval in u-direction. Defaults to the full domain.
+        v_range : tuple of float, optional
+            The parameter interval in v-direction. Defaults to the full domain.
+
+        Returns
+        -------
+        :class:`Surface`
+            The trimmed surface, with normalized knot vectors.
+
+        Examples
+        --------
+        >>> trimmed = surface.trim((0.2, 0.6), (0.5, 1.0))
+        >>> allclose(trimmed.points_at([(0.5, 0.5)]), surface.points_at([(0.4, 0.75)]))
+        True
+        """
+        surface = self
+        for direction, (t0, t1) in enumerate([u_range or (0.0, 1.0), v_range or (0.0, 1.0)]):
+            if not t0 < t1:
+                raise ValueError("Invalid parameter range: {}".format((t0, t1)))
+            pieces = surface.split(direction, [t0, t1])
+            surface = pieces[1] if t0 > EPSILON else pieces[0]
+        return surface
+
+    def remove_knots(self, direction, tolerance=1e-6):
+        """Removes all knots in one direction that are not needed to represent the surface within a tolerance.
+
+        All rows of control points are reduced together.
+
+        Parameters
+        ----------
+        direction : int
+            The surface direction, either 0 (u) or 1 (v).
+        tolerance : float, optional
+            The maximum deviation from the surface. Defaults to 1e-6.
+
+        Returns
+        -------
+        tuple (:class:`Surface`, float)
+            The reduced surface and its maximum deviation from the surface.
+
+        Examples
+        --------
+        >>> refined = surface.insert_knots(1, [0.3, 0.6])
+        >>> reduced, deviation = refined.remove_knots(1)
+        >>> reduced.count, deviation < 1e-6
+        ([4, 3], True)
+        """
+        from compas_nurbs.operations import surface_remove_knots
+        control_points, weights, knot_vector, deviation = surface_remove_knots(self, tolerance, direction)
+        return self._derive(control_points, weights, knot_vector), deviation
+
+    def _derive(self, control_points, weights, knot_vector):
+        """Creates a surface of the same type and degree from arrays."""
+        knot_vector = [normalize_knot_vector_numpy(kv) for kv in knot_vector]
+        if self.rational:
+            return RationalSurface.from_arrays(control_points, self.degree, knot_vector, weights=weights)
+        return Surface.from_arrays(control_points, self.degree, knot_vector)
+
     # ==========================================================================
     # queries
     # ==========================================================================
 
     def isocurve(self, direction, param):
-        """
+        """Extracts an isocurve from the surface.
+
+        Parameters
+        ----------
+        direction : int
+            The surface direction of the parameter, either 0 (u) or 1 (v).
+        param : float
+            The parameter at which to obtain the isocurve.
+
+        Returns
+        -------
+        :class:`Curve`
+            The isocurve in the other direction.
 
         Examples
         --------
@@ -218,8 +434,120 @@ class Surface(BSpline, Shape):
         >>> curve.degree == 3
         True
         """
-        control_points, degree, knot_vector = surface_isocurve(self._surface, direction, param)
-        return Curve(control_points, degree, knot_vector)
+        return self.isocurves(direction, [param])[0]
+
+    def isocurves(self, direction, params):
+        """Extracts many isocurves from the surface at once, e.g. for wireframe display.
+
+        The control points of all isocurves are computed with one contraction
+        of the control net with the basis functions at the parameters. The
+        surface is not modified.
+
+        Parameters
+        ----------
+        direction : int
+            The surface direction of the parameters, either 0 (u) or 1 (v).
+        params : list of float
+            The parameters at which to obtain the isocurves.
+
+        Returns
+        -------
+        list of :class:`Curve`
+            The isocurves in the other direction.
+
+        Examples
+        --------
+        >>> curves = surface.isocurves(1, [0.0, 0.25, 0.5])
+        >>> allclose(curves[1].points_at([0.3]), surface.points_at([(0.3, 0.25)]))
+        True
+        """
+        from compas_nurbs.operations import surface_isocurves
+        control_points, weights, degree, knot_vector = surface_isocurves(self._surface, direction, params)
+        knot_vector = normalize_knot_vector_numpy(knot_vector)
+        if self.rational:
+            return [RationalCurve.from_arrays(points, degree, knot_vector, weights=w) for points, w in zip(control_points, weights)]
+        return [Curve.from_arrays(points, degree, knot_vector) for points in control_points]
+
+    def contours(self, plane_origin, normal, spacing, resolution=None, fit=False):
+        """Intersects the surface with parallel planes, e.g. for slicing toolpaths.
+
+        The signed distance to the planes is evaluated on a cached parameter
+        grid, the zero sets of all planes are marched in one vectorized pass and
+        the contour points are refined onto the exact surface.
+
+        Parameters
+        ----------
+        plane_origin : point
+            A point on one of the planes.
+        normal : vector
+            The normal of the planes.
+        spacing : float
+            The distance between neighbouring planes.
+        resolution : tuple of int, optional
+            The number of grid samples in u- and v-direction.
+            Defaults to ``8 * count`` in each direction.
+        fit : bool, optional
+            If ``True``, interpolated :class:`Curve` objects are returned
+            instead of polylines. Defaults to ``False``.
+
+        Returns
+        -------
+        list of (:class:`Plane`, list of :class:`Polyline`)
+            The intersected planes, ordered along the normal, with their contours.
+
+        Examples
+        --------
+        >>> contours = surface.contours([0.75, 0, 0], [1, 0, 0], 1.5)
+        >>> [plane.point.x for plane, _ in contours]
+        [0.75, 2.25, 3.75, 5.25]
+        >>> plane, polylines = contours[1]
+        >>> allclose([p.x for p in polylines[0].points], [2.25] * len(polylines[0].points))
+        True
+        """
+        from compas_nurbs.intersections import surface_plane_contours
+        if resolution is None:
+            resolution = [8 * c for c in self.count]
+        normal = Vector(*normal).unitized()
+        contours = []
+        for offset, polylines in surface_plane_contours(self._surface, plane_origin, normal, spacing, resolution):
+            plane = Plane(Point(*plane_origin) + normal * offset, normal)
+            if fit:
+                polylines = [Curve.from_points(points, min(3, len(points) - 1)) for points in polylines]
+            else:
+                polylines = [Polyline(points.tolist()) for points in polylines]
+            contours.append((plane, polylines))
+        return contours
+
+    def intersect_surface(self, other, tolerance=1e-6, fit=False):
+        """Intersects the surface with another surface.
+
+        Parameters
+        ----------
+        other : :class:`Surface`
+            The other surface.
+        tolerance : float, optional
+            The distance below which points are considered on both surfaces.
+        fit : bool, optional
+            If ``True``, interpolated :class:`Curve` objects are returned
+            instead of polylines. Defaults to ``False``.
+
+        Returns
+        -------
+        list of :class:`Polyline`
+            The intersection branches. Closed branches end with their first point.
+
+        Examples
+        --------
+        >>> plane = Surface([[[-1, -1, 1], [-1, 9, 1]], [[7, -1, 1], [7, 9, 1]]], (1, 1))
+        >>> polylines = surface.intersect_surface(plane)
+        >>> allclose([p.z for polyline in polylines for p in polyline.points], [1] * sum(len(p.points) for p in polylines))
+        True
+        """
+        from compas_nurbs.intersections import surface_surface_intersections
+        branches = surface_surface_intersections(self._surface, other._surface, tolerance)
+        if fit:
+            return [Curve.from_points(points, min(3, len(points) - 1)) for points in branches]
+        return [Polyline(points.tolist()) for points in branches]
 
     # ==========================================================================
     # serialisation
@@ -227,12 +555,16 @@ class Surface(BSpline, Shape):
 
 
 class RationalSurface(Surface):
+    __slots__ = ()
+    _rational_default = True
+
     def __init__(self, control_points, degree, knot_vector=None, rational=True, weights=None):
         super(RationalSurface, self).__init__(control_points, degree, knot_vector, True, weights)
 
     @property
     def weighted_control_points(self):
-        return [[[w * x, w * y, w * z, w] for (x, y, z), w in zip(cl, wl)] for cl, wl in zip(self.control_points, self.weights)]
+        """:class:`numpy.array` : Read-only view of the weighted control points ``(w * x, w * y, w * z, w)``."""
+        return readonly(self._points)
 
 
 if __name__ == "__main__":
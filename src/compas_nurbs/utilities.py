@@ -78,6 +78,13 @@ def reshape(lst, shape):
     return [reshape(lst[i * n:(i + 1) * n], shape[1:]) for i in range(len(lst) // n)]
 
 
+def readonly(array):
+    """Returns a read-only view of a numpy array, which shares the memory of the array."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(globs=globals())
@@ -1,3 +1,5 @@
+import tracemalloc
+
 import numpy as np
 import rhino3dm
 from geomdl import BSpline
@@ -6,6 +8,9 @@ from compas.geometry import Point
 from compas.geometry import Vector
 from compas_nurbs import Curve
 from compas_nurbs import RationalCurve
+from compas_nurbs.intersections import curves_planes_intersections
+from compas_nurbs.operations import curve_knot_refine
+from compas_nurbs.operations import knot_refine
 from compas.tolerance import TOL
 
 def rhino_curve_from_curve(curve):
@@ -20,9 +25,9 @@ def rhino_curve_from_curve(curve):
 def geomdl_curve_from_curve(curve):
     crv = NURBS.Curve() if curve.rational else BSpline.Curve()
     crv.degree = curve.degree
-    crv.ctrlpts = curve.control_points
-    crv.knotvector = curve.knot_vector
-    crv.weights = curve.weights
+    crv.ctrlpts = curve.control_points.tolist()
+    crv.knotvector = curve.knot_vector.tolist()
+    crv.weights = curve.weights.tolist()
     return crv
 
 
@@ -127,6 +132,220 @@ def test_rational_curve():
     assert(TOL.is_allclose(circle_centers, rhino_centers, rtol=1e-03))
 
 
+def test_curve_intersection():
+    curve = Curve([(0, 0, 0), (3, 4, 0), (-1, 4, 0), (-4, 0, 0), (-4, -3, 0)], 3)
+    line = Curve([(-5, 1, 0), (5, 1, 0)], 1)
+    arc = RationalCurve([(-5, 1, 0), (0, 2, 0), (5, 1, 0)], 2, weights=[1., 3., 1.])
+
+    for other in [line, arc]:
+        intersections = curve.intersect(other)
+        assert(len(intersections) == 2)
+        for s, t in intersections:
+            assert(curve.points_at([s])[0].distance_to_point(other.points_at([t])[0]) < 1e-6)
+
+    # the line crosses the curve at y = 1
+    assert(TOL.is_allclose([p.y for p in curve.points_at([s for s, _ in curve.intersect(line)])], [1., 1.]))
+
+    far = Curve([(0, 10, 0), (1, 11, 0)], 1)
+    results = curve.intersect_curves([line, far, arc])
+    assert([len(r) for r in results] == [2, 0, 2])
+
+
+def test_insert_knots():
+    curve = Curve([(0, 0, 0), (3, 4, 0), (-1, 4, 0), (-4, 0, 0), (-4, -3, 0)], 3)
+    arc = RationalCurve([(-5, 1, 0), (0, 2, 0), (5, 1, 0)], 2, weights=[1., 3., 1.])
+    params = np.linspace(0, 1, 11)
+    for crv in [curve, arc]:
+        refined = crv.insert_knots([0.2, 0.5, 0.5, 0.7])
+        assert(refined.count == crv.count + 4)
+        assert(refined.rational == crv.rational)
+        assert(TOL.is_allclose(refined.points_at(params), crv.points_at(params)))
+
+    # a batch of curves sharing the knot vector is refined in one operation
+    batch = np.random.default_rng(0).random((10, 5, 3))
+    points, knot_vector = knot_refine(batch, 3, curve.knot_vector, [0.2, 0.5], axis=1)
+    assert(points.shape == (10, 7, 3))
+    for single, refined in zip(batch, points):
+        expected, _, expected_knot_vector = curve_knot_refine((single, 3, curve.knot_vector), [0.2, 0.5])
+        assert(TOL.is_allclose(refined, expected))
+    assert(knot_vector == expected_knot_vector)
+
+    # long curves are refined in memory linear in the number of control points
+    toolpath = Curve(np.cumsum(np.random.default_rng(1).random((10000, 3)), axis=0), 3)
+    tracemalloc.start()
+    refined = toolpath.insert_knots([0.25, 0.5, 0.5001])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert(refined.count == 10003)
+    assert(peak < 10 * 10003 * 3 * 8)
+    params = np.linspace(0, 1, 101)
+    assert(TOL.is_allclose(refined.points_at(params), toolpath.points_at(params)))
+
+
+def test_split_and_trim():
+    curve = Curve([(0, 0, 0), (3, 4, 0), (-1, 4, 0), (-4, 0, 0), (-4, -3, 0), (-2, -5, 1)], 3)  # interior knots 1/3, 2/3
+    arc = RationalCurve([(-5, 1, 0), (0, 2, 0), (5, 1, 0)], 2, weights=[1., 3., 1.])
+    local = np.linspace(0, 1, 7)
+    for crv in [curve, arc]:
+        params = [0.0, 0.2, 1 / 3., 0.5, 1.0]
+        pieces = crv.split(params)
+        assert(len(pieces) == 4)
+        for piece, (a, b) in zip(pieces, [(0.0, 0.2), (0.2, 1 / 3.), (1 / 3., 0.5), (0.5, 1.0)]):
+            assert(piece.rational == crv.rational)
+            assert(TOL.is_close(piece.knot_vector[0], 0.0) and TOL.is_close(piece.knot_vector[-1], 1.0))
+            assert(TOL.is_allclose(piece.points_at(local), crv.points_at(a + local * (b - a))))
+
+        trimmed = crv.trim(0.1, 0.7)
+        assert(TOL.is_allclose(trimmed.points_at(local), crv.points_at(0.1 + local * 0.6)))
+        trimmed = crv.trim(0.0, 0.7)
+        assert(TOL.is_allclose(trimmed.points_at(local), crv.points_at(local * 0.7)))
+
+
+def test_elevate_degree():
+    curve = Curve([(0, 0, 0), (3, 4, 0), (-1, 4, 0), (-4, 0, 0), (-4, -3, 0), (-2, -5, 1)], 3)
+    arc = RationalCurve([(-5, 1, 0), (0, 2, 0), (5, 1, 0)], 2, weights=[1., 3., 1.])
+    params = np.linspace(0, 1, 11)
+    for crv in [curve, arc]:
+        elevated = crv.elevate_degree(crv.degree + 2)
+        assert(elevated.degree == crv.degree + 2)
+        assert(elevated.rational == crv.rational)
+        # every distinct knot gains multiplicity 2
+        assert(len(elevated.knot_vector) - len(crv.knot_vector) == 2 * len(set(crv.knot_vector)))
+        assert(TOL.is_allclose(elevated.points_at(params), crv.points_at(params)))
+
+    # long curves are elevated without an operator of size count x count (800 MB here)
+    toolpath = Curve(np.cumsum(np.random.default_rng(1).random((10000, 3)), axis=0), 3)
+    elevated = toolpath.elevate_degree(4)
+    assert(elevated.count == 2 * 10000 - 3)
+    assert(TOL.is_allclose(elevated.points_at(params), toolpath.points_at(params)))
+
+
+def test_remove_knots():
+    curve = Curve([(0, 0, 0), (3, 4, 0), (-1, 4, 0), (-4, 0, 0), (-4, -3, 0), (-2, -5, 1)], 3)
+    arc = RationalCurve([(-5, 1, 0), (0, 2, 0), (5, 1, 0)], 2, weights=[1., 3., 1.])
+    params = np.linspace(0, 1, 101)
+    for crv in [curve, arc]:
+        # inserted knots are removed exactly
+        reduced, deviation = crv.insert_knots([0.2, 0.5, 0.5, 0.7]).remove_knots()
+        assert(reduced.count == crv.count)
+        assert(deviation < 1e-6)
+        assert(TOL.is_allclose(reduced.points_at(params), crv.points_at(params)))
+
+    # an interpolated helix is reduced to a few control points within the tolerance
+    t = np.linspace(0, 1, 200)
+    helix = Curve.from_points(np.stack([np.cos(6 * t), np.sin(6 * t), t], axis=1), 3)
+    reduced, deviation = helix.remove_knots(tolerance=1e-3)
+    assert(reduced.count < helix.count / 4)
+    assert(deviation <= 1e-3)
+    error = np.linalg.norm(np.array(reduced.points_at(params)) - np.array(helix.points_at(params)), axis=1).max()
+    assert(error <= 1e-3)
+
+    # a long toolpath, each removal only touches the spans around its knot
+    t = np.linspace(0, 1, 3000)
+    toolpath = Curve.from_points(np.stack([np.cos(150 * t), np.sin(150 * t), t], axis=1), 3)
+    reduced, deviation = toolpath.remove_knots(tolerance=1e-3)
+    assert(reduced.count < toolpath.count / 4)
+    params = np.linspace(0, 1, 20001)
+    error = np.linalg.norm(np.array(reduced.points_at(params)) - np.array(toolpath.points_at(params)), axis=1).max()
+    assert(deviation <= 1e-3 and error <= 1.1e-3)
+
+
+def test_curves_planes_intersections():
+    curve = Curve([(0, 0, 0), (3, 4, 0), (-1, 4, 0), (-4, 0, 0), (-4, -3, 0)], 3)
+    arc = RationalCurve([(-5, 1, 0), (0, 2, 0), (5, 1, 0)], 2, weights=[1., 3., 1.])
+    heights = [-2.5, 0.5, 1.5, 3.0]
+    planes = [([0, y, 0], [0, 1, 0]) for y in heights]
+
+    result = curves_planes_intersections([curve, arc], planes)
+    # the arc peaks at y = 1.75, so it only crosses y = 1.5 (twice)
+    assert(list(zip(result['curve'], result['plane'])) == [(0, 0), (0, 1), (0, 1), (0, 2), (0, 2), (0, 3), (0, 3), (1, 2), (1, 2)])
+    assert(TOL.is_allclose(result['point'][:, 1], [heights[i] for i in result['plane']]))
+    for c, t, point in zip(result['curve'], result['param'], result['point']):
+        assert(TOL.is_allclose([curve, arc][c].points_at([t])[0], point))
+
+    # a near-tangent pass crosses y = 0 twice within 1e-3 of the apex at t = 0.56, planes of different normals are culled separately
+    parabola = Curve([(0, 1.2544 - 4e-6, 0), (0.5, -0.9856 - 4e-6, 0), (1, 0.7744 - 4e-6, 0)], 2)
+    planes = [([0, 0, 0], [0, 1, 0]), ([0.5, 0, 0], [1, 0, 0]), ([0, 5, 0], [0, 1, 0]), ([0, 0, 1], [0, 0, 1])]
+    result = curves_planes_intersections([parabola], planes)
+    assert(list(result['plane']) == [0, 0, 1])
+    assert(TOL.is_allclose(result['point'][:, 0], [0.559, 0.561, 0.5]))
+
+
+def test_from_arrays():
+    control_points = np.array([(0, 0, 0), (1, 2, 0), (2, -1, 1), (3, 0, 0), (4, 1, 2)], dtype=float)
+    knot_vector = np.array([0, 0, 0, 0, 0.4, 1, 1, 1, 1])
+    weights = np.array([1, 2, 0.5, 1, 1])
+    params = np.linspace(0, 1, 7)
+    for curve, expected in [(Curve.from_arrays(control_points, 3, knot_vector),
+                             Curve(control_points.tolist(), 3, knot_vector.tolist())),
+                            (RationalCurve.from_arrays(control_points, 3, knot_vector, weights),
+                             RationalCurve(control_points.tolist(), 3, knot_vector.tolist(), weights.tolist()))]:
+        assert(curve.rational == expected.rational and curve.count == expected.count)
+        assert(np.allclose(curve.points_at(params), expected.points_at(params)))
+        assert(curve.data == expected.data)
+        curve.validate()
+
+    # default weights are created on access
+    assert(Curve.from_arrays(control_points, 2).weights.tolist() == [1.] * 5)
+    # the rational classes are rational without weights, too
+    curve = RationalCurve.from_arrays(control_points, 3)
+    assert(curve.rational and curve.weights.tolist() == [1.] * 5 and curve.weighted_control_points.shape == (5, 4))
+    assert(curve.data == RationalCurve(control_points.tolist(), 3).data)
+    for knot_vector, weights in [(knot_vector * 2, None), (knot_vector[::-1], None), (knot_vector[1:], None), (knot_vector, -weights)]:
+        try:
+            Curve.from_arrays(control_points, 3, knot_vector, weights, validate=True)
+            assert(False)
+        except ValueError:
+            pass
+
+
+def test_array_storage():
+    control_points = [(0, 0, 0), (1, 2, 0), (2, -1, 1), (3, 0, 0), (4, 1, 2)]
+    weights = [1, 2, 0.5, 1, 1]
+    curve = RationalCurve(control_points, 3, weights=weights)
+    assert(curve.weighted_control_points.shape == (5, 4) and curve.weighted_control_points.flags.c_contiguous)
+    assert(np.allclose(curve.weighted_control_points[:, :3], np.array(control_points) * np.array(weights)[:, np.newaxis]))
+    assert(np.allclose(curve.control_points, control_points) and np.allclose(curve.weights, weights))
+    for values in [curve.control_points, curve.weights, curve.knot_vector]:
+        try:
+            values[0] = 1.
+            assert(False)
+        except ValueError:
+            pass
+
+    # the setters keep the weights and reset the cached evaluation
+    point = curve.points_at([0.3])[0]
+    curve.control_points = np.array(control_points) + 1
+    assert(np.allclose(curve.weights, weights))
+    assert(np.allclose(curve.points_at([0.3])[0], np.array(point) + 1))
+    curve.weights = [1.] * 5
+    assert(np.allclose(curve.points_at([0.3]), Curve(np.array(control_points) + 1, 3).points_at([0.3])))
+    try:
+        curve.weights = [1.] * 4
+        assert(False)
+    except ValueError:
+        pass
+    assert('_point_array' not in vars(curve))  # stored in a slot
+
+    # non-rational geometry only accepts unit weights
+    assert(Curve(control_points, 3, weights=[1.] * 5).data == Curve(control_points, 3).data)
+    for construct in [lambda: Curve(control_points, 3, weights=weights),
+                      lambda: Curve.from_arrays(np.array(control_points), 3, weights=weights, rational=False)]:
+        try:
+            construct()
+            assert(False)
+        except ValueError:
+            pass
+
+
 if __name__ == "__main__":
     test_curve()
     test_rational_curve()
+    test_curve_intersection()
+    test_insert_knots()
+    test_split_and_trim()
+    test_elevate_degree()
+    test_remove_knots()
+    test_curves_planes_intersections()
+    test_from_arrays()
+    test_array_storage()
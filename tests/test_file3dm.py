@@ -0,0 +1,67 @@
+import numpy as np
+import rhino3dm
+
+from compas_nurbs import Curve
+from compas_nurbs import RationalCurve
+from compas_nurbs import RationalSurface
+from compas_nurbs import Surface
+from compas_nurbs.file3dm import curve_from_rhino3dm
+from compas_nurbs.file3dm import read_3dm
+from compas_nurbs.file3dm import surface_from_rhino3dm
+from compas_nurbs.file3dm import write_3dm
+
+
+def parameter_at(domain, t):
+    return domain.T0 + t * (domain.T1 - domain.T0)
+
+
+def rhino_points_at(geometry, params):
+    if isinstance(geometry, rhino3dm.Surface):
+        domain_u, domain_v = geometry.Domain(0), geometry.Domain(1)
+        points = [geometry.PointAt(parameter_at(domain_u, u), parameter_at(domain_v, v)) for u, v in params]
+    else:
+        points = [geometry.PointAt(parameter_at(geometry.Domain, t)) for t in params]
+    return np.array([[p.X, p.Y, p.Z] for p in points])
+
+
+def test_read_write_3dm(tmp_path):
+    rng = np.random.default_rng(5)
+    grid = np.stack(np.meshgrid(np.arange(4.), np.arange(5.), indexing='ij'), axis=-1)
+    expected = [Curve(rng.random((6, 3)), 3, [0, 0, 0, 0, 0.2, 0.7, 1, 1, 1, 1]),
+                RationalCurve(rng.random((5, 3)), 2, weights=rng.random(5) + 0.5),
+                Surface(np.concatenate((grid, rng.random((4, 5, 1))), axis=-1), (3, 2)).insert_knots(0, [0.25]),
+                RationalSurface(np.concatenate((grid, rng.random((4, 5, 1))), axis=-1), (2, 3), weights=rng.random((4, 5)) + 0.5)]
+    path = str(tmp_path / 'geometries.3dm')
+    write_3dm(expected, path)
+    rhino_geometries = [rhino_object.Geometry for rhino_object in rhino3dm.File3dm.Read(path).Objects]
+
+    for geometry, other, rhino_geometry in zip(read_3dm(path), expected, rhino_geometries):
+        assert(type(geometry) is type(other))
+        assert(np.allclose(geometry.control_points, other.control_points) and np.allclose(geometry.weights, other.weights))
+        assert(all(np.allclose(a, b) for a, b in zip(geometry.knot_vector, other.knot_vector)))
+        params = [(0.3, 0.6), (0.9, 0.1), (1., 1.)] if isinstance(geometry, Surface) else [0., 0.3, 0.9]
+        assert(np.allclose(geometry.points_at(params), rhino_points_at(rhino_geometry, params)))
+
+
+def test_unclamped_3dm():
+    # periodic geometry is clamped at the ends of its domain
+    points = [rhino3dm.Point3d(np.cos(a), np.sin(a), a / 10.) for a in np.linspace(0, 6, 8)]
+    rhino_curve = rhino3dm.NurbsCurve.Create(True, 3, points)
+    curve = curve_from_rhino3dm(rhino_curve)
+    params = np.linspace(0, 1, 11)
+    assert(np.allclose(curve.points_at(params), rhino_points_at(rhino_curve, params)))
+    assert(curve.count == 11 and curve.knot_vector[:4].tolist() == [0.] * 4)
+
+    circle = rhino3dm.Circle(rhino3dm.Point3d(0, 0, 0), 2.)
+    rhino_surface = rhino3dm.Cylinder(circle, 3.).ToNurbsSurface()
+    surface = surface_from_rhino3dm(rhino_surface)
+    assert(isinstance(surface, RationalSurface))
+    params = [(u, v) for u in np.linspace(0, 1, 5) for v in np.linspace(0, 1, 5)]
+    assert(np.allclose(surface.points_at(params), rhino_points_at(rhino_surface, params)))
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    test_read_write_3dm(pathlib.Path(tempfile.mkdtemp()))
+    test_unclamped_3dm()
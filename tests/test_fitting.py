@@ -2,8 +2,15 @@ import numpy as np
 from scipy import interpolate  # noqa: F401
 
 from compas.geometry import allclose
+from compas.geometry import close
 
 from compas_nurbs import Curve
+from compas_nurbs.evaluators import basis_matrix
+from compas_nurbs.fitting import batch_curve_interpolation
+from compas_nurbs.fitting import coefficient_matrix
+from compas_nurbs.fitting import coefficient_matrix_banded
+from compas_nurbs.fitting import global_curve_interpolation
+from compas_nurbs.knot_vectors import curve_parameters_numpy
 from compas_nurbs.knot_vectors import knot_vector_and_params
 from compas_nurbs.knot_vectors import CurveKnotStyle
 
@@ -77,8 +84,68 @@ def test_scipy_interpolation():
         assert(allclose(curve.control_points, P))
 
 
+def test_banded_interpolation():
+    points = np.random.default_rng(0).normal(size=(200, 3)).cumsum(axis=0)
+    for degree in range(1, 6):
+        kv, uk = knot_vector_and_params(points, degree, CurveKnotStyle.Chord, extended=False)
+        (ab, (lower, upper)), M = coefficient_matrix_banded(degree, kv, uk), coefficient_matrix(degree, kv, uk)
+        assert(lower < degree + 1 and upper < degree + 1)
+        dense = sum(np.diag(ab[upper - k, max(k, 0):len(uk) + min(k, 0)], k) for k in range(-lower, upper + 1))
+        assert(allclose(dense, M))
+        control_points, _ = global_curve_interpolation(points, degree, knot_style=CurveKnotStyle.Chord)
+        assert(allclose(control_points, np.linalg.solve(M, points)))
+        assert(allclose(M.dot(control_points), points))
+
+    # large inputs stay cheap with the banded solver
+    points = np.random.default_rng(1).normal(size=(20000, 3)).cumsum(axis=0)
+    curve = Curve.from_points(points, 3)
+    assert(allclose(curve.points_at(np.linspace(0, 1, 20000)[::997]), points[::997], tol=1e-6))
+
+
+def test_batch_interpolation():
+    rng = np.random.default_rng(2)
+    point_sets = [rng.normal(size=(n, 3)).tolist() for n in [6, 9, 6, 6, 9, 12]]
+    for knot_style in [CurveKnotStyle.Uniform, CurveKnotStyle.Chord]:
+        results = batch_curve_interpolation(point_sets, 3, knot_style)
+        for points, (control_points, knot_vector) in zip(point_sets, results):
+            expected_points, expected_knot_vector = global_curve_interpolation(points, 3, knot_style)
+            assert(allclose(control_points, expected_points))
+            assert(allclose(knot_vector, expected_knot_vector))
+
+    curves = Curve.from_points_batch(point_sets, 2)
+    assert([curve.count for curve in curves] == [len(points) for points in point_sets])
+    assert(allclose(curves[3].points_at([0, 0.2, 0.4, 0.6, 0.8, 1]), point_sets[3]))
+
+
+def test_approximation():
+    rng = np.random.default_rng(3)
+    t = np.linspace(0, 10, 2000)
+    points = np.stack((t, np.sin(t), np.cos(2 * t)), axis=1) + rng.normal(scale=0.01, size=(2000, 3))
+    for degree in range(1, 5):
+        curve, error = Curve.from_points_approx(points, degree, num_control_points=30, knot_style=CurveKnotStyle.Chord)
+        assert(curve.count == 30)
+        assert(allclose(curve.control_points[0], points[0]) and allclose(curve.control_points[-1], points[-1]))
+        # same solution as the dense least-squares problem
+        N = np.array(basis_matrix(degree, curve.knot_vector, curve_parameters_numpy(points, CurveKnotStyle.Chord), 30))
+        R = points - np.outer(N[:, 0], points[0]) - np.outer(N[:, -1], points[-1])
+        expected = np.linalg.lstsq(N[:, 1:-1], R, rcond=None)[0]
+        assert(allclose(curve.control_points[1:-1], expected))
+        assert(close(error, np.linalg.norm(N.dot(curve.control_points) - points, axis=1).max()))
+
+    # parameter correction reduces the error, a tolerance picks the number of control points
+    _, error = Curve.from_points_approx(points, 3, num_control_points=30, knot_style=CurveKnotStyle.Chord)
+    _, corrected = Curve.from_points_approx(points, 3, num_control_points=30, knot_style=CurveKnotStyle.Chord, corrections=3)
+    assert(corrected < error)
+    curve, error = Curve.from_points_approx(points, 3, tolerance=0.05, knot_style=CurveKnotStyle.Chord)
+    fewer, larger_error = Curve.from_points_approx(points, 3, num_control_points=curve.count - 1, knot_style=CurveKnotStyle.Chord)
+    assert(error <= 0.05 < larger_error)
+
+
 if __name__ == "__main__":
     tests_rhino_compare_params_knot_vectors()
     test_interpolation()
     test_interpolation_with_end_derivatives()
     test_scipy_interpolation()
+    test_banded_interpolation()
+    test_batch_interpolation()
+    test_approximation()
@@ -0,0 +1,59 @@
+import json
+import subprocess
+import sys
+
+SCRIPT = """
+import json
+import sys
+import compas.geometry
+before = set(sys.modules)
+import compas_nurbs
+loaded = sorted(set(sys.modules) - before)
+compas_nurbs.Curve([(0, 0, 0), (1, 1, 0), (2, 0, 0)], 2).points_at([0.5])
+print(json.dumps([loaded, sorted(sys.modules)]))
+"""
+
+IRONPYTHON_SCRIPT = """
+import collections
+import collections.abc
+import json
+import compas
+compas.IPY = True  # IronPython has no numpy, the geometry keeps its lists
+collections.Iterable = collections.abc.Iterable
+from compas_nurbs import RationalCurve
+from compas_nurbs import Surface
+curve = RationalCurve([(0, 0, 0), (1, 1, 0), (2, 0, 0)], 2, weights=[1., 2., 1.])
+surface = Surface.from_data(Surface([[(0, 0, 0), (0, 1, 0)], [(1, 0, 0), (1, 1, 1)]], (1, 1)).data)
+try:
+    Surface([[(0, 0, 0), (0, 1, 0)], [(1, 0, 0), (1, 1, 1)]], (1, 1), weights=[[1., 2.], [1., 1.]])
+    raised = False
+except ValueError:
+    raised = True
+print(json.dumps([curve.data, curve.count, surface.data, surface.count, list(surface.get_bounding_box()[6]), raised]))
+"""
+
+
+def test_lazy_imports():
+    # compas.geometry, which provides the base classes, loads numpy and parts of scipy itself
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT])
+    loaded, after_evaluation = json.loads(output.decode().strip().splitlines()[-1])
+    assert(not [name for name in loaded if name.split('.')[0] in ('scipy', 'numpy', 'geomdl')])
+    for name in ['compas_nurbs.evaluators', 'compas_nurbs.fitting', 'compas_nurbs.operations', 'compas_nurbs.intersections']:
+        assert(name not in loaded)
+    assert('compas_nurbs.evaluators' in after_evaluation and 'scipy.interpolate' in after_evaluation)
+
+
+def test_ironpython_storage():
+    output = subprocess.check_output([sys.executable, '-c', IRONPYTHON_SCRIPT])
+    curve, count, surface, counts, corner, raised = json.loads(output.decode().strip().splitlines()[-1])
+    assert(curve == {'control_points': [[0, 0, 0], [1, 1, 0], [2, 0, 0]], 'degree': 2, 'knot_vector': [0.0, 0.0, 0.0, 1.0, 1.0, 1.0],
+                     'rational': True, 'weights': [1.0, 2.0, 1.0]})
+    assert(count == 3 and counts == [2, 2])
+    assert(surface['knot_vector'] == [[0.0, 0.0, 1.0, 1.0], [0.0, 0.0, 1.0, 1.0]] and surface['weights'] == [[1.0, 1.0], [1.0, 1.0]])
+    assert(corner == [1, 1, 1])
+    assert(raised)  # non-unit weights of non-rational geometry
+
+
+if __name__ == "__main__":
+    test_lazy_imports()
+    test_ironpython_storage()
@@ -0,0 +1,38 @@
+import numpy as np
+
+from compas.geometry import allclose
+
+from compas_nurbs import knot_vectors
+from compas_nurbs.knot_vectors import CurveKnotStyle
+
+
+def test_numpy_knot_vectors():
+    points = np.random.default_rng(5).normal(size=(50, 3))
+    for name in ['chord_lengths', 'chord_spaced_parameters', 'chord_sqrt_spaced_parameters']:
+        expected = getattr(knot_vectors, name)(points.tolist())
+        assert(allclose(getattr(knot_vectors, name + '_numpy')(points), expected))
+    assert(allclose(knot_vectors.equally_spaced_parameters_numpy(7), knot_vectors.equally_spaced_parameters(7)))
+    assert(allclose(knot_vectors.bezier_spaced_parameters_numpy(7), knot_vectors.bezier_spaced_parameters(7)))
+
+    params = knot_vectors.chord_spaced_parameters(points.tolist())
+    for degree in range(1, 6):
+        expected = [0.] * (degree + 1) + [sum(params[j:j + degree]) / degree for j in range(1, 50 - degree)] + [1.] * (degree + 1)
+        assert(allclose(knot_vectors.knot_vector_from_params(degree, params), expected))
+        assert(allclose(knot_vectors.knot_vector_from_params_numpy(degree, np.array(params)), expected))
+        assert(allclose(knot_vectors.knot_vector_uniform_numpy(50, degree), knot_vectors.knot_vector_uniform(50, degree)))
+        for knot_style in [CurveKnotStyle.Uniform, CurveKnotStyle.Chord, CurveKnotStyle.ChordSquareRoot]:
+            for extended in [False, True]:
+                kv, uk = knot_vectors.knot_vector_and_params(points.tolist(), degree, knot_style, extended)
+                kv_numpy, uk_numpy = knot_vectors.knot_vector_and_params_numpy(points, degree, knot_style, extended)
+                assert(allclose(kv_numpy, kv) and allclose(uk_numpy, uk))
+
+    knot_vector = [2., 2., 2., 3., 3.5, 3.5, 6., 6., 6.]
+    assert(allclose(knot_vectors.normalize_knot_vector_numpy(knot_vector), knot_vectors.normalize_knot_vector(knot_vector)))
+    assert(knot_vectors.check_knot_vector_numpy(knot_vector, 6, 2) and not knot_vectors.check_knot_vector_numpy(knot_vector, 5, 2))
+    assert(not knot_vectors.check_knot_vector_numpy(knot_vector[::-1], 6, 2))
+    knots, mults = knot_vectors.knot_vector_multiplicities_numpy(knot_vector)
+    assert([[k, m] for k, m in zip(knots.tolist(), mults.tolist())] == knot_vectors.knot_vector_multiplicities(knot_vector))
+
+
+if __name__ == "__main__":
+    test_numpy_knot_vectors()
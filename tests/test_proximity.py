@@ -0,0 +1,65 @@
+import numpy as np
+
+from compas.geometry import Translation
+from compas.geometry import close
+
+from compas_nurbs import Curve
+from compas_nurbs import Surface
+from compas_nurbs.evaluators import evaluate_curve
+from compas_nurbs.evaluators import evaluate_surface_grid
+from compas_nurbs.proximity import BoundingBoxIndex
+from compas_nurbs.proximity import closest_points
+from compas_nurbs.proximity import find_clashes
+
+
+def brute_force_pairs(boxes, clearance):
+    overlap = np.all(boxes[:, np.newaxis, 1] >= boxes[np.newaxis, :, 0] - clearance, axis=2)
+    overlap &= np.all(boxes[np.newaxis, :, 1] >= boxes[:, np.newaxis, 0] - clearance, axis=2)
+    return np.argwhere(np.triu(overlap, 1)).tolist()
+
+
+def test_bounding_box_index():
+    rng = np.random.default_rng(0)
+    curves = [Curve((rng.random(3) * 50 + rng.normal(size=(4, 3))).tolist(), 3) for _ in range(500)]
+    index = BoundingBoxIndex(curves)
+    assert(index.pairs(0.5).tolist() == brute_force_pairs(index.boxes, 0.5))
+    assert(index.pairs(0.5, chunk_size=3).tolist() == brute_force_pairs(index.boxes, 0.5))
+
+    # only the moved curve is updated
+    curves[7].transform(Translation.from_vector([1, 2, 3]))
+    assert(index.update() == [7])
+    expected = brute_force_pairs(index.boxes, 0.5)
+    assert(index.pairs(0.5).tolist() == expected)
+    assert(index.pairs(0.5, indices=[7]).tolist() == [pair for pair in expected if 7 in pair])
+
+
+def test_clashes():
+    rng = np.random.default_rng(1)
+    curves = [Curve((rng.random(3) * 20 + rng.normal(size=(4, 3))).tolist(), 3) for _ in range(100)]
+    index = BoundingBoxIndex(curves)
+    clashes = find_clashes(index, 0.5)
+    assert(len(clashes))
+    params = np.linspace(0, 1, 2000)
+    for i, j, distance in clashes:
+        points_a, points_b = evaluate_curve(curves[i], params), evaluate_curve(curves[j], params)
+        sampled = np.linalg.norm(points_a[:, np.newaxis] - points_b[np.newaxis], axis=2).min()
+        assert(distance <= 0.5)
+        assert(distance <= sampled + 1e-9 and sampled - distance < 1e-3)
+
+
+def test_closest_points():
+    grid = np.stack(np.meshgrid(np.linspace(0, 4, 5), np.linspace(0, 4, 5), indexing='ij'), axis=-1)
+    heights = np.random.default_rng(2).random((5, 5, 1))
+    surface = Surface(np.concatenate((grid, heights), axis=-1).tolist(), (3, 3))
+    curve = Curve([(1, 1, 3), (2, 2, 0.5), (3, 1, 3)], 2)
+    distance, params_surface, params_curve = closest_points(surface, curve)
+    points = evaluate_surface_grid(surface, np.linspace(0, 1, 300), np.linspace(0, 1, 300)).reshape(-1, 3)
+    sampled = np.linalg.norm(points - np.array(curve.points_at(params_curve)[0]), axis=1).min()
+    assert(close(distance, sampled, tol=1e-3))
+    assert(len(params_surface) == 2 and len(params_curve) == 1)
+
+
+if __name__ == "__main__":
+    test_bounding_box_index()
+    test_clashes()
+    test_closest_points()
@@ -0,0 +1,78 @@
+import pickle
+
+import numpy as np
+
+from compas.geometry import Translation
+
+from compas_nurbs import Curve
+from compas_nurbs import RationalCurve
+from compas_nurbs import RationalSurface
+from compas_nurbs import Surface
+from compas_nurbs.serialization import GeometryLibrary
+from compas_nurbs.serialization import dump
+from compas_nurbs.serialization import dumps
+from compas_nurbs.serialization import load
+from compas_nurbs.serialization import loads
+
+
+def geometries():
+    rng = np.random.default_rng(4)
+    grid = np.stack(np.meshgrid(np.arange(4.), np.arange(5.), indexing='ij'), axis=-1)
+    surface = Surface(np.concatenate((grid, rng.random((4, 5, 1))), axis=-1), (3, 2))
+    return [Curve(rng.random((6, 3)), 3, [0, 0, 0, 0, 0.2, 0.7, 1, 1, 1, 1]),
+            RationalCurve(rng.random((5, 3)), 2, weights=rng.random(5) + 0.5),
+            surface.insert_knots(0, [0.25, 0.5]),
+            RationalSurface(np.concatenate((grid, rng.random((4, 5, 1))), axis=-1), (2, 3), weights=rng.random((4, 5)) + 0.5)]
+
+
+def test_round_trip(tmp_path):
+    expected = geometries()
+    expected[0].transform(Translation.from_vector([1, 2, 3]), lazy=True)
+    buffer = dumps(expected)
+    path = str(tmp_path / 'geometries.bin')
+    dump(expected, path)
+    for result in [loads(buffer), load(path)]:
+        assert(len(result) == len(expected))
+        for geometry, other in zip(result, expected):
+            assert(type(geometry) is type(other))
+            assert(geometry.data == other.data)
+            params = [(0.3, 0.6), (0.9, 0.1)] if isinstance(geometry, Surface) else [0.3, 0.9]
+            assert(np.allclose(geometry.points_at(params), other.points_at(params)))
+
+    # the arrays are views of the buffer
+    curve = loads(buffer)[1]
+    assert(np.shares_memory(curve.weighted_control_points, np.frombuffer(buffer, dtype=np.uint8)))
+    assert(isinstance(loads(dumps(expected[3])), RationalSurface))
+    try:
+        loads(b'NOTNURBS' + buffer[8:])
+        assert(False)
+    except ValueError:
+        pass
+
+
+def test_library(tmp_path):
+    expected = geometries() * 50
+    path = str(tmp_path / 'library.bin')
+    dump(expected, path)
+    library = GeometryLibrary(path)
+    assert(len(library) == len(expected) and not len(library._geometries))
+    assert(library.index['type'].tolist() == [0, 1, 2, 3] * 50)
+
+    # geometries are constructed on access, as views of the map
+    surface = library[-2]
+    assert(len(library._geometries) == 1 and library[len(expected) - 2] is surface)
+    assert(np.shares_memory(surface.control_points, library._map))
+    assert(surface.data == expected[-2].data)
+    assert([geometry.data for geometry in library[1:8:3]] == [geometry.data for geometry in expected[1:8:3]])
+    surface.transform(Translation.from_vector([1, 0, 0]))
+    assert(surface.data != expected[-2].data and GeometryLibrary(path)[-2].data == expected[-2].data)  # not written back
+
+    copy = pickle.loads(pickle.dumps(library))
+    assert(len(copy) == len(library) and copy[5].data == expected[5].data)
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    test_round_trip(pathlib.Path(tempfile.mkdtemp()))
+    test_library(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,44 @@
+import numpy as np
+
+from compas.geometry import allclose
+
+from compas_nurbs.evaluators import evaluate_curve
+from compas_nurbs.streaming import IncrementalCurve
+
+
+def test_incremental_curve():
+    t = np.linspace(0, 20, 600)
+    points = np.stack((t, np.sin(t), 0.1 * t * np.cos(t)), axis=1)
+    builder = IncrementalCurve()
+    builder.extend(points[:2])
+    assert(allclose(builder.curve.points_at([0, 0.5, 1]), [points[0], (points[0] + points[1]) / 2, points[1]]))
+    builder.append(points[1])  # repeated points are skipped
+    builder.extend(points[2:])
+    assert(len(builder) == 600)
+
+    # the curve interpolates the points at their chord length parameters
+    curve = builder.curve
+    params = np.concatenate(([0.], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))))
+    assert(allclose(evaluate_curve(curve, params / params[-1]), points))
+    # and is tangent continuous
+    derivatives = curve.derivatives_at(params[1:-1] / params[-1] + 1e-9, order=1)[:, 1]
+    left = curve.derivatives_at(params[1:-1] / params[-1] - 1e-9, order=1)[:, 1]
+    assert(allclose(derivatives, left, tol=1e-5))
+
+    # compaction stays within the tolerance, the last segment stays open for new points
+    samples = np.linspace(0, 1, 5000)
+    reference = evaluate_curve(curve, samples)
+    deviation = builder.compact(tolerance=1e-4)
+    assert(deviation <= 1e-4 and builder.curve.count < curve.count / 5)
+    assert(np.linalg.norm(evaluate_curve(builder.curve, samples) - reference, axis=1).max() <= 1e-4 + 1e-9)
+
+    # automatic compaction while streaming
+    builder = IncrementalCurve(points, window=100, tolerance=1e-4)
+    assert(builder.deviation <= 1e-4 and builder.curve.count < 300)
+    assert(np.linalg.norm(evaluate_curve(builder.curve, samples) - reference, axis=1).max() <= 1e-4 + 1e-9)
+    builder.append((21, 0, 0))
+    assert(allclose(builder.curve.points_at([1])[0], (21, 0, 0)))
+
+
+if __name__ == "__main__":
+    test_incremental_curve()
@@ -1,15 +1,28 @@
+import json
+import math
+import os
+
+import numpy as np
 import rhino3dm
 from geomdl import BSpline
 from geomdl import NURBS
 from geomdl import compatibility
+from geomdl import fitting
 
 from compas.geometry import close
 from compas.geometry import allclose
+from compas.geometry import Rotation
+from compas.geometry import Translation
 from compas.itertools import flatten
 
+from compas_nurbs import DATA
 from compas_nurbs import Curve
+from compas_nurbs import RationalCurve
 from compas_nurbs import Surface
 from compas_nurbs import RationalSurface
+from compas_nurbs.evaluators import basis_matrix
+from compas_nurbs.fitting import global_surface_approximation
+from compas_nurbs.operations import transform_geometries
 from compas_nurbs.utilities import linspace
 
 
@@ -17,13 +30,13 @@ def geomdl_surface_from_surface(surface):
     srf = NURBS.Surface() if surface.rational else BSpline.Surface()
     srf.degree_u, srf.degree_v = surface.degree
     if surface.rational:
-        control_points = list(flatten(surface.control_points))
-        ctrlptsw = compatibility.combine_ctrlpts_weights(control_points, list(flatten(surface.weights)))
+        control_points = surface.control_points.reshape(-1, 3).tolist()
+        ctrlptsw = compatibility.combine_ctrlpts_weights(control_points, surface.weights.ravel().tolist())
         srf.ctrlpts_size_u, srf.ctrlpts_size_v = surface.count
         srf.ctrlptsw = ctrlptsw
     else:
-        srf.ctrlpts2d = surface.control_points
-    srf.knotvector_u, srf.knotvector_v = surface.knot_vector
+        srf.ctrlpts2d = surface.control_points.tolist()
+    srf.knotvector_u, srf.knotvector_v = [kv.tolist() for kv in surface.knot_vector]
     return srf
 
 
@@ -168,8 +181,81 @@ def test_loft_surface():
     control_points = [(-24.845, -9.250, 28.148), (-16.052, 19.536, 28.148), (0.041, -16.799, 28.148), (3.526, 18.209, 28.148),
                       (8.503, 9.167, 28.148), (11.158, 4.687, 28.148), (18.043, -16.882, 28.148), (22.606, -2.696, 28.148)]
     curves.append(Curve(control_points, 7))
-    # TODO: loft surface with curves of different degrees and knot vectors
-    # surface = Surface.loft_from_curves(curves, degree_v=3)
+    curves.append(RationalCurve([(-20, 0, 40), (0, 10, 40), (20, 0, 40)], 2, weights=[1., 2., 1.]))
+
+    # curves of different degrees and knot vectors are made compatible
+    surface = Surface.loft_from_curves(curves, degree_v=3)
+    assert(surface.degree == (7, 3))
+    assert(surface.rational)
+    params = linspace(0., 1., 11)
+    for curve, v in zip(curves, linspace(0., 1., len(curves))):
+        assert(allclose(surface.points_at([(u, v) for u in params]), curve.points_at(params)))
+
+
+def test_surface_from_points():
+    points = [[(u + 0.1 * v * v, v, math.sin(u) * math.cos(v)) for v in range(5)] for u in range(6)]
+    for knot_style in [0, 1]:
+        surface = Surface.from_points(points, (3, 2), knot_style=knot_style)
+        assert(list(surface.count) == [6, 5] and list(surface.degree) == [3, 2])
+        if knot_style == 1:  # geomdl averages the chord length parameters as well
+            expected = fitting.interpolate_surface(list(flatten(points)), 6, 5, 3, 2)
+            assert(allclose(list(flatten(surface.control_points)), expected.ctrlpts))
+            assert(allclose(surface.knot_vector[0], expected.knotvector_u))
+            assert(allclose(surface.knot_vector[1], expected.knotvector_v))
+        else:
+            params = [(u, v) for u in linspace(0., 1., 6) for v in linspace(0., 1., 5)]
+            assert(allclose(surface.points_at(params), list(flatten(points))))
+
+    # the degree is limited by the number of points
+    assert(list(Surface.from_points(points[:3]).degree) == [2, 3])
+
+
+def test_surface_from_points_approx():
+    rng = np.random.default_rng(4)
+    params = rng.random((3000, 2))
+    points = np.column_stack((params * [20, 10], np.sin(params[:, 0] * 4) * np.cos(params[:, 1] * 3)))
+    points += rng.normal(scale=0.01, size=points.shape)
+
+    # without smoothing the result is the dense least-squares solution, independent of the chunks
+    surface, residuals = Surface.from_points_approx(points, (3, 2), (9, 7), params=params, smoothing=0)
+    N = np.einsum('ki,kj->kij', basis_matrix(3, surface.knot_vector[0], params[:, 0], 9),
+                  basis_matrix(2, surface.knot_vector[1], params[:, 1], 7)).reshape(3000, -1)
+    expected = np.linalg.lstsq(N, points, rcond=None)[0]
+    assert(allclose(np.reshape(surface.control_points, (-1, 3)), expected, tol=1e-6))
+    assert(allclose(residuals, np.linalg.norm(N.dot(expected) - points, axis=1), tol=1e-6))
+    chunked, _ = Surface.from_points_approx(points, (3, 2), (9, 7), params=params, smoothing=0, chunk_size=128)
+    assert(allclose(chunked.control_points, surface.control_points, tol=1e-6))
+
+    # with a hole in the points, smoothing keeps the control net in place
+    hole = np.linalg.norm(params - 0.5, axis=1) > 0.3
+    surface, residuals = Surface.from_points_approx(points[hole], (3, 3), (12, 12))
+    assert(max(residuals) < 0.1)
+    assert(np.abs(np.array(surface.control_points)[..., 2]).max() < 2.)
+
+    # a solver that does not converge is reported instead of returning a wrong surface
+    try:
+        global_surface_approximation(points, (3, 2), (9, 7), params=params, maxiter=2)
+        assert(False)
+    except ValueError:
+        pass
+
+
+def test_surface_from_arrays():
+    control_points = np.random.default_rng(6).random((5, 4, 3))
+    knot_vectors = [np.array([0, 0, 0, 0, 0.5, 1, 1, 1, 1]), np.array([0, 0, 0, 0.3, 1, 1, 1])]
+    surface = Surface.from_arrays(control_points, (3, 2), knot_vectors, validate=True)
+    expected = Surface(control_points.tolist(), (3, 2), [kv.tolist() for kv in knot_vectors])
+    params = [(u, v) for u in linspace(0., 1., 5) for v in linspace(0., 1., 5)]
+    assert(allclose(surface.points_at(params), expected.points_at(params)))
+    assert(list(surface.count) == [5, 4] and surface.data == expected.data)
+    rational = RationalSurface.from_arrays(control_points, (3, 2), knot_vectors)
+    assert(rational.rational and rational.weighted_control_points.shape == (5, 4, 4))
+    assert(rational.data == RationalSurface(control_points.tolist(), (3, 2), [kv.tolist() for kv in knot_vectors]).data)
+    try:
+        Surface.from_arrays(control_points, (3, 3), knot_vectors, validate=True)
+        assert(False)
+    except ValueError:
+        pass
 
 
 def test_isocurve():
@@ -190,10 +276,159 @@ def test_isocurve():
     assert(allclose(curve.knot_vector, [0.0, 0.0, 0.0, 0.0, 1.0, 1.0, 1.0, 1.0]))
     assert(allclose(curve.control_points, [[0.0, 4.0, -0.75], [2.0, 4.0, 1.5], [4.0, 4.0, 0.75], [6.0, 4.0, -1.5]]))
     assert(curve.degree == 3)
+    assert(allclose(surface.control_points, control_points_2d))
+
+    # the isocurves of a rational surface are rational
+    with open(os.path.join(DATA, 'cylinder.json')) as f:
+        data = json.load(f)
+    cylinder = RationalSurface(data['control_points'], data['degree'], data['knot_vector'], weights=data['weights'])
+    params = linspace(0., 1., 7)
+    for direction in (0, 1):
+        curves = cylinder.isocurves(direction, params)
+        assert(len(curves) == len(params))
+        for curve, t in zip(curves, params):
+            assert(curve.rational)
+            uv = [(t, s) if direction == 0 else (s, t) for s in params]
+            assert(allclose(curve.points_at(params), cylinder.points_at(uv)))
+
+
+def test_insert_knots():
+    with open(os.path.join(DATA, 'cylinder.json')) as f:
+        data = json.load(f)
+    cylinder = RationalSurface(data['control_points'], data['degree'], data['knot_vector'], weights=data['weights'])
+    params = [(u, v) for u in linspace(0., 1., 7) for v in linspace(0., 1., 7)]
+    for direction in (0, 1):
+        refined = cylinder.insert_knots(direction, [0.1, 0.3, 0.3])
+        assert(refined.count[direction] == cylinder.count[direction] + 3)
+        assert(refined.count[1 - direction] == cylinder.count[1 - direction])
+        assert(allclose(refined.points_at(params), cylinder.points_at(params)))
+
+
+def test_split_and_trim():
+    with open(os.path.join(DATA, 'cylinder.json')) as f:
+        data = json.load(f)
+    cylinder = RationalSurface(data['control_points'], data['degree'], data['knot_vector'], weights=data['weights'])
+    local = linspace(0., 1., 5)
+    params = [(u, v) for u in local for v in local]
+
+    pieces = cylinder.split(1, [0.3, 0.6])
+    assert(len(pieces) == 3)
+    for piece, (a, b) in zip(pieces, [(0.0, 0.3), (0.3, 0.6), (0.6, 1.0)]):
+        assert(allclose(piece.points_at(params), cylinder.points_at([(u, a + v * (b - a)) for u, v in params])))
+
+    trimmed = cylinder.trim((0.25, 0.75), (0.1, 0.4))
+    assert(allclose(trimmed.points_at(params), cylinder.points_at([(0.25 + u * 0.5, 0.1 + v * 0.3) for u, v in params])))
+
+
+def test_remove_knots():
+    with open(os.path.join(DATA, 'cylinder.json')) as f:
+        data = json.load(f)
+    cylinder = RationalSurface(data['control_points'], data['degree'], data['knot_vector'], weights=data['weights'])
+    params = [(u, v) for u in linspace(0., 1., 9) for v in linspace(0., 1., 9)]
+    for direction in (0, 1):
+        reduced, deviation = cylinder.insert_knots(direction, [0.1, 0.3, 0.3]).remove_knots(direction)
+        assert(reduced.count == cylinder.count)
+        assert(deviation < 1e-6)
+        assert(allclose(reduced.points_at(params), cylinder.points_at(params)))
+
+
+def test_contours():
+    control_points_2d = [[[0, 0, 0], [0, 4, 0.], [0, 8, -3]],
+                         [[2, 0, 6], [2, 4, 0.], [2, 8, 0.]],
+                         [[4, 0, 0], [4, 4, 0.], [4, 8, 3.]],
+                         [[6, 0, 0], [6, 4, -3], [6, 8, 0.]]]
+    surface = Surface(control_points_2d, (3, 2))
+
+    contours = surface.contours([0, 0, 0.1], [0, 0, 1], 0.5)
+    assert(allclose([plane.point.z for plane, _ in contours], [-2.9, -2.4, -1.9, -1.4, -0.9, -0.4, 0.1, 0.6, 1.1, 1.6, 2.1, 2.6]))
+    for plane, polylines in contours:
+        assert(len(polylines))
+        for polyline in polylines:
+            assert(allclose([p.z for p in polyline.points], [plane.point.z] * len(polyline.points)))
+
+    # the lower part of the cylinder is sliced into closed circles
+    with open(os.path.join(DATA, 'cylinder.json')) as f:
+        data = json.load(f)
+    cylinder = RationalSurface(data['control_points'], data['degree'], data['knot_vector'], weights=data['weights'])
+    contours = cylinder.contours([0, 0, 0.25], [0, 0, 1], 1.0)
+    assert(len(contours) == 7)
+    for plane, polylines in contours[:5]:
+        assert(len(polylines) == 1)
+        assert(polylines[0].is_closed)
+
+
+def test_intersect_surface():
+    control_points_2d = [[[0, 0, 0], [0, 4, 0.], [0, 8, -3]],
+                         [[2, 0, 6], [2, 4, 0.], [2, 8, 0.]],
+                         [[4, 0, 0], [4, 4, 0.], [4, 8, 3.]],
+                         [[6, 0, 0], [6, 4, -3], [6, 8, 0.]]]
+    surface = Surface(control_points_2d, (3, 2))
+    plane = Surface([[[-1, -1, 0.5], [-1, 9, 0.5]], [[7, -1, 0.5], [7, 9, 0.5]]], (1, 1))
+
+    # the branches coincide with the contours of the same plane
+    polylines = surface.intersect_surface(plane)
+    contours = surface.contours([0, 0, 0.5], [0, 0, 1], 10.)[0][1]
+    assert(len(polylines) == len(contours))
+    for polyline in polylines:
+        assert(allclose([p.z for p in polyline.points], [0.5] * len(polyline.points)))
+    ends = sorted(tuple(round(x, 3) for x in p) for polyline in polylines for p in (polyline.points[0], polyline.points[-1]))
+    contour_ends = sorted(tuple(round(x, 3) for x in p) for polyline in contours for p in (polyline.points[0], polyline.points[-1]))
+    assert(allclose(ends, contour_ends, tol=1e-3))
+
+    # a tilted plane cuts the cylinder in a single closed loop
+    with open(os.path.join(DATA, 'cylinder.json')) as f:
+        data = json.load(f)
+    cylinder = RationalSurface(data['control_points'], data['degree'], data['knot_vector'], weights=data['weights'])
+    plane = Surface([[[-20, -20, 1.0], [-20, 20, 1.0]], [[20, -20, 2.0], [20, 20, 2.0]]], (1, 1))
+    polylines = cylinder.intersect_surface(plane)
+    assert(len(polylines) == 1)
+    assert(polylines[0].is_closed)
+    curves = cylinder.intersect_surface(plane, fit=True)
+    assert(isinstance(curves[0], Curve))
+
+
+def test_transform():
+    rng = np.random.default_rng(3)
+    grid = np.stack(np.meshgrid(np.arange(4.), np.arange(5.), indexing='ij'), axis=-1)
+    geometries = [Surface(np.concatenate((grid, rng.random((4, 5, 1))), axis=-1), (3, 2)),
+                  RationalSurface(np.concatenate((grid, rng.random((4, 5, 1))), axis=-1), (2, 3), weights=rng.random((4, 5)) + 0.5),
+                  Curve(rng.random((6, 3)), 3),
+                  RationalCurve(rng.random((5, 3)), 2, weights=rng.random(5) + 0.5)]
+    params = [[(0.2, 0.7), (0.5, 0.5)], [(0.3, 0.1), (1., 0.4)], [0.1, 0.6], [0.4, 0.9]]
+    points = [np.array(geometry.points_at(p)) for geometry, p in zip(geometries, params)]
+
+    def check(matrices):
+        for geometry, p, expected, matrix in zip(geometries, params, points, matrices):
+            expected = expected.dot(matrix[:3, :3].T) + matrix[:3, 3]
+            assert(np.allclose(geometry.points_at(p), expected))
+
+    rotation = Rotation.from_axis_and_angle([1, 2, 3], 0.7)
+    matrices = [np.array((Translation.from_vector(rng.random(3)) * rotation).matrix) for _ in geometries]
+    transform_geometries(geometries, matrices)
+    check(matrices)
+    transform_geometries(geometries, rotation)
+    check([np.array(rotation.matrix).dot(m) for m in matrices])
+
+    # pending transformations are composed and applied on first use
+    for geometry in geometries:
+        geometry.transform(np.linalg.inv(np.array(rotation.matrix)), lazy=True)
+    transform_geometries(geometries, [np.linalg.inv(m) for m in matrices], lazy=True)
+    assert(all(geometry._pending is not None for geometry in geometries))
+    check([np.identity(4)] * len(geometries))
+    assert(all(geometry._pending is None for geometry in geometries))
 
 
 if __name__ == "__main__":
     test_surface()
     test_rational_surface()
     test_loft_surface()
+    test_surface_from_points()
+    test_surface_from_points_approx()
+    test_surface_from_arrays()
     test_isocurve()
+    test_insert_knots()
+    test_split_and_trim()
+    test_remove_knots()
+    test_contours()
+    test_intersect_surface()
+    test_transform()